@@ -24,6 +24,7 @@ from src.conversion.bpmn2rdf import BPMNToRDFConverter
 from src.core import RDFProcessEngine
 
 from handlers import build_handlers, build_build_handlers, build_autonomous_handlers
+from handlers._startup import preload_all
 from handlers.common import (
     REPORT_FILE,
     APP_FILE,
@@ -705,8 +706,14 @@ def execute_args(args: argparse.Namespace) -> int:
     return 1
 
 
+# Commands that write LLM, MCP or reasoning provenance while they run.
+_LOGGING_COMMANDS = {"solve", "build", "auto", "interactive"}
+
+
 def main() -> int:
     args = parse_args()
+    if args.command in _LOGGING_COMMANDS:
+        preload_all(wait=False)
     return execute_args(args)
 
 
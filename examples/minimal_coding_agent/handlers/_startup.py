@@ -0,0 +1,30 @@
+"""Warm the provenance log graphs before the agent starts logging."""
+
+import concurrent.futures
+from typing import Dict
+
+from . import llm_provenance, mcp_tools, reasoning_trace
+
+_LOGS = {
+    "llm": llm_provenance._LOG,
+    "mcp": mcp_tools._LOG,
+    "reasoning": reasoning_trace._LOG,
+}
+
+
+def preload_all(wait: bool = True) -> Dict[str, int]:
+    """Load the LLM, MCP and reasoning logs concurrently.
+
+    Each log parses its own files, so the loads are independent and run on
+    separate threads. With ``wait=False`` the loads continue in the
+    background; a log call that arrives first simply waits for its graph.
+    Returns the triple count of each graph when waiting.
+    """
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=len(_LOGS), thread_name_prefix="spear-preload"
+    )
+    futures = {name: executor.submit(log.graph) for name, log in _LOGS.items()}
+    executor.shutdown(wait=False)
+    if not wait:
+        return {}
+    return {name: len(future.result()) for name, future in futures.items()}
@@ -4,6 +4,7 @@ import re
 from typing import Any, Dict, List, Optional
 
 from rdflib import Graph, Literal, Namespace, RDF, URIRef
+from rdflib.plugins.sparql import prepareQuery
 
 from .common import TARGET_DIR, PythonTestTool
 from .retry_policy import choose_retry_plan, get_policy_profile
@@ -59,33 +60,31 @@ def query_skills_for_error(error_type: str) -> List[Dict[str, str]]:
     return results
 
 
-def query_history_for_similar_errors(
-    error_type: str, limit: int = 5
-) -> List[Dict[str, Any]]:
-    """Query session history for similar errors and what worked."""
-    from pathlib import Path
-
-    history_path = Path(__file__).resolve().parent.parent / "session_history.ttl"
-    g = Graph()
-    if history_path.exists():
-        g.parse(history_path, format="turtle")
-
-    query = f"""
-    PREFIX ag: <http://example.org/agent/>
-    PREFIX proc: <http://example.org/process/>
+# Parsed once; the caller's limit is applied by slicing the ordered rows.
+_SIMILAR_ERRORS_QUERY = prepareQuery(
+    """
     SELECT ?run ?task ?success ?errorType ?outputSummary
-    WHERE {{
+    WHERE {
         ?run a ag:Run .
         ?run ag:command "solve" .
         ?run ag:success ?success .
         ?run ag:task ?task .
-        OPTIONAL {{ ?run ag:errorType ?errorType }}
-        OPTIONAL {{ ?run ag:outputSummary ?outputSummary }}
-    }}
+        OPTIONAL { ?run ag:errorType ?errorType }
+        OPTIONAL { ?run ag:outputSummary ?outputSummary }
+    }
     ORDER BY DESC(?run)
-    LIMIT {limit}
-    """
-    results = g.query(query)
+    """,
+    initNs={"ag": AG},
+)
+
+
+def query_history_for_similar_errors(
+    error_type: str, limit: int = 5
+) -> List[Dict[str, Any]]:
+    """Query session history for similar errors and what worked."""
+    from .session_history import select_history
+
+    results = select_history(_SIMILAR_ERRORS_QUERY, limit)
     return [
         {
             "run": str(row.run),
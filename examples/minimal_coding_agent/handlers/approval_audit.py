@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import heapq
 import json
 from datetime import datetime
 from pathlib import Path
@@ -125,5 +126,4 @@ def get_approval_events(limit: int = 20, run_id: str = "") -> List[Dict[str, Any
             "details": str(g.value(event, APPROVAL.details) or ""),
         }
         events.append(redact_object(row))
-    events.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-    return events[:limit]
+    return heapq.nlargest(limit, events, key=lambda x: x.get("timestamp", ""))
@@ -1,22 +1,62 @@
 """RDF-based artifact tracker for file changes."""
 
+import atexit
 import difflib
+import functools
 import hashlib
+import logging
 import os
+import queue
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from rdflib import Graph, Literal, Namespace, RDF, RDFS, URIRef, XSD
 
+from .rdf_utils import flush_writer, journal_writer, nt_rows
 from .redaction import redact_object, redact_text
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 ARTIFACT_LOG_PATH = BASE_DIR / "artifact_changes.ttl"
 
+logger = logging.getLogger(__name__)
+
 AG = Namespace("http://example.org/agent/")
 ART = Namespace("http://example.org/artifact/")
 
+# Terms written on every log call. Namespace attribute access and Literal
+# construction are comparatively expensive in rdflib, so build them once.
+_ARTIFACT = ART.Artifact
+_P_TIMESTAMP = ART.timestamp
+_P_FILE_PATH = ART.filePath
+_P_OPERATION = ART.operation
+_P_CONTENT_HASH = ART.contentHash
+_P_PREVIOUS_HASH = ART.previousHash
+_P_CHANGED = ART.changed
+_P_LINES_ADDED = ART.linesAdded
+_P_LINES_REMOVED = ART.linesRemoved
+_P_CONTENT_PREVIEW = ART.contentPreview
+_P_RUN_ID = ART.runId
+_P_TASK = ART.task
+
+_OPERATION_LITERALS = {op: Literal(op) for op in ("created", "modified", "deleted")}
+_LIT_TRUE = Literal(True, datatype=XSD.boolean)
+_LIT_FALSE = Literal(False, datatype=XSD.boolean)
+_LIT_ZERO = Literal(0, datatype=XSD.integer)
+
+
+@functools.lru_cache(maxsize=4096)
+def _interned_literal(value: str) -> Literal:
+    """Share one Literal per repeated value (file paths, run ids, tasks).
+
+    Agents touch the same few files within a run, so reusing the instance
+    saves memory in the long-lived graph and lets store lookups hit the
+    term's cached hash.
+    """
+    return Literal(value)
+
+
 _namespaces = {
     "ag": AG,
     "art": ART,
@@ -33,26 +73,156 @@ def _create_artifact_graph() -> Graph:
     return g
 
 
+def _journal_path() -> Path:
+    """Append-only N-Triples journal that backs the Turtle artifact log."""
+    return ARTIFACT_LOG_PATH.with_suffix(".nt")
+
+
 def load_artifact_graph() -> Graph:
     g = _create_artifact_graph()
-    if ARTIFACT_LOG_PATH.exists():
+    journal = _journal_path()
+    if journal.exists():
+        g.parse(journal, format="nt")
+    elif ARTIFACT_LOG_PATH.exists():
         g.parse(ARTIFACT_LOG_PATH, format="turtle")
     return g
 
 
-def save_artifact_graph(g: Graph) -> None:
-    g.serialize(ARTIFACT_LOG_PATH, format="turtle")
+def export_artifact_graph(path: Optional[Path] = None) -> Path:
+    """Write the current artifact log as Turtle (defaults to ARTIFACT_LOG_PATH)."""
+    target = Path(path) if path else ARTIFACT_LOG_PATH
+    with _LOCK:
+        _get_graph().serialize(target, format="turtle")
+    return target
+
+
+# The artifact log is loaded once per process and appended to in memory.
+# New triples are queued for a background writer thread that appends them
+# to the N-Triples journal, so disk I/O stays off the agent's critical path.
+_FLUSH_EVERY = 32
+_GRAPH: Optional[Graph] = None
+_GRAPH_PATH: Optional[Path] = None
+_NEXT_ID = 0
+_ORDER: List[URIRef] = []
+_BY_RUN: Dict[str, List[URIRef]] = {}
+_LOCK = threading.RLock()
+
+_LOG_Q: "queue.Queue[Tuple[Path, List[Tuple[Any, Any, Any]]]]" = queue.Queue(
+    maxsize=10_000
+)
+_WRITER: Optional[threading.Thread] = None
+
+
+def _get_graph() -> Graph:
+    """Return the process-wide artifact graph, loading it on first use."""
+    global _GRAPH, _GRAPH_PATH, _NEXT_ID
+    with _LOCK:
+        if _GRAPH is None or _GRAPH_PATH != ARTIFACT_LOG_PATH:
+            flush_artifact_graph()
+            _GRAPH = load_artifact_graph()
+            _GRAPH_PATH = ARTIFACT_LOG_PATH
+            # Artifact URIs oldest first; logs append in time order, so the
+            # list is only sorted once, when the graph is loaded.
+            timestamps = dict(_GRAPH.subject_objects(_P_TIMESTAMP))
+            _ORDER[:] = sorted(
+                _GRAPH.subjects(RDF.type, _ARTIFACT),
+                key=lambda artifact: str(timestamps.get(artifact, "")),
+            )
+            _NEXT_ID = len(_ORDER)
+            run_ids = dict(_GRAPH.subject_objects(_P_RUN_ID))
+            _BY_RUN.clear()
+            for artifact in _ORDER:
+                if artifact in run_ids:
+                    _BY_RUN.setdefault(str(run_ids[artifact]), []).append(artifact)
+            _LAST_CONTENT.clear()
+            journal = _journal_path()
+            if len(_GRAPH) and not journal.exists():
+                # Seed the journal from a legacy Turtle-only log.
+                _GRAPH.serialize(journal, format="nt")
+        return _GRAPH
+
+
+def _journal_writer() -> None:
+    """Drain queued artifacts into the journal in batches of up to _FLUSH_EVERY."""
+    while True:
+        batch = [_LOG_Q.get()]
+        while len(batch) < _FLUSH_EVERY:
+            try:
+                batch.append(_LOG_Q.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            paths = set()
+            for path, triples in batch:
+                journal_writer(path).write(nt_rows(triples).encode())
+                paths.add(path)
+            for path in paths:
+                flush_writer(path)
+        except Exception as e:
+            logger.warning(f"Failed to append artifact journal: {e}")
+        finally:
+            for _ in batch:
+                _LOG_Q.task_done()
+
+
+def _append_nt(triples: List[Tuple[Any, Any, Any]]) -> None:
+    global _WRITER
+    if _WRITER is None or not _WRITER.is_alive():
+        _WRITER = threading.Thread(
+            target=_journal_writer, name="artifact-journal", daemon=True
+        )
+        _WRITER.start()
+    # Blocks only if the writer falls 10k artifacts behind.
+    _LOG_Q.put((_journal_path(), triples))
+
+
+def flush_artifact_graph() -> None:
+    """Wait for queued artifacts to be written and flush them to disk."""
+    if _WRITER is not None and _WRITER.is_alive():
+        _LOG_Q.join()
+    flush_writer(_journal_path())
 
 
-def _get_artifact_count(g: Graph) -> int:
-    count = 0
-    for _ in g.subjects(RDF.type, ART.Artifact):
-        count += 1
-    return count
+atexit.register(flush_artifact_graph)
+
+
+# Agents often rewrite identical small buffers, so short contents are
+# memoized.  The cache holds its keys alive, so both the entry count and the
+# key length are kept small (at most ~1 MiB of ASCII text in total); longer
+# contents are simply hashed, and repeated modifies of the same file already
+# reuse the hash through _LAST_CONTENT below.
+_HASH_CACHE_MAX_CHARS = 4096
+
+
+def _compute_hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_hash(content: str) -> str:
+    return _compute_hash_bytes(content.encode())
 
 
 def _compute_hash(content: str) -> str:
-    return hashlib.sha256(content.encode()).hexdigest()[:16]
+    """Hash text content; callers holding encoded bytes use _compute_hash_bytes."""
+    if len(content) > _HASH_CACHE_MAX_CHARS:
+        return _compute_hash_bytes(content.encode())
+    return _cached_hash(content)
+
+
+# Last logged (content, hash) per raw file path. A modify whose previous
+# content is the content logged last for that path reuses the stored hash,
+# so the cost is one identity/equality check instead of a second SHA-256.
+_LAST_CONTENT: Dict[str, Tuple[str, str]] = {}
+
+
+def _previous_content_hash(file_path: str, previous_content: str) -> str:
+    cached = _LAST_CONTENT.get(file_path)
+    if cached is not None and (
+        cached[0] is previous_content or cached[0] == previous_content
+    ):
+        return cached[1]
+    return _compute_hash(previous_content)
 
 
 def _line_count(content: str) -> int:
@@ -87,74 +257,67 @@ def log_artifact(
     metadata: Optional[Dict[str, Any]] = None,
 ) -> str:
     """Log an artifact change to RDF."""
+    global _NEXT_ID
+    raw_path = file_path
+    raw_content = content
     file_path = redact_text(file_path)
     metadata = redact_object(metadata or {})
-    g = load_artifact_graph()
-
-    artifact_id = _get_artifact_count(g)
-    artifact_uri = ART[f"change/{artifact_id}"]
 
-    g.add((artifact_uri, RDF.type, ART.Artifact))
-    g.add(
-        (
-            artifact_uri,
-            ART.timestamp,
-            Literal(datetime.now().isoformat(), datatype=XSD.dateTime),
-        )
-    )
-    g.add((artifact_uri, ART.filePath, Literal(file_path)))
-    g.add((artifact_uri, ART.operation, Literal(operation)))
+    fields = [
+        (_P_TIMESTAMP, Literal(datetime.now().isoformat(), datatype=XSD.dateTime)),
+        (_P_FILE_PATH, _interned_literal(file_path)),
+        (_P_OPERATION, _OPERATION_LITERALS.get(operation) or Literal(operation)),
+    ]
 
     if content:
         content = redact_text(content)
         content_hash = _compute_hash(content)
-        g.add((artifact_uri, ART.contentHash, Literal(content_hash)))
+        fields.append((_P_CONTENT_HASH, Literal(content_hash)))
 
         if previous_hash:
-            g.add((artifact_uri, ART.previousHash, Literal(previous_hash)))
-            if previous_hash != content_hash:
-                g.add((artifact_uri, ART.changed, Literal(True, datatype=XSD.boolean)))
-            else:
-                g.add((artifact_uri, ART.changed, Literal(False, datatype=XSD.boolean)))
+            fields.append((_P_PREVIOUS_HASH, Literal(previous_hash)))
+            changed = previous_hash != content_hash
+            fields.append((_P_CHANGED, _LIT_TRUE if changed else _LIT_FALSE))
 
         if operation == "created":
-            g.add(
-                (
-                    artifact_uri,
-                    ART.linesAdded,
-                    Literal(_line_count(content), datatype=XSD.integer),
-                )
+            fields.append(
+                (_P_LINES_ADDED, Literal(_line_count(content), datatype=XSD.integer))
             )
-            g.add((artifact_uri, ART.linesRemoved, Literal(0, datatype=XSD.integer)))
+            fields.append((_P_LINES_REMOVED, _LIT_ZERO))
         elif operation == "modified" and previous_content is not None:
             safe_previous = redact_text(previous_content)
             lines_added, lines_removed = _diff_line_counts(safe_previous, content)
-            g.add(
-                (
-                    artifact_uri,
-                    ART.linesAdded,
-                    Literal(lines_added, datatype=XSD.integer),
-                )
-            )
-            g.add(
-                (
-                    artifact_uri,
-                    ART.linesRemoved,
-                    Literal(lines_removed, datatype=XSD.integer),
-                )
+            fields.append((_P_LINES_ADDED, Literal(lines_added, datatype=XSD.integer)))
+            fields.append(
+                (_P_LINES_REMOVED, Literal(lines_removed, datatype=XSD.integer))
             )
 
-        if len(content) > 2000:
-            content = content[:2000] + "\n... [truncated]"
-        g.add((artifact_uri, ART.contentPreview, Literal(content)))
+        preview = content
+        if len(preview) > 2000:
+            preview = preview[:2000] + "\n... [truncated]"
+        fields.append((_P_CONTENT_PREVIEW, Literal(preview)))
 
     if metadata:
         if "run_id" in metadata:
-            g.add((artifact_uri, ART.runId, Literal(metadata["run_id"])))
+            fields.append((_P_RUN_ID, _interned_literal(str(metadata["run_id"]))))
         if "task" in metadata:
-            g.add((artifact_uri, ART.task, Literal(metadata["task"])))
+            fields.append((_P_TASK, _interned_literal(str(metadata["task"]))))
+
+    with _LOCK:
+        g = _get_graph()
 
-    save_artifact_graph(g)
+        artifact_uri = ART[f"change/{_NEXT_ID}"]
+        _NEXT_ID += 1
+
+        triples = [(artifact_uri, RDF.type, _ARTIFACT)]
+        triples.extend((artifact_uri, p, o) for p, o in fields)
+        g.addN((s, p, o, g) for s, p, o in triples)
+        _append_nt(triples)
+        _ORDER.append(artifact_uri)
+        if metadata and "run_id" in metadata:
+            _BY_RUN.setdefault(str(metadata["run_id"]), []).append(artifact_uri)
+        if content and content == raw_content:
+            _LAST_CONTENT[raw_path] = (raw_content, content_hash)
 
     return str(artifact_uri)
 
@@ -172,7 +335,11 @@ def log_file_modified(
     file_path: str, content: str, previous_content: Optional[str] = None, **kwargs
 ) -> str:
     """Log that a file was modified."""
-    previous_hash = _compute_hash(previous_content) if previous_content else None
+    previous_hash = (
+        _previous_content_hash(file_path, previous_content)
+        if previous_content
+        else None
+    )
     metadata = {"task": kwargs.pop("task", None), "run_id": kwargs.pop("run_id", None)}
     metadata = {k: v for k, v in metadata.items() if v}
     return log_artifact(
@@ -190,82 +357,88 @@ def log_file_deleted(file_path: str, **kwargs) -> str:
     return log_artifact(file_path, "deleted", **kwargs)
 
 
-def get_artifacts(limit: int = 50) -> List[Dict[str, Any]]:
-    """Get recent artifact changes."""
-    g = load_artifact_graph()
-
-    artifacts = []
-    for artifact in g.subjects(RDF.type, ART.Artifact):
-        data = {
-            "uri": str(artifact),
-            "timestamp": str(g.value(artifact, ART.timestamp) or ""),
-            "file_path": str(g.value(artifact, ART.filePath) or ""),
-            "operation": str(g.value(artifact, ART.operation) or ""),
-            "content_hash": str(g.value(artifact, ART.contentHash) or ""),
-            "content_preview": str(g.value(artifact, ART.contentPreview) or ""),
-        }
-
-        changed = g.value(artifact, ART.changed)
-        if changed:
-            data["changed"] = str(changed).lower() == "true"
-
-        previous_hash = g.value(artifact, ART.previousHash)
-        if previous_hash:
-            data["previous_hash"] = str(previous_hash)
+_RECORD_KEYS = {
+    _P_TIMESTAMP: "timestamp",
+    _P_FILE_PATH: "file_path",
+    _P_OPERATION: "operation",
+    _P_CONTENT_HASH: "content_hash",
+    _P_CONTENT_PREVIEW: "content_preview",
+    _P_CHANGED: "changed",
+    _P_PREVIOUS_HASH: "previous_hash",
+    _P_RUN_ID: "run_id",
+    _P_TASK: "task",
+    _P_LINES_ADDED: "lines_added",
+    _P_LINES_REMOVED: "lines_removed",
+}
 
-        run_id = g.value(artifact, ART.runId)
-        if run_id:
-            data["run_id"] = str(run_id)
 
-        task = g.value(artifact, ART.task)
-        if task:
-            data["task"] = str(task)
+def _artifact_record(g: Graph, artifact: URIRef) -> Dict[str, Any]:
+    """Read one artifact's fields in a single pass over its triples."""
+    data: Dict[str, Any] = {
+        "uri": str(artifact),
+        "timestamp": "",
+        "file_path": "",
+        "operation": "",
+        "content_hash": "",
+        "content_preview": "",
+    }
+    for predicate, value in g.predicate_objects(artifact):
+        key = _RECORD_KEYS.get(predicate)
+        if key is None:
+            continue
+        if key == "changed":
+            data[key] = str(value).lower() == "true"
+        elif key in ("lines_added", "lines_removed"):
+            data[key] = int(value)
+        elif value:
+            data[key] = str(value)
+    return data
 
-        lines_added = g.value(artifact, ART.linesAdded)
-        lines_removed = g.value(artifact, ART.linesRemoved)
-        if lines_added is not None:
-            data["lines_added"] = int(lines_added)
-        if lines_removed is not None:
-            data["lines_removed"] = int(lines_removed)
 
-        artifacts.append(data)
+def get_artifacts(limit: int = 50) -> List[Dict[str, Any]]:
+    """Get recent artifact changes."""
+    with _LOCK:
+        g = _get_graph()
+        recent = _ORDER[-limit:] if limit > 0 else []
+        return [_artifact_record(g, artifact) for artifact in reversed(recent)]
 
-    artifacts.sort(key=lambda x: x["timestamp"], reverse=True)
-    return artifacts[:limit]
+
+_RUN_SUMMARY_KEYS = (
+    "uri",
+    "timestamp",
+    "file_path",
+    "operation",
+    "content_hash",
+    "lines_added",
+    "lines_removed",
+)
 
 
 def get_artifacts_for_run(run_id: str) -> List[Dict[str, Any]]:
-    """Get all artifacts for a specific run."""
-    g = load_artifact_graph()
-
-    artifacts = []
-    for artifact in g.subjects(ART.runId, Literal(run_id)):
-        data = {
-            "uri": str(artifact),
-            "timestamp": str(g.value(artifact, ART.timestamp) or ""),
-            "file_path": str(g.value(artifact, ART.filePath) or ""),
-            "operation": str(g.value(artifact, ART.operation) or ""),
-            "content_hash": str(g.value(artifact, ART.contentHash) or ""),
-        }
-        lines_added = g.value(artifact, ART.linesAdded)
-        lines_removed = g.value(artifact, ART.linesRemoved)
-        if lines_added is not None:
-            data["lines_added"] = int(lines_added)
-        if lines_removed is not None:
-            data["lines_removed"] = int(lines_removed)
-        artifacts.append(data)
-
-    return artifacts
+    """Get all artifacts for a specific run, oldest first."""
+    with _LOCK:
+        g = _get_graph()
+        artifacts = []
+        for artifact in _BY_RUN.get(str(run_id), ()):
+            data = _artifact_record(g, artifact)
+            artifacts.append(
+                {key: data[key] for key in _RUN_SUMMARY_KEYS if key in data}
+            )
+        return artifacts
 
 
 def query_artifacts(sparql: str) -> List[Dict[str, Any]]:
     """Query artifacts with custom SPARQL."""
-    g = load_artifact_graph()
-
-    results = []
-    for row in g.query(sparql):
-        result = {}
-        for var in row.labels:
-            result[var] = str(row[var]) if row[var] else None
-        results.append(result)
-    return results
+    with _LOCK:
+        g = _get_graph()
+
+        qres = g.query(sparql)
+        # Label strings are computed once per query, not per cell.
+        labels = [str(var) for var in qres.vars or ()]
+        return [
+            {
+                label: (str(value) if value is not None else None)
+                for label, value in zip(labels, row)
+            }
+            for row in qres
+        ]
@@ -1,11 +1,11 @@
 """Handler that builds new code from scratch based on task description."""
 
-import json
 from typing import Callable
 
 from .common import (
     TARGET_DIR,
     PythonTestTool,
+    dumps_json,
     llm_build_code,
     Scratchpad,
     log_approach_choice,
@@ -48,7 +48,7 @@ def make_handler(task: str, run_id: str) -> Callable:
                 context.set_variable("build_exit_code", "0")
                 context.set_variable("success", "true")
                 context.set_variable(
-                    "build_steps_json", json.dumps(result["steps"], indent=2)
+                    "build_steps_json", dumps_json(result["steps"], indent=True)
                 )
             else:
                 scratchpad.think(
@@ -60,7 +60,7 @@ def make_handler(task: str, run_id: str) -> Callable:
                 context.set_variable("build_exit_code", result.get("exit_code", "1"))
                 context.set_variable("success", "false")
                 context.set_variable(
-                    "build_steps_json", json.dumps(result["steps"], indent=2)
+                    "build_steps_json", dumps_json(result["steps"], indent=True)
                 )
 
         except Exception as e:
@@ -73,7 +73,7 @@ def make_handler(task: str, run_id: str) -> Callable:
             context.set_variable("success", "false")
             context.set_variable(
                 "build_steps_json",
-                json.dumps([{"stage": "build_error", "error": str(e)}], indent=2),
+                dumps_json([{"stage": "build_error", "error": str(e)}], indent=True),
             )
 
     return handle
@@ -1,10 +1,17 @@
 """Built-in MCP tools for the coding agent."""
 
+import functools
+import importlib.util
 import os
 import re
 import shlex
+import signal
 import subprocess
+import threading
+from collections import deque
+from itertools import islice
 from pathlib import Path
+from typing import Optional
 
 from .approval import (
     classify_shell_risk,
@@ -16,6 +23,9 @@ from .mcp_tools import register_tool, get_mcp_registry, call_mcp_tool
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 TARGET_DIR = BASE_DIR / "target_project"
+DEFAULT_SHELL_TIMEOUT_SECONDS = 120
+DEFAULT_TEST_TIMEOUT_SECONDS = 600
+MAX_CAPTURED_LINES = 2048
 DEFAULT_SHELL_ALLOWED_COMMANDS = {
     "cat",
     "dir",
@@ -39,6 +49,115 @@ DEFAULT_SHELL_ALLOWED_COMMANDS = {
 }
 
 
+# Directories already known to exist; write_file_tool skips the
+# stat + mkdir for these.
+_MKDIR_CACHE: set[str] = set()
+
+
+@functools.lru_cache(maxsize=8)
+def _resolved_dir(path: Path) -> Path:
+    """Resolve a fixed workspace directory once instead of on every call."""
+    return path.resolve()
+
+
+def _encode_for_disk(content: str) -> bytes:
+    """UTF-8 encode with the platform newline, as write_text would."""
+    if os.linesep != "\n":
+        content = content.replace("\n", os.linesep)
+    return content.encode("utf-8")
+
+
+def _ensure_parent_dir(file_path: Path) -> None:
+    parent = str(file_path.parent)
+    if parent not in _MKDIR_CACHE:
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        _MKDIR_CACHE.add(parent)
+
+
+class _TailBuffer:
+    """Keep only the last `max_lines` lines read from a pipe."""
+
+    def __init__(self, max_lines: int):
+        self.lines: deque[str] = deque(maxlen=max_lines)
+        self.total = 0
+
+    def drain(self, stream) -> None:
+        with stream:
+            for line in stream:
+                self.lines.append(line)
+                self.total += 1
+
+    def text(self) -> str:
+        dropped = self.total - len(self.lines)
+        head = f"... [{dropped} earlier lines truncated]\n" if dropped else ""
+        return head + "".join(self.lines)
+
+
+def _kill_process_tree(proc: subprocess.Popen) -> None:
+    if os.name == "posix":
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+            return
+        except ProcessLookupError:
+            return
+        except OSError:
+            pass
+    proc.kill()
+
+
+def _run_captured(
+    command: list[str], cwd: Optional[str] = None, timeout: Optional[float] = None
+) -> subprocess.CompletedProcess:
+    """Run a command with bounded output capture and an optional timeout.
+
+    Unlike capture_output=True, only the tail of each stream is kept, so a
+    command with runaway output cannot exhaust the agent's memory. Pipes are
+    drained by threads because selectors do not support pipes on Windows.
+    On POSIX the command gets its own session, so a timeout kills the whole
+    process group (a shell's or pytest's children included).
+    """
+    proc = subprocess.Popen(
+        command,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        errors="replace",
+        start_new_session=os.name == "posix",
+    )
+    out = _TailBuffer(MAX_CAPTURED_LINES)
+    err = _TailBuffer(MAX_CAPTURED_LINES)
+    readers = [
+        threading.Thread(target=out.drain, args=(proc.stdout,), daemon=True),
+        threading.Thread(target=err.drain, args=(proc.stderr,), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+
+    timed_out = False
+    try:
+        try:
+            proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            _kill_process_tree(proc)
+            proc.wait()
+            timed_out = True
+        for reader in readers:
+            # Grandchildren of a killed shell may still hold the pipes open.
+            reader.join(timeout=1.0 if timed_out else None)
+    except BaseException:
+        # Interrupted (e.g. KeyboardInterrupt): the command runs in its own
+        # session, so nothing else would stop it.
+        _kill_process_tree(proc)
+        proc.wait()
+        raise
+
+    stderr = err.text()
+    if timed_out:
+        stderr += f"\n[command killed after {timeout:g}s timeout]\n"
+    return subprocess.CompletedProcess(command, proc.returncode, out.text(), stderr)
+
+
 def _resolve_agent_path(path_value: str) -> Path:
     raw = (path_value or "").strip()
     if not raw:
@@ -49,7 +168,7 @@ def _resolve_agent_path(path_value: str) -> Path:
         path = TARGET_DIR / path
 
     resolved = path.resolve()
-    base = BASE_DIR.resolve()
+    base = _resolved_dir(BASE_DIR)
     if resolved != base and base not in resolved.parents:
         raise ValueError(f"Path escapes agent workspace: {resolved}")
     return resolved
@@ -58,19 +177,30 @@ def _resolve_agent_path(path_value: str) -> Path:
 def _resolve_workspace_path(path_value: str) -> Path:
     raw = (path_value or "").strip()
     if not raw:
-        return BASE_DIR.resolve()
+        return _resolved_dir(BASE_DIR)
 
     path = Path(raw)
     if not path.is_absolute():
         path = BASE_DIR / path
 
     resolved = path.resolve()
-    base = BASE_DIR.resolve()
+    base = _resolved_dir(BASE_DIR)
     if resolved != base and base not in resolved.parents:
         raise ValueError(f"Path escapes agent workspace: {resolved}")
     return resolved
 
 
+_XDIST_AVAILABLE = importlib.util.find_spec("xdist") is not None
+
+
+def _can_parallelize(test_path: Path) -> bool:
+    """True when xdist is usable and the path holds more than one test file."""
+    if not _XDIST_AVAILABLE or (os.cpu_count() or 1) < 2 or not test_path.is_dir():
+        return False
+    test_files = islice(test_path.rglob("test_*.py"), 2)
+    return sum(1 for _ in test_files) > 1
+
+
 @register_tool(
     name="run_tests",
     description="Run pytest tests in the target project. Returns test results.",
@@ -82,6 +212,15 @@ def _resolve_workspace_path(path_value: str) -> Path:
                 "description": "Path to test directory (default: target_project)",
             },
             "verbose": {"type": "boolean", "description": "Verbose output"},
+            "parallel": {
+                "type": "boolean",
+                "description": "Spread test files across CPUs when pytest-xdist "
+                "is installed (default: true)",
+            },
+            "timeout": {
+                "type": "number",
+                "description": "Seconds before the test run is killed (default 600)",
+            },
         },
     },
 )
@@ -90,20 +229,31 @@ def run_tests_tool(args: dict) -> dict:
     import sys
 
     test_path_arg = args.get("path", str(TARGET_DIR))
+    timeout = float(args.get("timeout") or DEFAULT_TEST_TIMEOUT_SECONDS)
     try:
         test_path = str(_resolve_agent_path(test_path_arg))
     except ValueError as exc:
         return {"error": str(exc)}
 
-    command = [sys.executable, "-m", "pytest", test_path, "--tb=short"]
+    # A fresh interpreter per run is deliberate: it isolates the agent from
+    # the generated code under test and always imports the current files.
+    # PythonTestTool follows the same default. Startup is trimmed instead,
+    # and previously failing tests run first so the inner loop fails fast.
+    command = [
+        sys.executable,
+        "-m",
+        "pytest",
+        test_path,
+        "--tb=short",
+        "--ff",
+        "--no-header",
+    ]
     if args.get("verbose"):
         command.append("-v")
+    if args.get("parallel", True) and _can_parallelize(Path(test_path)):
+        command.extend(["-n", "auto", "--dist=loadfile"])
 
-    result = subprocess.run(
-        command,
-        capture_output=True,
-        text=True,
-    )
+    result = _run_captured(command, timeout=timeout)
 
     return {
         "exit_code": result.returncode,
@@ -133,17 +283,24 @@ def read_file_tool(args: dict) -> dict:
     if not file_path.exists():
         return {"error": f"File not found: {file_path}"}
 
-    content = file_path.read_text(encoding="utf-8")
-
     limit = args.get("limit")
     if limit:
-        lines = content.split("\n")[:limit]
-        content = "\n".join(lines)
+        # Stop reading once `limit` lines are collected instead of loading
+        # and splitting the whole file.
+        limit = int(limit)
+        with file_path.open("r", encoding="utf-8") as handle:
+            lines = list(islice(handle, limit))
+        content = "".join(lines)
+        if len(lines) == limit and content.endswith("\n"):
+            content = content[:-1]
+    else:
+        content = file_path.read_text(encoding="utf-8")
 
     return {
         "path": str(file_path),
         "content": content,
         "size": len(content),
+        "file_size": file_path.stat().st_size,
     }
 
 
@@ -166,13 +323,19 @@ def write_file_tool(args: dict) -> dict:
         return {"error": str(exc)}
 
     content = args.get("content", "")
-    existed = file_path.exists()
-    changed = True
-    if existed:
-        try:
-            changed = file_path.read_text(encoding="utf-8") != str(content)
-        except Exception:
-            changed = True
+    # Encode once; the same bytes are compared and written.  The file on
+    # disk is always compared: mtime/size cannot rule out a same-size edit
+    # made within the filesystem's timestamp resolution.
+    data = _encode_for_disk(str(content))
+    try:
+        changed = file_path.read_bytes() != data
+        existed = True
+    except FileNotFoundError:
+        changed = True
+        existed = False
+    except Exception:
+        changed = True
+        existed = file_path.exists()
 
     risk_level, rationale = classify_write_file_risk(
         file_path=file_path,
@@ -190,8 +353,22 @@ def write_file_tool(args: dict) -> dict:
     if approval is not None:
         return approval
 
-    file_path.parent.mkdir(parents=True, exist_ok=True)
-    file_path.write_text(content, encoding="utf-8")
+    if existed and not changed:
+        return {
+            "path": str(file_path),
+            "size": len(content),
+            "risk_level": risk_level,
+            "unchanged": True,
+        }
+
+    _ensure_parent_dir(file_path)
+    try:
+        file_path.write_bytes(data)
+    except FileNotFoundError:
+        # The directory was removed since it was cached (e.g. a target reset).
+        _MKDIR_CACHE.discard(str(file_path.parent))
+        _ensure_parent_dir(file_path)
+        file_path.write_bytes(data)
 
     return {
         "path": str(file_path),
@@ -378,33 +555,27 @@ def _has_forbidden_operators(command: str, mode: str) -> bool:
     return bool(re.search(r"(\&\&|\|\||;|`|\$\(|\||>|<)", command))
 
 
-def _run_argv(command: str, cwd: str) -> subprocess.CompletedProcess:
+def _run_argv(command: str, cwd: str, timeout: float) -> subprocess.CompletedProcess:
     parts = shlex.split(command, posix=(os.name != "nt"))
     if not parts:
         raise ValueError("No command provided")
-    return subprocess.run(parts, cwd=cwd, capture_output=True, text=True, shell=False)
+    return _run_captured(parts, cwd=cwd, timeout=timeout)
 
 
-def _run_cmd(command: str, cwd: str) -> subprocess.CompletedProcess:
-    return subprocess.run(
-        ["cmd", "/c", command], cwd=cwd, capture_output=True, text=True, shell=False
-    )
+def _run_cmd(command: str, cwd: str, timeout: float) -> subprocess.CompletedProcess:
+    return _run_captured(["cmd", "/c", command], cwd=cwd, timeout=timeout)
 
 
-def _run_powershell(command: str, cwd: str) -> subprocess.CompletedProcess:
-    return subprocess.run(
-        ["powershell", "-NoProfile", "-Command", command],
-        cwd=cwd,
-        capture_output=True,
-        text=True,
-        shell=False,
+def _run_powershell(
+    command: str, cwd: str, timeout: float
+) -> subprocess.CompletedProcess:
+    return _run_captured(
+        ["powershell", "-NoProfile", "-Command", command], cwd=cwd, timeout=timeout
     )
 
 
-def _run_sh(command: str, cwd: str) -> subprocess.CompletedProcess:
-    return subprocess.run(
-        ["/bin/sh", "-lc", command], cwd=cwd, capture_output=True, text=True, shell=False
-    )
+def _run_sh(command: str, cwd: str, timeout: float) -> subprocess.CompletedProcess:
+    return _run_captured(["/bin/sh", "-lc", command], cwd=cwd, timeout=timeout)
 
 
 @register_tool(
@@ -419,6 +590,10 @@ def _run_sh(command: str, cwd: str) -> subprocess.CompletedProcess:
                 "type": "string",
                 "description": "Execution mode: auto|argv|powershell|cmd|sh",
             },
+            "timeout": {
+                "type": "number",
+                "description": "Seconds before the command is killed (default 120)",
+            },
         },
     },
 )
@@ -427,6 +602,7 @@ def shell_tool(args: dict) -> dict:
     command = (args.get("command", "") or "").strip()
     cwd_value = args.get("cwd", str(BASE_DIR))
     mode = (args.get("mode", "auto") or "auto").strip().lower()
+    timeout = float(args.get("timeout") or DEFAULT_SHELL_TIMEOUT_SECONDS)
 
     if not _shell_tool_enabled():
         return {
@@ -479,15 +655,15 @@ def shell_tool(args: dict) -> dict:
             return approval
 
         if mode == "argv":
-            result = _run_argv(command, cwd)
+            result = _run_argv(command, cwd, timeout)
         elif mode == "powershell":
-            result = _run_powershell(command, cwd)
+            result = _run_powershell(command, cwd, timeout)
         elif mode == "cmd":
-            result = _run_cmd(command, cwd)
+            result = _run_cmd(command, cwd, timeout)
         elif mode == "sh":
             if os.name == "nt":
                 return {"error": "Mode 'sh' is not supported on Windows"}
-            result = _run_sh(command, cwd)
+            result = _run_sh(command, cwd, timeout)
         else:
             return {"error": f"Unsupported mode: {mode}"}
     except FileNotFoundError as exc:
@@ -526,16 +702,26 @@ def bash_tool(args: dict) -> dict:
     return shell_tool(args)
 
 
+# Registration (and schema compilation) happens once, at import, via the
+# @register_tool decorators above.
+_BUILTIN_TOOL_NAMES = (
+    "run_tests",
+    "read_file",
+    "write_file",
+    "web_search",
+    "git_status",
+    "git_diff",
+    "shell",
+    "bash",
+)
+
+
 def register_all_tools():
-    """Register all built-in tools."""
-    run_tests_tool
-    read_file_tool
-    write_file_tool
-    web_search_tool
-    git_status_tool
-    git_diff_tool
-    shell_tool
-    bash_tool
+    """Check that every built-in tool was registered at import."""
+    registry = get_mcp_registry()
+    missing = [name for name in _BUILTIN_TOOL_NAMES if registry.get(name) is None]
+    if missing:
+        raise RuntimeError(f"Built-in tools not registered: {', '.join(missing)}")
 
 
 def list_available_tools():
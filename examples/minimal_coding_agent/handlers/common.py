@@ -1,17 +1,37 @@
 """Shared utilities for the SPEAR minimal coding agent example."""
 
+import asyncio
+import atexit
+import concurrent.futures
+import contextlib
+import functools
+import hashlib
+import io
 import json
 import logging
 import os
 import re
 import subprocess
 import sys
-from dataclasses import asdict, dataclass
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 import httpx
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from diskcache import Cache as DiskCache
+except ImportError:
+    DiskCache = None
+
 logging.basicConfig(level=logging.INFO, format="%(name)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
@@ -31,6 +51,8 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 TARGET_DIR = BASE_DIR / "target_project"
 APP_FILE = TARGET_DIR / "app.py"
 REPORT_FILE = BASE_DIR / "latest_run_report.json"
+# BASE_DIR is already resolved; keep TARGET_DIR's str form for subprocess cwd.
+_TARGET_DIR_STR = os.fspath(TARGET_DIR)
 
 
 try:
@@ -68,6 +90,89 @@ except Exception:
     format_context_for_prompt = None
 
 
+_TOKEN_RE = re.compile(r"[A-Za-z0-9_]+")
+_WS_RE = re.compile(r"\s+")
+_INTERESTING_RE = re.compile(r"FAILED|E   |AssertionError|ZeroDivisionError|ValueError")
+# A leading ``` fence with optional language tag, and the closing fence
+# if the model remembered to emit one.
+_FENCE_RE = re.compile(r"^\s*```[\w+-]*[ \t]*\n?(.*?)\s*(?:```\s*)?$", re.DOTALL)
+_FOCUS_TOKENS = frozenset(
+    {
+        "python",
+        "pytest",
+        "valueerror",
+        "zerodivisionerror",
+        "division",
+        "zero",
+        "error",
+        "failing",
+        "test",
+        "tests",
+    }
+)
+
+# Connection limits and headers for the client shared by all web searches.
+_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+_HTTP_HEADERS = {"User-Agent": "spear-minimal-coding-agent/1.0 (educational-demo)"}
+
+
+class _SearchLoop:
+    """Background event loop owning the pooled search client.
+
+    An AsyncClient is tied to the loop that first uses it, so searches
+    from sync and async callers alike are run on this one loop; that
+    keeps the client's connections warm across calls and providers.
+    ``inflight`` maps a search key to the fetch already running for it;
+    it is only touched from the loop thread, so it needs no lock.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.client = httpx.AsyncClient(limits=_HTTP_LIMITS, headers=_HTTP_HEADERS)
+        self.inflight: Dict[str, asyncio.Task] = {}
+        self._thread = threading.Thread(
+            target=self.loop.run_forever, name="web-search", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, coro) -> concurrent.futures.Future:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def close(self) -> None:
+        try:
+            self.submit(self.client.aclose()).result(timeout=5)
+        except Exception as e:
+            logger.debug(f"Failed to close search client: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+        if not self._thread.is_alive():
+            self.loop.close()
+
+
+_SEARCH_LOOP: Optional[_SearchLoop] = None
+_SEARCH_LOOP_LOCK = threading.Lock()
+
+
+def _search_loop() -> _SearchLoop:
+    global _SEARCH_LOOP
+    with _SEARCH_LOOP_LOCK:
+        if _SEARCH_LOOP is None:
+            _SEARCH_LOOP = _SearchLoop()
+        return _SEARCH_LOOP
+
+
+def close_search_client() -> None:
+    """Close the pooled search client; the next search opens a new one."""
+    global _SEARCH_LOOP
+    with _SEARCH_LOOP_LOCK:
+        search_loop, _SEARCH_LOOP = _SEARCH_LOOP, None
+    if search_loop is not None:
+        search_loop.close()
+
+
+atexit.register(close_search_client)
+
+
 BUGGY_APP_SOURCE = '''"""Tiny target module with an intentional bug for demo purposes."""
 
 
@@ -103,7 +208,7 @@ def test_running_average_negative_count():
 """
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SearchResult:
     title: str
     url: str
@@ -111,6 +216,88 @@ class SearchResult:
     source: str
 
 
+class _SearchCache:
+    """Thread-safe LRU of recent search results that expire after ``ttl``."""
+
+    def __init__(self, max_size: int = 256, ttl: float = 300.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple[float, List[SearchResult]]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def make_key(query: str, max_results: int) -> str:
+        normalized = " ".join(query.lower().split())
+        return hashlib.md5(f"{max_results}:{normalized}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[List[SearchResult]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, results = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return list(results)
+
+    def put(self, key: str, results: List[SearchResult]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), list(results))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_SEARCH_CACHE = _SearchCache()
+
+SEARCH_CACHE_DIR = BASE_DIR / ".spear_search_cache"
+SEARCH_DISK_TTL_SECONDS = 3600
+
+
+@functools.lru_cache(maxsize=1)
+def _disk_cache():
+    """Return the on-disk search cache, or None without diskcache."""
+    if DiskCache is None:
+        return None
+    try:
+        return DiskCache(str(SEARCH_CACHE_DIR), size_limit=64 << 20)
+    except Exception as e:
+        logger.warning(f"Search disk cache unavailable: {e}")
+        return None
+
+
+def _disk_cache_get(key: str) -> Optional[List[SearchResult]]:
+    cache = _disk_cache()
+    if cache is None:
+        return None
+    try:
+        rows = cache.get(key)
+    except Exception:
+        return None
+    if not rows:
+        return None
+    return [SearchResult(*row) for row in rows]
+
+
+def _disk_cache_put(key: str, results: List[SearchResult]) -> None:
+    cache = _disk_cache()
+    if cache is None:
+        return
+    rows = [(r.title, r.url, r.snippet, r.source) for r in results]
+    try:
+        cache.set(key, rows, expire=SEARCH_DISK_TTL_SECONDS)
+    except Exception as e:
+        logger.debug(f"Failed to store search results on disk: {e}")
+
+
 def literal_to_text(value) -> str:
     if value is None:
         return ""
@@ -145,53 +332,118 @@ def literal_to_int(value, default: int = 0) -> int:
 class WebSearchTool:
     """HTTP search tool with provider fallback."""
 
+    MAX_CONCURRENT_PROBES = 12
+
     def __init__(self, timeout_seconds: float = 15.0):
         self.timeout_seconds = timeout_seconds
 
+    def __enter__(self) -> "WebSearchTool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        close_search_client()
+
     def search(self, query: str, max_results: int = 5) -> List[SearchResult]:
-        for candidate in self._query_candidates(query):
-            results = self._duckduckgo_search(candidate, max_results)
-            if results:
-                return results
+        search_loop = _search_loop()
+        return search_loop.submit(
+            self._search(search_loop, query, max_results)
+        ).result()
 
-            results = self._stack_overflow_search(candidate, max_results)
-            if results:
-                return results
+    async def search_async(
+        self, query: str, max_results: int = 5
+    ) -> List[SearchResult]:
+        search_loop = _search_loop()
+        future = search_loop.submit(self._search(search_loop, query, max_results))
+        return await asyncio.wrap_future(future)
 
-            results = self._wikipedia_search(candidate, max_results)
-            if results:
-                return results
-        return []
+    async def _search(
+        self, search_loop: _SearchLoop, query: str, max_results: int
+    ) -> List[SearchResult]:
+        """Serve ``query`` from the caches, else join or start its fetch.
+
+        Lookups go in-memory LRU, then the on-disk cache (when diskcache
+        is installed, so results survive restarts), then the network.
+        Concurrent identical searches share a single fetch, which is
+        shielded so one caller giving up does not cancel it for the rest.
+        """
+        key = _SearchCache.make_key(query, max_results)
+        cached = _SEARCH_CACHE.get(key)
+        if cached is not None:
+            return cached
+        cached = _disk_cache_get(key)
+        if cached is not None:
+            _SEARCH_CACHE.put(key, cached)
+            return cached
+
+        fetch = search_loop.inflight.get(key)
+        leader = fetch is None
+        if leader:
+            fetch = asyncio.create_task(
+                self._fetch(search_loop.client, query, max_results)
+            )
+            search_loop.inflight[key] = fetch
+            fetch.add_done_callback(lambda _task: search_loop.inflight.pop(key, None))
+
+        results = await asyncio.shield(fetch)
+        if results:
+            _SEARCH_CACHE.put(key, results)
+            if leader:
+                _disk_cache_put(key, results)
+        return list(results)
+
+    async def _fetch(
+        self, client: httpx.AsyncClient, query: str, max_results: int
+    ) -> List[SearchResult]:
+        """Probe every candidate query on every provider concurrently.
+
+        Results keep the old preference order (candidate first, then
+        DuckDuckGo, Stack Overflow, Wikipedia); probes still in flight
+        once a preferred one returns results are cancelled.
+        """
+        providers = (
+            self._duckduckgo_search,
+            self._stack_overflow_search,
+            self._wikipedia_search,
+        )
+        # At most MAX_CONCURRENT_PROBES requests are in flight; waiters are
+        # released in creation order, so preferred probes start first.
+        limit = asyncio.Semaphore(self.MAX_CONCURRENT_PROBES)
+
+        async def probe(provider, candidate: str) -> List[SearchResult]:
+            async with limit:
+                return await provider(client, candidate, max_results)
+
+        tasks = [
+            asyncio.create_task(probe(provider, candidate))
+            for candidate in self._query_candidates(query)
+            for provider in providers
+        ]
+        try:
+            for task in tasks:
+                results = await task
+                if results:
+                    return results
+            return []
+        finally:
+            for task in tasks:
+                task.cancel()
 
     @staticmethod
     def _simplify_query(query: str) -> str:
-        tokens = re.findall(r"[A-Za-z0-9_]+", query.lower())
+        tokens = _TOKEN_RE.findall(query.lower())
         keep = [token for token in tokens if len(token) > 2]
         return " ".join(keep[:8]) if keep else query
 
     def _query_candidates(self, query: str) -> List[str]:
-        tokens = re.findall(r"[A-Za-z0-9_]+", query.lower())
+        tokens = _TOKEN_RE.findall(query.lower())
         simplified = self._simplify_query(query)
 
         candidates = [query, simplified]
 
-        focused = [
-            token
-            for token in tokens
-            if token
-            in {
-                "python",
-                "pytest",
-                "valueerror",
-                "zerodivisionerror",
-                "division",
-                "zero",
-                "error",
-                "failing",
-                "test",
-                "tests",
-            }
-        ]
+        focused = [token for token in tokens if token in _FOCUS_TOKENS]
         if focused:
             candidates.append(" ".join(focused[:5]))
 
@@ -203,13 +455,17 @@ class WebSearchTool:
             candidates.append(" ".join(tokens[:4]))
 
         unique: List[str] = []
+        seen: set = set()
         for item in candidates:
             norm = item.strip()
-            if norm and norm not in unique:
+            if norm and norm not in seen:
+                seen.add(norm)
                 unique.append(norm)
         return unique
 
-    def _duckduckgo_search(self, query: str, max_results: int) -> List[SearchResult]:
+    async def _duckduckgo_search(
+        self, client: httpx.AsyncClient, query: str, max_results: int
+    ) -> List[SearchResult]:
         url = "https://api.duckduckgo.com/"
         params = {
             "q": query,
@@ -219,10 +475,11 @@ class WebSearchTool:
             "no_redirect": 1,
         }
         try:
-            with httpx.Client(timeout=self.timeout_seconds) as client:
-                response = client.get(url, params=params)
-                response.raise_for_status()
-                payload = response.json()
+            response = await client.get(
+                url, params=params, timeout=self.timeout_seconds
+            )
+            response.raise_for_status()
+            payload = loads_json(response.content)
         except Exception:
             return []
 
@@ -241,30 +498,32 @@ class WebSearchTool:
                 )
             )
 
-        def walk_topics(items) -> None:
-            for item in items:
-                if isinstance(item, dict) and "Topics" in item:
-                    walk_topics(item["Topics"])
-                    continue
-                if not isinstance(item, dict):
-                    continue
-                text = str(item.get("Text") or "")
-                first_url = str(item.get("FirstURL") or "")
-                if text and first_url:
-                    collected.append(
-                        SearchResult(
-                            title=text.split(" - ")[0],
-                            url=first_url,
-                            snippet=text,
-                            source="duckduckgo",
-                        )
+        # Depth-first over nested "Topics" groups, in document order,
+        # stopping as soon as enough results are collected.
+        pending = deque(payload.get("RelatedTopics", []))
+        while pending and len(collected) < max_results:
+            item = pending.popleft()
+            if not isinstance(item, dict):
+                continue
+            if "Topics" in item:
+                pending.extendleft(reversed(item["Topics"]))
+                continue
+            text = str(item.get("Text") or "")
+            first_url = str(item.get("FirstURL") or "")
+            if text and first_url:
+                collected.append(
+                    SearchResult(
+                        title=text.split(" - ")[0],
+                        url=first_url,
+                        snippet=text,
+                        source="duckduckgo",
                     )
+                )
 
-        walk_topics(payload.get("RelatedTopics", []))
         return collected[:max_results]
 
-    def _stack_overflow_search(
-        self, query: str, max_results: int
+    async def _stack_overflow_search(
+        self, client: httpx.AsyncClient, query: str, max_results: int
     ) -> List[SearchResult]:
         url = "https://api.stackexchange.com/2.3/search/advanced"
         params = {
@@ -275,10 +534,11 @@ class WebSearchTool:
             "pagesize": max_results,
         }
         try:
-            with httpx.Client(timeout=self.timeout_seconds) as client:
-                response = client.get(url, params=params)
-                response.raise_for_status()
-                payload = response.json()
+            response = await client.get(
+                url, params=params, timeout=self.timeout_seconds
+            )
+            response.raise_for_status()
+            payload = loads_json(response.content)
         except Exception:
             return []
 
@@ -295,7 +555,9 @@ class WebSearchTool:
             )
         return [item for item in results if item.url][:max_results]
 
-    def _wikipedia_search(self, query: str, max_results: int) -> List[SearchResult]:
+    async def _wikipedia_search(
+        self, client: httpx.AsyncClient, query: str, max_results: int
+    ) -> List[SearchResult]:
         url = "https://en.wikipedia.org/w/api.php"
         params = {
             "action": "opensearch",
@@ -304,12 +566,12 @@ class WebSearchTool:
             "namespace": 0,
             "format": "json",
         }
-        headers = {"User-Agent": "spear-minimal-coding-agent/1.0 (educational-demo)"}
         try:
-            with httpx.Client(timeout=self.timeout_seconds) as client:
-                response = client.get(url, params=params, headers=headers)
-                response.raise_for_status()
-                payload = response.json()
+            response = await client.get(
+                url, params=params, timeout=self.timeout_seconds
+            )
+            response.raise_for_status()
+            payload = loads_json(response.content)
         except Exception:
             return []
 
@@ -332,62 +594,305 @@ class WebSearchTool:
         return results[:max_results]
 
 
+def _is_within(path_value: Optional[str], prefix: str) -> bool:
+    return bool(path_value) and path_value.startswith(prefix)
+
+
+def _local_module_names(project_dir: Path) -> set:
+    names = set()
+    for entry in project_dir.iterdir():
+        if entry.suffix == ".py":
+            names.add(entry.stem)
+        elif (entry / "__init__.py").exists():
+            names.add(entry.name)
+    return names
+
+
 class PythonTestTool:
-    """Run pytest via Python subprocess without shell-specific commands."""
+    """Run pytest in a fresh Python subprocess.
+
+    Setting SPEAR_PYTEST_IN_PROCESS=true opts into running pytest inside
+    the agent's own interpreter, which skips interpreter startup but gives
+    up process isolation from the generated code under test.
+    """
+
+    # Only the tail of a very long run is kept; --maxfail=1 normally keeps
+    # pytest's output well under this.
+    MAX_OUTPUT_LINES = 2000
+    PYTEST_ARGS = ["-q", ".", "--maxfail=1", "--disable-warnings"]
 
     @staticmethod
-    def run_tests(project_dir: Path) -> Dict[str, str]:
-        command = [
-            sys.executable,
-            "-m",
-            "pytest",
-            "-q",
-            ".",
-            "--maxfail=1",
-            "--disable-warnings",
-            "--cache-clear",
-        ]
-        proc = subprocess.run(
+    def run_tests(project_dir: Path, retry: bool = False) -> Dict[str, str]:
+        """Run the project's tests, stopping at the first failure.
+
+        pytest's cache is kept between runs; with ``retry`` the tests that
+        failed last time run first, so a still-broken fix fails fast
+        while a passing run still covers the whole suite.
+        """
+        args = list(PythonTestTool.PYTEST_ARGS)
+        if retry:
+            args.append("--ff")
+        # pytest.main needs the process-wide cwd and stdout, so only the
+        # main thread may use it; worker threads keep using a subprocess.
+        if (
+            os.getenv("SPEAR_PYTEST_IN_PROCESS", "").strip().lower()
+            in {"1", "true", "yes"}
+            and threading.current_thread() is threading.main_thread()
+        ):
+            result = PythonTestTool._run_in_process(project_dir, args)
+            if result is not None:
+                return result
+        return PythonTestTool._run_subprocess(project_dir, args)
+
+    @staticmethod
+    def _run_in_process(
+        project_dir: Path, args: List[str]
+    ) -> Optional[Dict[str, str]]:
+        """Run pytest.main in this interpreter (opt-in, see the class docs).
+
+        The project's modules are evicted from ``sys.modules`` before and
+        after the run, so each run imports the files currently on disk
+        and none of them leak into, or shadow, the agent's own modules.
+        Bytecode is not written, since a rewrite within the same second
+        and of the same size would otherwise load a stale .pyc.
+        """
+        try:
+            import pytest
+        except ImportError:
+            return None
+
+        if project_dir is not TARGET_DIR:
+            project_dir = Path(project_dir).resolve()
+        shadowed = {
+            name: sys.modules.pop(name)
+            for name in _local_module_names(project_dir)
+            if name in sys.modules
+        }
+        saved_path = list(sys.path)
+        saved_dont_write_bytecode = sys.dont_write_bytecode
+        cwd = os.getcwd()
+        buffer = io.StringIO()
+        try:
+            os.chdir(project_dir)
+            sys.dont_write_bytecode = True
+            with contextlib.redirect_stdout(buffer), contextlib.redirect_stderr(
+                buffer
+            ):
+                returncode = int(pytest.main(args))
+        finally:
+            os.chdir(cwd)
+            sys.dont_write_bytecode = saved_dont_write_bytecode
+            sys.path[:] = saved_path
+            prefix = str(project_dir) + os.sep
+            for name, module in list(sys.modules.items()):
+                if _is_within(getattr(module, "__file__", None), prefix):
+                    del sys.modules[name]
+            sys.modules.update(shadowed)
+
+        tail = deque(
+            buffer.getvalue().splitlines(keepends=True),
+            maxlen=PythonTestTool.MAX_OUTPUT_LINES,
+        )
+        return {"exit_code": str(returncode), "output": "".join(tail)}
+
+    @staticmethod
+    def _run_subprocess(project_dir: Path, args: List[str]) -> Dict[str, str]:
+        command = [sys.executable, "-m", "pytest", *args]
+        cwd = _TARGET_DIR_STR if project_dir is TARGET_DIR else os.fspath(project_dir)
+        with subprocess.Popen(
             command,
-            cwd=str(project_dir),
-            capture_output=True,
+            cwd=cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
             text=True,
-            check=False,
-        )
-        combined = (proc.stdout or "") + (proc.stderr or "")
-        return {"exit_code": str(proc.returncode), "output": combined}
+            bufsize=1,
+        ) as proc:
+            tail = deque(proc.stdout, maxlen=PythonTestTool.MAX_OUTPUT_LINES)
+            returncode = proc.wait()
+        return {"exit_code": str(returncode), "output": "".join(tail)}
 
 
 def build_failure_summary(pytest_output: str) -> str:
-    lines = [line.strip() for line in pytest_output.splitlines() if line.strip()]
     interesting: List[str] = []
-    for line in lines:
-        if (
-            "FAILED" in line
-            or "E   " in line
-            or "AssertionError" in line
-            or "ZeroDivisionError" in line
-            or "ValueError" in line
-        ):
+    for raw in pytest_output.splitlines():
+        line = raw.strip()
+        if line and _INTERESTING_RE.search(line):
             interesting.append(line)
+            if len(interesting) >= 4:
+                break
     if interesting:
-        return " | ".join(interesting[:4])
+        return " | ".join(interesting)
     return "Tests failed; inspect pytest output."
 
 
 def build_search_query(task: str, failure_summary: str) -> str:
-    short_failure = re.sub(r"\s+", " ", failure_summary)[:180]
+    short_failure = _WS_RE.sub(" ", failure_summary)[:180]
     return f"Python pytest fix bug: {short_failure}. Task: {task}"
 
 
+def _strip_fences(text: str) -> str:
+    """Return ``text`` without a surrounding Markdown code fence."""
+    match = _FENCE_RE.match(text)
+    return (match.group(1) if match else text).strip()
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _parse_code_files(text: str) -> Dict[str, Any]:
+    """Decode the first JSON object in ``text``, ignoring prose around it.
+
+    Raises json.JSONDecodeError when no object can be decoded.
+    """
+    start = text.find("{")
+    if start < 0:
+        raise json.JSONDecodeError("Expected a JSON object", text, 0)
+    code_files, _end = _JSON_DECODER.raw_decode(text, start)
+    if not isinstance(code_files, dict):
+        raise json.JSONDecodeError("Expected a JSON object", text, start)
+    return code_files
+
+
+def loads_json(data) -> Any:
+    """Parse JSON from str or bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_json(value: Any, indent: bool = False) -> str:
+    """Serialize to JSON text, using orjson when it is installed."""
+    if orjson is not None:
+        try:
+            option = orjson.OPT_INDENT_2 if indent else 0
+            return orjson.dumps(value, option=option).decode("utf-8")
+        except TypeError:
+            pass
+    return json.dumps(value, indent=2 if indent else None)
+
+
 def serialize_search_results(results: List[SearchResult]) -> str:
-    return json.dumps([asdict(item) for item in results], indent=2)
+    return dumps_json(
+        [
+            {
+                "title": item.title,
+                "url": item.url,
+                "snippet": item.snippet,
+                "source": item.source,
+            }
+            for item in results
+        ],
+        indent=True,
+    )
 
 
-try:
-    from litellm import completion
-except Exception:
-    completion = None
+# litellm pulls in every provider SDK it knows about, so it is imported
+# on first use instead of with this module; search- and test-only runs
+# never pay for it.  Tests may assign ``completion`` directly.
+completion = None
+
+
+@functools.lru_cache(maxsize=1)
+def _import_litellm_completion():
+    try:
+        from litellm import completion as litellm_completion
+    except Exception:
+        return None
+    return litellm_completion
+
+
+def _get_completion():
+    return completion or _import_litellm_completion()
+
+
+@functools.lru_cache(maxsize=1)
+def _llm_config() -> tuple:
+    """Return ``(model, api_key, api_base)`` read once from the environment.
+
+    Call ``_llm_config.cache_clear()`` after changing the LITELLM_* vars.
+    """
+    model = os.getenv("LITELLM_MODEL", "gpt-4o")
+    provider = os.getenv("LITELLM_PROVIDER")
+    if provider and "/" not in model:
+        model = f"{provider}/{model}"
+    return model, os.getenv("LITELLM_API_KEY"), os.getenv("LITELLM_API_BASE")
+
+
+# Prompt templates are filled with str.format, hence the doubled braces.
+_FIX_PROMPT_TEMPLATE = """You are a Python code repair expert. Given the source code, error message, test output, and test cases, fix the bug.
+
+Source code:
+```python
+{source_code}
+```
+
+Test code:
+```python
+{test_code}
+```
+
+Error message:
+{error_message}
+
+Test output:
+{test_output}
+{context_block}
+
+Requirements from tests:
+1. running_average(10, 2) should return 5
+2. running_average(10, 0) should raise ValueError
+3. running_average(10, -1) should raise ValueError
+
+Respond with the fixed source code only. Do not include any explanation or markdown formatting. Just return the complete corrected Python file."""
+
+
+_BUILD_PROMPT_TEMPLATE = """You are a Python code generator. Given a task description, generate a complete Python project with:
+1. A main app.py file with the implementation
+2. A test_app.py file with basic tests
+
+Task: {task}
+{context_block}
+
+Requirements:
+- Create a complete, working implementation
+- Include docstrings and type hints
+- Write meaningful tests that verify the core functionality
+- Keep it simple but functional
+
+Respond with a JSON object in this format:
+{{
+  "app.py": "the complete source code for app.py",
+  "test_app.py": "the complete test code"
+}}
+
+Do not include any explanation, just return the JSON."""
+
+
+# Everything that stays the same across repair iterations comes first so
+# providers that cache prompt prefixes can reuse it.
+_REPAIR_PROMPT_TEMPLATE = """The tests failed. Fix the code to make tests pass.
+
+Respond with a JSON object with the fixed code:
+{{
+  "app.py": "fixed source code",
+  "test_app.py": "fixed test code (if needed)"
+}}
+
+Task: {task}
+
+Current app.py:
+```python
+{app_code}
+```
+
+Current test_app.py:
+```python
+{test_code}
+```
+
+Test output:
+{output}
+{iteration_context_block}"""
 
 
 def llm_fix_code(
@@ -398,16 +903,11 @@ def llm_fix_code(
     project_dir: Optional[Path] = None,
     run_id: Optional[str] = None,
 ) -> str:
+    completion = _get_completion()
     if completion is None:
         raise RuntimeError("LiteLLM not available. Install with: pip install litellm")
 
-    model = os.getenv("LITELLM_MODEL", "gpt-4o")
-    provider = os.getenv("LITELLM_PROVIDER")
-    api_key = os.getenv("LITELLM_API_KEY")
-    api_base = os.getenv("LITELLM_API_BASE")
-
-    if provider and "/" not in model:
-        model = f"{provider}/{model}"
+    model, api_key, api_base = _llm_config()
 
     if log_fix_strategy:
         try:
@@ -447,31 +947,13 @@ def llm_fix_code(
             f"\nAdditional relevant project context:\n{related_context}\n"
         )
 
-    prompt = f"""You are a Python code repair expert. Given the source code, error message, test output, and test cases, fix the bug.
-
-Source code:
-```python
-{source_code}
-```
-
-Test code:
-```python
-{test_code}
-```
-
-Error message:
-{error_message}
-
-Test output:
-{test_output}
-{context_block}
-
-Requirements from tests:
-1. running_average(10, 2) should return 5
-2. running_average(10, 0) should raise ValueError
-3. running_average(10, -1) should raise ValueError
-
-Respond with the fixed source code only. Do not include any explanation or markdown formatting. Just return the complete corrected Python file."""
+    prompt = _FIX_PROMPT_TEMPLATE.format(
+        source_code=source_code,
+        test_code=test_code,
+        error_message=error_message,
+        test_output=test_output,
+        context_block=context_block,
+    )
 
     response = completion(
         model=model,
@@ -480,14 +962,7 @@ Respond with the fixed source code only. Do not include any explanation or markd
         api_base=api_base,
         api_key=api_key,
     )
-    content = response["choices"][0]["message"]["content"].strip()
-    content = content.strip()
-    if content.startswith("```python"):
-        content = content[10:]
-    if content.startswith("```"):
-        content = content[3:]
-    if content.endswith("```"):
-        content = content[:-3]
+    content = _strip_fences(response["choices"][0]["message"]["content"])
 
     if log_fix_interaction:
         try:
@@ -507,17 +982,36 @@ Respond with the fixed source code only. Do not include any explanation or markd
     return content.strip()
 
 
+def _write_generated_file(
+    path: Path, code: str, task: str, run_id: Optional[str]
+) -> bool:
+    """Write generated ``code`` and log the artifact change.
+
+    Returns False, without touching the file or the log, when it already
+    holds exactly ``code``.
+    """
+    previous = path.read_text(encoding="utf-8") if path.exists() else None
+    if code == previous:
+        return False
+    path.write_text(code, encoding="utf-8")
+
+    if log_file_created or log_file_modified:
+        try:
+            if previous:
+                log_file_modified(str(path), code, previous, task=task, run_id=run_id)
+            else:
+                log_file_created(str(path), code, task=task, run_id=run_id)
+        except Exception as e:
+            logger.warning(f"Failed to log artifact change: {e}")
+    return True
+
+
 def llm_build_code(task: str, project_dir: Path, run_id: Optional[str] = None) -> dict:
+    completion = _get_completion()
     if completion is None:
         raise RuntimeError("LiteLLM not available. Install with: pip install litellm")
 
-    model = os.getenv("LITELLM_MODEL", "gpt-4o")
-    provider = os.getenv("LITELLM_PROVIDER")
-    api_key = os.getenv("LITELLM_API_KEY")
-    api_base = os.getenv("LITELLM_API_BASE")
-
-    if provider and "/" not in model:
-        model = f"{provider}/{model}"
+    model, api_key, api_base = _llm_config()
 
     steps = []
 
@@ -571,26 +1065,10 @@ def llm_build_code(task: str, project_dir: Path, run_id: Optional[str] = None) -
             f"\nExisting relevant project context (if any):\n{related_context}\n"
         )
 
-    prompt = f"""You are a Python code generator. Given a task description, generate a complete Python project with:
-1. A main app.py file with the implementation
-2. A test_app.py file with basic tests
-
-Task: {task}
-{context_block}
-
-Requirements:
-- Create a complete, working implementation
-- Include docstrings and type hints
-- Write meaningful tests that verify the core functionality
-- Keep it simple but functional
-
-Respond with a JSON object in this format:
-{{
-  "app.py": "the complete source code for app.py",
-  "test_app.py": "the complete test code"
-}}
-
-Do not include any explanation, just return the JSON."""
+    prompt = _BUILD_PROMPT_TEMPLATE.format(
+        task=task,
+        context_block=context_block,
+    )
 
     response = completion(
         model=model,
@@ -602,15 +1080,8 @@ Do not include any explanation, just return the JSON."""
     content = response["choices"][0]["message"]["content"].strip()
 
     try:
-        content = content.strip()
-        if content.startswith("```json"):
-            content = content[7:]
-        if content.startswith("```"):
-            content = content[3:]
-        if content.endswith("```"):
-            content = content[:-3]
-
-        code_files = json.loads(content.strip())
+        content = _strip_fences(content)
+        code_files = _parse_code_files(content)
         app_code = code_files.get("app.py", "")
         test_code = code_files.get("test_app.py", "")
     except json.JSONDecodeError:
@@ -622,41 +1093,8 @@ Do not include any explanation, just return the JSON."""
     app_file = project_dir / "app.py"
     test_file = project_dir / "test_app.py"
 
-    previous_app = None
-    previous_test = None
-    if app_file.exists():
-        previous_app = app_file.read_text(encoding="utf-8")
-    if test_file.exists():
-        previous_test = test_file.read_text(encoding="utf-8")
-
-    app_file.write_text(app_code, encoding="utf-8")
-    test_file.write_text(test_code, encoding="utf-8")
-
-    if log_file_created or log_file_modified:
-        try:
-            if previous_app:
-                log_file_modified(
-                    str(app_file),
-                    app_code,
-                    previous_app,
-                    task=task,
-                    run_id=run_id,
-                )
-            else:
-                log_file_created(str(app_file), app_code, task=task, run_id=run_id)
-
-            if previous_test:
-                log_file_modified(
-                    str(test_file),
-                    test_code,
-                    previous_test,
-                    task=task,
-                    run_id=run_id,
-                )
-            else:
-                log_file_created(str(test_file), test_code, task=task, run_id=run_id)
-        except Exception as e:
-            logger.warning(f"Failed to log artifact change: {e}")
+    _write_generated_file(app_file, app_code, task, run_id)
+    _write_generated_file(test_file, test_code, task, run_id)
 
     steps.append({"stage": "files_written", "files": ["app.py", "test_app.py"]})
 
@@ -693,27 +1131,13 @@ Do not include any explanation, just return the JSON."""
                 except Exception as e:
                     logger.warning(f"Failed to build iteration context: {e}")
 
-            fix_prompt = f"""The tests failed. Fix the code to make tests pass.
-
-Current app.py:
-```python
-{app_code}
-```
-
-Current test_app.py:
-```python
-{test_code}
-```
-
-Test output:
-{output}
-{iteration_context_block}
-
-Respond with a JSON object with the fixed code:
-{{
-  "app.py": "fixed source code",
-  "test_app.py": "fixed test code (if needed)"
-}}"""
+            fix_prompt = _REPAIR_PROMPT_TEMPLATE.format(
+                task=task,
+                app_code=app_code,
+                test_code=test_code,
+                output=output,
+                iteration_context_block=iteration_context_block,
+            )
 
             response = completion(
                 model=model,
@@ -725,66 +1149,24 @@ Respond with a JSON object with the fixed code:
             content = response["choices"][0]["message"]["content"].strip()
 
             try:
-                if content.startswith("```json"):
-                    content = content[7:]
-                if content.startswith("```"):
-                    content = content[3:]
-                if content.endswith("```"):
-                    content = content[:-3]
-
-                code_files = json.loads(content.strip())
+                content = _strip_fences(content)
+                code_files = _parse_code_files(content)
                 app_code = code_files.get("app.py", app_code)
                 test_code = code_files.get("test_app.py", test_code)
 
-                previous_app = (
-                    app_file.read_text(encoding="utf-8") if app_file.exists() else None
+                iteration_task = f"{task} (iteration {iteration})"
+                app_changed = _write_generated_file(
+                    app_file, app_code, iteration_task, run_id
                 )
-                previous_test = (
-                    test_file.read_text(encoding="utf-8")
-                    if test_file.exists()
-                    else None
+                test_changed = _write_generated_file(
+                    test_file, test_code, iteration_task, run_id
                 )
+                if not (app_changed or test_changed):
+                    # Same code as the last run: the tests would fail again.
+                    steps.append({"stage": "no_change", "iteration": iteration})
+                    continue
 
-                app_file.write_text(app_code, encoding="utf-8")
-                test_file.write_text(test_code, encoding="utf-8")
-
-                if log_file_created or log_file_modified:
-                    try:
-                        if previous_app:
-                            log_file_modified(
-                                str(app_file),
-                                app_code,
-                                previous_app,
-                                task=f"{task} (iteration {iteration})",
-                                run_id=run_id,
-                            )
-                        else:
-                            log_file_created(
-                                str(app_file),
-                                app_code,
-                                task=f"{task} (iteration {iteration})",
-                                run_id=run_id,
-                            )
-
-                        if previous_test:
-                            log_file_modified(
-                                str(test_file),
-                                test_code,
-                                previous_test,
-                                task=f"{task} (iteration {iteration})",
-                                run_id=run_id,
-                            )
-                        else:
-                            log_file_created(
-                                str(test_file),
-                                test_code,
-                                task=f"{task} (iteration {iteration})",
-                                run_id=run_id,
-                            )
-                    except Exception as e:
-                        logger.warning(f"Failed to log artifact change: {e}")
-
-                test_result = PythonTestTool.run_tests(project_dir)
+                test_result = PythonTestTool.run_tests(project_dir, retry=True)
                 exit_code = test_result["exit_code"]
                 output = test_result["output"]
 
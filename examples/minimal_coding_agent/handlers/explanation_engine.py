@@ -4,6 +4,7 @@ This module generates natural language explanations from provenance data,
 enabling the agent to explain its decisions and actions.
 """
 
+import heapq
 import os
 from datetime import datetime
 from pathlib import Path
@@ -11,6 +12,8 @@ from typing import Any, Dict, List, Optional
 
 from rdflib import Graph, Literal, Namespace, RDF, RDFS, URIRef, XSD
 
+from .artifact_tracker import flush_artifact_graph
+from .rdf_utils import GraphLog, load_graph_cached
 from .redaction import redact_text
 
 try:
@@ -70,45 +73,41 @@ def _filter_subjects_by_run_id(
     return filtered
 
 
+def _load_log_graph(path: Path) -> Optional[Graph]:
+    return load_graph_cached(path, journal=GraphLog.journal_path(path))
+
+
 def _load_all_graphs() -> Dict[str, Graph]:
-    """Load all provenance graphs."""
+    """Load all provenance graphs.
+
+    Files are parsed through load_graph_cached, so repeated explanations
+    only re-parse logs that changed on disk.  Journaled logs are read as
+    snapshot plus journal, so entries not yet compacted (including those
+    left by a crashed or different process) are included without
+    rewriting any snapshot.
+    """
     graphs = {}
 
-    session_path = BASE_DIR / "session_history.ttl"
-    if session_path.exists():
-        g = Graph()
-        g.parse(session_path, format="turtle")
-        graphs["session"] = g
-
-    reports_path = BASE_DIR / "run_reports.ttl"
-    if reports_path.exists():
-        g = Graph()
-        g.parse(reports_path, format="turtle")
-        graphs["reports"] = g
-
-    llm_path = BASE_DIR / "llm_interactions.ttl"
-    if llm_path.exists():
-        g = Graph()
-        g.parse(llm_path, format="turtle")
-        graphs["llm"] = g
-
-    artifact_path = BASE_DIR / "artifact_changes.ttl"
-    if artifact_path.exists():
-        g = Graph()
-        g.parse(artifact_path, format="turtle")
-        graphs["artifacts"] = g
-
-    reasoning_path = BASE_DIR / "reasoning_trace.ttl"
-    if reasoning_path.exists():
-        g = Graph()
-        g.parse(reasoning_path, format="turtle")
-        graphs["reasoning"] = g
-
-    approval_path = BASE_DIR / "approval_events.ttl"
-    if approval_path.exists():
-        g = Graph()
-        g.parse(approval_path, format="turtle")
-        graphs["approval"] = g
+    # The artifact journal is written by a background thread; wait for
+    # queued entries to reach the file.
+    flush_artifact_graph()
+    for name, filename in (
+        ("session", "session_history.ttl"),
+        ("llm", "llm_interactions.ttl"),
+        ("artifacts", "artifact_changes.ttl"),
+        ("reasoning", "reasoning_trace.ttl"),
+    ):
+        g = _load_log_graph(BASE_DIR / filename)
+        if g is not None and len(g):
+            graphs[name] = g
+
+    for name, filename in (
+        ("reports", "run_reports.ttl"),
+        ("approval", "approval_events.ttl"),
+    ):
+        g = load_graph_cached(BASE_DIR / filename)
+        if g is not None:
+            graphs[name] = g
 
     return graphs
 
@@ -227,11 +226,11 @@ def explain_last_run(run_id: Optional[str] = None) -> str:
             )
 
         if artifacts:
-            artifacts = sorted(
-                artifacts, key=lambda x: str(art_g.value(x, ART.timestamp) or "")
+            latest = heapq.nlargest(
+                5, artifacts, key=lambda x: str(art_g.value(x, ART.timestamp) or "")
             )
             parts.append("\n### Files Changed:")
-            for artifact in artifacts[-5:]:
+            for artifact in reversed(latest):
                 path = art_g.value(artifact, ART.filePath)
                 operation = art_g.value(artifact, ART.operation)
                 lines_added = art_g.value(artifact, ART.linesAdded)
@@ -256,12 +255,13 @@ def explain_last_run(run_id: Optional[str] = None) -> str:
             )
 
         if decisions:
-            decisions = sorted(
+            latest = heapq.nlargest(
+                3,
                 decisions,
                 key=lambda x: str(reason_g.value(x, REASON.timestamp) or ""),
             )
             parts.append("\n### Reasoning:")
-            for decision in decisions[-3:]:
+            for decision in reversed(latest):
                 dtype = reason_g.value(decision, REASON.decisionType)
                 rationale = reason_g.value(decision, REASON.rationale)
                 if dtype and rationale:
@@ -277,12 +277,13 @@ def explain_last_run(run_id: Optional[str] = None) -> str:
                 approval_g, events, report_run_id, [APPROVAL.runId]
             )
         if events:
-            events = sorted(
+            latest = heapq.nlargest(
+                5,
                 events,
                 key=lambda x: str(approval_g.value(x, APPROVAL.timestamp) or ""),
             )
             parts.append("\n### Approvals:")
-            for event in events[-5:]:
+            for event in reversed(latest):
                 action = approval_g.value(event, APPROVAL.action)
                 decision = approval_g.value(event, APPROVAL.decision)
                 risk = approval_g.value(event, APPROVAL.riskLevel)
@@ -1,5 +1,6 @@
 """RDF-based LLM interaction tracker for detailed provenance."""
 
+import functools
 import os
 from datetime import datetime
 from pathlib import Path
@@ -7,6 +8,12 @@ from typing import Any, Dict, List, Optional
 
 from rdflib import Graph, Literal, Namespace, RDF, RDFS, URIRef, XSD
 
+from .rdf_utils import (
+    GraphLog,
+    graph_store,
+    interned_literal,
+    truncate_text,
+)
 from .redaction import redact_object, redact_text
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -28,29 +35,82 @@ _namespaces = {
 }
 
 
+# Terms written on every log call. Namespace attribute access and Literal
+# construction are comparatively expensive in rdflib, so build them once.
+_LLM_BASE = str(LLM)
+_P_TIMESTAMP = LLM.timestamp
+_P_MODEL = LLM.model
+_P_RUN_ID = LLM.runId
+_P_PROMPT = LLM.prompt
+_P_RESPONSE = LLM.response
+_P_TEMPERATURE = LLM.temperature
+_P_FINISH_REASON = LLM.finishReason
+_P_TASK = LLM.task
+_P_SUCCESS = LLM.success
+_P_SOURCE_CODE = LLM.sourceCode
+_P_ERROR_MESSAGE = LLM.errorMessage
+_P_CALLED_AT = LLM.calledAt
+_TOOL_CALL = TOOL.Call
+_P_TOOL_NAME = TOOL.name
+_P_TOOL_ARGUMENTS = TOOL.arguments
+_P_TOOL_RESULT = TOOL.result
+_LIT_TRUE = Literal(True, datatype=XSD.boolean)
+_LIT_FALSE = Literal(False, datatype=XSD.boolean)
+
+
+@functools.lru_cache(maxsize=64)
+def _usage_predicate(key: str) -> URIRef:
+    return LLM[f"usage_{key}"]
+
+
 def _create_llm_log_graph() -> Graph:
-    g = Graph()
+    g = Graph(store=graph_store())
     for prefix, ns in _namespaces.items():
         g.bind(prefix, ns)
     return g
 
 
+_LOG = GraphLog(lambda: LLM_LOG_PATH, _create_llm_log_graph, LLM.timestamp)
+_INTERACTION_TYPES = (LLM.Interaction, LLM.BuildInteraction, LLM.FixInteraction)
+
+
 def load_llm_log_graph() -> Graph:
-    g = _create_llm_log_graph()
-    if LLM_LOG_PATH.exists():
-        g.parse(LLM_LOG_PATH, format="turtle")
-    return g
+    return _LOG.load(LLM_LOG_PATH)
 
 
 def save_llm_log_graph(g: Graph) -> None:
     g.serialize(LLM_LOG_PATH, format="turtle")
 
 
-def _get_interaction_count(g: Graph) -> int:
-    subjects = set(g.subjects(RDF.type, LLM.Interaction))
-    subjects.update(g.subjects(RDF.type, LLM.BuildInteraction))
-    subjects.update(g.subjects(RDF.type, LLM.FixInteraction))
-    return len(subjects)
+def flush_llm_log() -> None:
+    """Write any buffered interactions to LLM_LOG_PATH."""
+    _LOG.flush()
+
+
+def _record_interaction(
+    kind: str,
+    rdf_type: URIRef,
+    fields: List[tuple],
+    tool_calls: Optional[List[List[tuple]]] = None,
+) -> URIRef:
+    """Add one interaction (and its tool calls) to the log graph.
+
+    ``fields`` are ``(predicate, object)`` pairs built by the caller
+    outside the lock; only minting the id and adding happen under it.
+    """
+    with _LOG.lock:
+        # Interactions, builds and fixes share one id sequence.
+        interaction_id = _LOG.next_id("interaction", _INTERACTION_TYPES)
+        interaction_uri = URIRef(f"{_LLM_BASE}{kind}/{interaction_id}")
+        triples = [(interaction_uri, RDF.type, rdf_type)]
+        triples.extend((interaction_uri, p, o) for p, o in fields)
+        for idx, tool_fields in enumerate(tool_calls or []):
+            tool_uri = URIRef(f"{interaction_uri}/tool/{idx}")
+            triples.append((tool_uri, RDF.type, _TOOL_CALL))
+            triples.append((tool_uri, _P_CALLED_AT, interaction_uri))
+            triples.extend((tool_uri, p, o) for p, o in tool_fields)
+        _LOG.add(triples)
+    return interaction_uri
 
 
 def log_llm_interaction(
@@ -62,7 +122,6 @@ def log_llm_interaction(
     run_id: Optional[str] = None,
 ) -> str:
     """Log an LLM interaction to RDF."""
-    g = load_llm_log_graph()
     metadata = redact_object(metadata or {})
     if not isinstance(metadata, dict):
         metadata = {}
@@ -72,63 +131,48 @@ def log_llm_interaction(
     prompt = redact_text(prompt)
     response = redact_text(response)
 
-    interaction_id = _get_interaction_count(g)
-    interaction_uri = LLM[f"interaction/{interaction_id}"]
-
-    g.add((interaction_uri, RDF.type, LLM.Interaction))
-    g.add(
-        (
-            interaction_uri,
-            LLM.timestamp,
-            Literal(datetime.now().isoformat(), datatype=XSD.dateTime),
-        )
-    )
-    g.add((interaction_uri, LLM.model, Literal(model)))
+    fields = [
+        (_P_TIMESTAMP, Literal(datetime.now().isoformat(), datatype=XSD.dateTime)),
+        (_P_MODEL, interned_literal(model)),
+    ]
     if run_id:
-        g.add((interaction_uri, LLM.runId, Literal(run_id)))
+        fields.append((_P_RUN_ID, interned_literal(run_id)))
 
-    if len(prompt) > 5000:
-        prompt = prompt[:5000] + "... [truncated]"
-    g.add((interaction_uri, LLM.prompt, Literal(prompt)))
+    fields.append((_P_PROMPT, Literal(truncate_text(prompt, 5000))))
 
-    if len(response) > 10000:
-        response = response[:10000] + "... [truncated]"
-    g.add((interaction_uri, LLM.response, Literal(response)))
+    fields.append((_P_RESPONSE, Literal(truncate_text(response, 10000))))
 
     if metadata:
         if "temperature" in metadata:
-            g.add((interaction_uri, LLM.temperature, Literal(metadata["temperature"])))
+            fields.append((_P_TEMPERATURE, Literal(metadata["temperature"])))
         if "usage" in metadata:
             usage = metadata["usage"]
             if isinstance(usage, dict):
                 for key, value in usage.items():
-                    g.add((interaction_uri, LLM[f"usage_{key}"], Literal(str(value))))
+                    fields.append((_usage_predicate(key), Literal(str(value))))
         if "finish_reason" in metadata:
-            g.add(
-                (interaction_uri, LLM.finishReason, Literal(metadata["finish_reason"]))
-            )
-
-    if tool_calls:
-        for idx, tool_call in enumerate(tool_calls):
-            tool_uri = LLM[f"interaction/{interaction_id}/tool/{idx}"]
-            g.add((tool_uri, RDF.type, TOOL.Call))
-            g.add((tool_uri, LLM.calledAt, interaction_uri))
-
-            if "name" in tool_call:
-                g.add((tool_uri, TOOL.name, Literal(tool_call["name"])))
-            if "arguments" in tool_call:
-                args = tool_call["arguments"]
-                if isinstance(args, str) and len(args) > 1000:
-                    args = args[:1000] + "... [truncated]"
-                g.add((tool_uri, TOOL.arguments, Literal(str(args))))
-            if "result" in tool_call:
-                result = tool_call["result"]
-                if isinstance(result, str) and len(result) > 2000:
-                    result = result[:2000] + "... [truncated]"
-                g.add((tool_uri, TOOL.result, Literal(str(result))))
-
-    save_llm_log_graph(g)
-
+            fields.append((_P_FINISH_REASON, Literal(metadata["finish_reason"])))
+
+    tool_fields = []
+    for tool_call in tool_calls:
+        call_fields = []
+        if "name" in tool_call:
+            call_fields.append((_P_TOOL_NAME, Literal(tool_call["name"])))
+        if "arguments" in tool_call:
+            args = tool_call["arguments"]
+            if isinstance(args, str):
+                args = truncate_text(args, 1000)
+            call_fields.append((_P_TOOL_ARGUMENTS, Literal(str(args))))
+        if "result" in tool_call:
+            result = tool_call["result"]
+            if isinstance(result, str):
+                result = truncate_text(result, 2000)
+            call_fields.append((_P_TOOL_RESULT, Literal(str(result))))
+        tool_fields.append(call_fields)
+
+    interaction_uri = _record_interaction(
+        "interaction", LLM.Interaction, fields, tool_fields
+    )
     return str(interaction_uri)
 
 
@@ -142,7 +186,6 @@ def log_build_interaction(
     run_id: Optional[str] = None,
 ) -> str:
     """Log a build code LLM interaction."""
-    g = load_llm_log_graph()
     metadata = redact_object(metadata or {})
     if not isinstance(metadata, dict):
         metadata = {}
@@ -150,42 +193,29 @@ def log_build_interaction(
     prompt = redact_text(prompt)
     response = redact_text(response)
 
-    interaction_id = _get_interaction_count(g)
-    interaction_uri = LLM[f"build/{interaction_id}"]
-
-    g.add((interaction_uri, RDF.type, LLM.BuildInteraction))
-    g.add(
-        (
-            interaction_uri,
-            LLM.timestamp,
-            Literal(datetime.now().isoformat(), datatype=XSD.dateTime),
-        )
-    )
-    g.add((interaction_uri, LLM.model, Literal(model)))
-    g.add((interaction_uri, LLM.task, Literal(task)))
-    g.add((interaction_uri, LLM.success, Literal(success, datatype=XSD.boolean)))
+    fields = [
+        (_P_TIMESTAMP, Literal(datetime.now().isoformat(), datatype=XSD.dateTime)),
+        (_P_MODEL, interned_literal(model)),
+        (_P_TASK, Literal(task)),
+        (_P_SUCCESS, _LIT_TRUE if success else _LIT_FALSE),
+    ]
     if run_id:
-        g.add((interaction_uri, LLM.runId, Literal(run_id)))
+        fields.append((_P_RUN_ID, interned_literal(run_id)))
 
-    if len(prompt) > 5000:
-        prompt = prompt[:5000] + "... [truncated]"
-    g.add((interaction_uri, LLM.prompt, Literal(prompt)))
+    fields.append((_P_PROMPT, Literal(truncate_text(prompt, 5000))))
 
-    if len(response) > 10000:
-        response = response[:10000] + "... [truncated]"
-    g.add((interaction_uri, LLM.response, Literal(response)))
+    fields.append((_P_RESPONSE, Literal(truncate_text(response, 10000))))
 
     if metadata:
         if "temperature" in metadata:
-            g.add((interaction_uri, LLM.temperature, Literal(metadata["temperature"])))
+            fields.append((_P_TEMPERATURE, Literal(metadata["temperature"])))
         if "usage" in metadata:
             usage = metadata["usage"]
             if isinstance(usage, dict):
                 for key, value in usage.items():
-                    g.add((interaction_uri, LLM[f"usage_{key}"], Literal(str(value))))
-
-    save_llm_log_graph(g)
+                    fields.append((_usage_predicate(key), Literal(str(value))))
 
+    interaction_uri = _record_interaction("build", LLM.BuildInteraction, fields)
     return str(interaction_uri)
 
 
@@ -200,7 +230,6 @@ def log_fix_interaction(
     run_id: Optional[str] = None,
 ) -> str:
     """Log a fix code LLM interaction."""
-    g = load_llm_log_graph()
     metadata = redact_object(metadata or {})
     if not isinstance(metadata, dict):
         metadata = {}
@@ -209,113 +238,60 @@ def log_fix_interaction(
     prompt = redact_text(prompt)
     response = redact_text(response)
 
-    interaction_id = _get_interaction_count(g)
-    interaction_uri = LLM[f"fix/{interaction_id}"]
-
-    g.add((interaction_uri, RDF.type, LLM.FixInteraction))
-    g.add(
-        (
-            interaction_uri,
-            LLM.timestamp,
-            Literal(datetime.now().isoformat(), datatype=XSD.dateTime),
-        )
-    )
-    g.add((interaction_uri, LLM.model, Literal(model)))
-    g.add((interaction_uri, LLM.success, Literal(success, datatype=XSD.boolean)))
+    fields = [
+        (_P_TIMESTAMP, Literal(datetime.now().isoformat(), datatype=XSD.dateTime)),
+        (_P_MODEL, interned_literal(model)),
+        (_P_SUCCESS, _LIT_TRUE if success else _LIT_FALSE),
+    ]
     if run_id:
-        g.add((interaction_uri, LLM.runId, Literal(run_id)))
+        fields.append((_P_RUN_ID, interned_literal(run_id)))
 
-    if len(source_code) > 2000:
-        source_code = source_code[:2000] + "... [truncated]"
-    g.add((interaction_uri, LLM.sourceCode, Literal(source_code)))
+    fields.append((_P_SOURCE_CODE, Literal(truncate_text(source_code, 2000))))
 
-    if len(error_message) > 1000:
-        error_message = error_message[:1000] + "... [truncated]"
-    g.add((interaction_uri, LLM.errorMessage, Literal(error_message)))
+    fields.append((_P_ERROR_MESSAGE, Literal(truncate_text(error_message, 1000))))
 
-    if len(prompt) > 3000:
-        prompt = prompt[:3000] + "... [truncated]"
-    g.add((interaction_uri, LLM.prompt, Literal(prompt)))
+    fields.append((_P_PROMPT, Literal(truncate_text(prompt, 3000))))
 
-    if len(response) > 5000:
-        response = response[:5000] + "... [truncated]"
-    g.add((interaction_uri, LLM.response, Literal(response)))
+    fields.append((_P_RESPONSE, Literal(truncate_text(response, 5000))))
 
     if metadata:
         if "temperature" in metadata:
-            g.add((interaction_uri, LLM.temperature, Literal(metadata["temperature"])))
-
-    save_llm_log_graph(g)
+            fields.append((_P_TEMPERATURE, Literal(metadata["temperature"])))
 
+    interaction_uri = _record_interaction("fix", LLM.FixInteraction, fields)
     return str(interaction_uri)
 
 
 def get_interactions(limit: int = 20) -> List[Dict[str, Any]]:
     """Get recent LLM interactions."""
-    g = load_llm_log_graph()
+    rows = _LOG.cached(("interactions", limit), lambda g: _get_interactions(g, limit))
+    return [dict(row) for row in rows]
 
-    interactions = []
-    for interaction in g.subjects(RDF.type, LLM.Interaction):
-        data = {
-            "uri": str(interaction),
-            "timestamp": str(g.value(interaction, LLM.timestamp) or ""),
-            "model": str(g.value(interaction, LLM.model) or ""),
-            "prompt": redact_text(str(g.value(interaction, LLM.prompt) or "")),
-            "response": redact_text(str(g.value(interaction, LLM.response) or "")),
-        }
-        run_id = g.value(interaction, LLM.runId)
-        if run_id:
-            data["run_id"] = str(run_id)
-        success = g.value(interaction, LLM.success)
-        if success:
-            data["success"] = str(success).lower() == "true"
-        interactions.append(data)
 
-    for interaction in g.subjects(RDF.type, LLM.BuildInteraction):
-        data = {
-            "uri": str(interaction),
-            "timestamp": str(g.value(interaction, LLM.timestamp) or ""),
-            "model": str(g.value(interaction, LLM.model) or ""),
-            "prompt": redact_text(str(g.value(interaction, LLM.prompt) or "")),
-            "response": redact_text(str(g.value(interaction, LLM.response) or "")),
-            "task": redact_text(str(g.value(interaction, LLM.task) or "")),
-        }
-        run_id = g.value(interaction, LLM.runId)
-        if run_id:
-            data["run_id"] = str(run_id)
-        success = g.value(interaction, LLM.success)
-        if success:
-            data["success"] = str(success).lower() == "true"
-        interactions.append(data)
-
-    for interaction in g.subjects(RDF.type, LLM.FixInteraction):
+def _get_interactions(g: Graph, limit: int) -> List[Dict[str, Any]]:
+    interactions = []
+    for interaction in _LOG.recent(_INTERACTION_TYPES, limit):
+        # One index walk per row instead of a g.value probe per field.
+        po = dict(g.predicate_objects(interaction))
         data = {
             "uri": str(interaction),
-            "timestamp": str(g.value(interaction, LLM.timestamp) or ""),
-            "model": str(g.value(interaction, LLM.model) or ""),
-            "prompt": redact_text(str(g.value(interaction, LLM.prompt) or "")),
-            "response": redact_text(str(g.value(interaction, LLM.response) or "")),
+            "timestamp": str(po.get(_P_TIMESTAMP, "")),
+            "model": str(po.get(_P_MODEL, "")),
+            "prompt": redact_text(str(po.get(_P_PROMPT, ""))),
+            "response": redact_text(str(po.get(_P_RESPONSE, ""))),
         }
-        run_id = g.value(interaction, LLM.runId)
+        if po.get(RDF.type) == LLM.BuildInteraction:
+            data["task"] = redact_text(str(po.get(_P_TASK, "")))
+        run_id = po.get(_P_RUN_ID)
         if run_id:
             data["run_id"] = str(run_id)
-        success = g.value(interaction, LLM.success)
+        success = po.get(_P_SUCCESS)
         if success:
             data["success"] = str(success).lower() == "true"
         interactions.append(data)
-
-    interactions.sort(key=lambda x: x["timestamp"], reverse=True)
-    return interactions[:limit]
+    return interactions
 
 
 def query_interactions(sparql: str) -> List[Dict[str, Any]]:
     """Query LLM interactions with custom SPARQL."""
-    g = load_llm_log_graph()
-
-    results = []
-    for row in g.query(sparql):
-        result = {}
-        for var in row.labels:
-            result[var] = str(row[var]) if row[var] else None
-        results.append(result)
-    return results
+    return _LOG.query(sparql)
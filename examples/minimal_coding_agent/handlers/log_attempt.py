@@ -1,12 +1,6 @@
 """Handler that logs fix attempts to RDF for history-aware retries."""
 
-from datetime import datetime
-from pathlib import Path
-
-from rdflib import Graph, Literal, Namespace, RDF, URIRef, XSD
-
-AG = Namespace("http://example.org/agent/")
-PROC = Namespace("http://example.org/process/")
+from .session_history import add_attempt
 
 
 def handle(context) -> None:
@@ -24,39 +18,15 @@ def handle(context) -> None:
     output = result["output"][:500]
     exit_code = result["exit_code"]
 
-    history_path = Path(__file__).resolve().parent.parent / "session_history.ttl"
-    g = Graph()
-    if history_path.exists():
-        try:
-            g.parse(history_path, format="turtle")
-        except Exception:
-            pass
-
-    run_count = len(list(g.subjects(RDF.type, AG.Attempt)))
-    run_uri = URIRef(f"http://example.org/session/attempt/{run_count}")
-
-    g.add((run_uri, RDF.type, AG.Attempt))
-    g.add((run_uri, AG.command, Literal("solve")))
-    g.add((run_uri, AG.task, Literal(str(task)[:200])))
-    g.add((run_uri, AG.success, Literal(str(success).lower())))
-    g.add((run_uri, AG.exitCode, Literal(exit_code)))
-    g.add((run_uri, AG.errorType, Literal(error_type)))
-    g.add((run_uri, AG.strategy, Literal(strategy)))
-    g.add((run_uri, AG.attempt, Literal(attempt)))
-    g.add((run_uri, AG.outputSummary, Literal(output)))
-    if run_id:
-        g.add((run_uri, AG.runId, Literal(str(run_id))))
-    g.add(
-        (
-            run_uri,
-            AG.timestamp,
-            Literal(datetime.now().isoformat(), datatype=XSD.dateTime),
-        )
+    run_count = add_attempt(
+        task,
+        success,
+        exit_code,
+        error_type,
+        strategy,
+        attempt,
+        output,
+        run_id=run_id,
     )
 
-    try:
-        g.serialize(history_path, format="turtle")
-    except Exception:
-        pass
-
     context.set_variable("attempt_logged", f"Logged run {run_count} to RDF")
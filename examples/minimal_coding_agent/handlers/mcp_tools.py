@@ -7,20 +7,40 @@ This module enables:
 """
 
 import json
+import logging
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional
 
 from rdflib import Graph, Literal, Namespace, RDF, URIRef, XSD
+from rdflib.plugins.sparql import prepareQuery
 
+from .rdf_utils import GraphLog, graph_store, interned_literal, truncate_text
 from .redaction import redact_object, redact_text
 
+logger = logging.getLogger(__name__)
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 MCP_LOG_PATH = BASE_DIR / "mcp_calls.ttl"
 
 AG = Namespace("http://example.org/agent/")
 MCP = Namespace("http://example.org/mcp/")
 
+# Terms written on every call. Namespace attribute access and Literal
+# construction are comparatively expensive in rdflib, so build them once.
+_MCP_BASE = str(MCP)
+_CALL = MCP.Call
+_P_TIMESTAMP = MCP.timestamp
+_P_TOOL_NAME = MCP.toolName
+_P_ARGUMENTS = MCP.arguments
+_P_STATUS = MCP.status
+_P_RESULT = MCP.result
+_P_ERROR = MCP.error
+_P_EXCEPTION = MCP.exception
+_STATUS_SUCCESS = Literal("success")
+_STATUS_ERROR = Literal("error")
+_STATUS_EXCEPTION = Literal("exception")
+
 _namespaces = {
     "ag": AG,
     "mcp": MCP,
@@ -28,40 +48,132 @@ _namespaces = {
     "xsd": XSD,
 }
 
+# Histograms for get_mcp_summary, computed by the store in one grouped pass.
+_CALLS_BY_TOOL = prepareQuery(
+    "SELECT ?key (COUNT(?call) AS ?n) "
+    "WHERE { ?call a mcp:Call ; mcp:toolName ?key } GROUP BY ?key",
+    initNs=_namespaces,
+)
+_CALLS_BY_STATUS = prepareQuery(
+    "SELECT ?key (COUNT(?call) AS ?n) "
+    "WHERE { ?call a mcp:Call ; mcp:status ?key } GROUP BY ?key",
+    initNs=_namespaces,
+)
+
 
 def _create_mcp_graph() -> Graph:
-    g = Graph()
+    g = Graph(store=graph_store())
     for prefix, ns in _namespaces.items():
         g.bind(prefix, ns)
     return g
 
 
+_LOG = GraphLog(lambda: MCP_LOG_PATH, _create_mcp_graph, MCP.timestamp)
+
+
 def load_mcp_graph() -> Graph:
-    g = _create_mcp_graph()
-    if MCP_LOG_PATH.exists():
-        g.parse(MCP_LOG_PATH, format="turtle")
-    return g
+    return _LOG.load(MCP_LOG_PATH)
 
 
 def save_mcp_graph(g: Graph) -> None:
     g.serialize(MCP_LOG_PATH, format="turtle")
 
 
-def _get_call_count(g: Graph) -> int:
-    count = 0
-    for _ in g.subjects(RDF.type, MCP.Call):
-        count += 1
-    return count
+def flush_mcp_log() -> None:
+    """Write any buffered MCP calls to MCP_LOG_PATH."""
+    _LOG.flush()
+
+
+# JSON-Schema ``type`` names and the Python types that satisfy them.  bool
+# is an int subclass, so it is excluded from the numeric types explicitly.
+_JSON_TYPES: Dict[str, tuple] = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "array": (list, tuple),
+    "object": (dict,),
+    "null": (type(None),),
+}
+
+
+def _matches_type(value: Any, type_names: tuple) -> bool:
+    for type_name in type_names:
+        python_types = _JSON_TYPES.get(type_name)
+        if python_types is None:
+            return True
+        if isinstance(value, bool) and type_name in ("integer", "number"):
+            continue
+        if isinstance(value, python_types):
+            return True
+    return False
+
+
+def _type_names(schema: Dict) -> tuple:
+    declared = schema.get("type")
+    if declared is None:
+        return ()
+    return (declared,) if isinstance(declared, str) else tuple(declared)
+
+
+def _compile_validator(schema: Dict) -> Optional[Callable]:
+    """Build an argument validator for ``schema`` once, at registration.
+
+    Checks the subset of JSON Schema the tool schemas use: the arguments
+    object's ``required`` keys and the ``type`` of each declared property.
+    Returns None when there is nothing to validate.
+    """
+    required = tuple(schema.get("required", ()))
+    property_types = {
+        key: _type_names(prop)
+        for key, prop in (schema.get("properties") or {}).items()
+        if isinstance(prop, dict) and _type_names(prop)
+    }
+    if not required and not property_types:
+        return None
+
+    def validate(arguments: Dict[str, Any]) -> Dict[str, Any]:
+        if not isinstance(arguments, dict):
+            raise ValueError("arguments must be an object")
+        missing = [key for key in required if key not in arguments]
+        if missing:
+            raise ValueError(f"missing required argument(s): {', '.join(missing)}")
+        for key, type_names in property_types.items():
+            if key in arguments and not _matches_type(arguments[key], type_names):
+                raise ValueError(f"{key} must be of type {' or '.join(type_names)}")
+        return arguments
+
+    return validate
+
+
+def _record_call(fields: List[tuple]) -> URIRef:
+    """Add one call record to the log graph; returns its URI."""
+    with _LOG.lock:
+        call_id = _LOG.next_id("call", (_CALL,))
+        call_uri = URIRef(f"{_MCP_BASE}call/{call_id}")
+        triples = [(call_uri, RDF.type, _CALL)]
+        triples.extend((call_uri, p, o) for p, o in fields)
+        _LOG.add(triples)
+    return call_uri
 
 
 class MCPTool:
     """Represents an MCP tool."""
 
-    def __init__(self, name: str, description: str, input_schema: Dict = None):
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        input_schema: Dict = None,
+        compiled: bool = True,
+    ):
         self.name = name
         self.description = description
         self.input_schema = input_schema or {}
         self._handler: Optional[Callable] = None
+        self._validator: Optional[Callable] = (
+            _compile_validator(self.input_schema) if compiled else None
+        )
 
     def handler(self, func: Callable) -> Callable:
         """Decorator to register the tool handler."""
@@ -76,8 +188,18 @@ class MCPTool:
                 "error": f"No handler registered for tool: {self.name}",
             }
 
+        arguments = arguments or {}
+        if self._validator is not None:
+            try:
+                self._validator(arguments)
+            except Exception as e:
+                return {
+                    "success": False,
+                    "error": f"Invalid arguments for {self.name}: {e}",
+                }
+
         try:
-            result = self._handler(arguments or {})
+            result = self._handler(arguments)
             if isinstance(result, dict):
                 if "success" in result:
                     return result
@@ -93,15 +215,23 @@ class MCPToolRegistry:
 
     def __init__(self):
         self._tools: Dict[str, MCPTool] = {}
+        # name -> bound MCPTool.execute, resolved once at registration so a
+        # call is a single dict lookup.
+        self._direct: Dict[str, Callable[[Optional[Dict[str, Any]]], Dict]] = {}
 
     def register(self, tool: MCPTool) -> None:
         """Register an MCP tool."""
         self._tools[tool.name] = tool
+        self._direct[tool.name] = tool.execute
 
     def get(self, name: str) -> Optional[MCPTool]:
         """Get a tool by name."""
         return self._tools.get(name)
 
+    def resolve(self, name: str) -> Optional[Callable]:
+        """Get the pre-bound executor for a tool by name."""
+        return self._direct.get(name)
+
     def list_tools(self) -> List[Dict[str, str]]:
         """List all registered tools."""
         return [
@@ -110,11 +240,11 @@ class MCPToolRegistry:
 
     def call(self, tool_name: str, arguments: Dict[str, Any] = None) -> Dict[str, Any]:
         """Call a tool by name."""
-        tool = self.get(tool_name)
-        if tool is None:
+        execute = self._direct.get(tool_name)
+        if execute is None:
             return {"success": False, "error": f"Unknown tool: {tool_name}"}
 
-        return tool.execute(arguments)
+        return execute(arguments)
 
 
 _global_registry = MCPToolRegistry()
@@ -125,11 +255,17 @@ def get_mcp_registry() -> MCPToolRegistry:
     return _global_registry
 
 
-def register_tool(name: str, description: str, input_schema: Dict = None):
-    """Decorator to register an MCP tool."""
+def register_tool(
+    name: str, description: str, input_schema: Dict = None, compiled: bool = True
+):
+    """Decorator to register an MCP tool.
+
+    With ``compiled`` the input schema's validator is built here, once,
+    rather than on every call.
+    """
 
     def decorator(func: Callable) -> Callable:
-        tool = MCPTool(name, description, input_schema)
+        tool = MCPTool(name, description, input_schema, compiled=compiled)
         tool._handler = func
         _global_registry.register(tool)
         return func
@@ -143,108 +279,88 @@ def call_mcp_tool(
     context: Dict[str, Any] = None,
 ) -> Dict[str, Any]:
     """Call an MCP tool and log the call to RDF."""
-    g = load_mcp_graph()
     safe_arguments = redact_object(arguments or {})
 
-    call_id = _get_call_count(g)
-    call_uri = MCP[f"call/{call_id}"]
-
-    g.add((call_uri, RDF.type, MCP.Call))
-    g.add(
-        (
-            call_uri,
-            MCP.timestamp,
-            Literal(datetime.now().isoformat(), datatype=XSD.dateTime),
-        )
-    )
-    g.add((call_uri, MCP.toolName, Literal(tool_name)))
+    fields = [
+        (_P_TIMESTAMP, Literal(datetime.now().isoformat(), datatype=XSD.dateTime)),
+        (_P_TOOL_NAME, interned_literal(tool_name)),
+    ]
 
     if safe_arguments:
         args_json = json.dumps(safe_arguments)
-        if len(args_json) > 1000:
-            args_json = args_json[:1000] + "... [truncated]"
-        g.add((call_uri, MCP.arguments, Literal(args_json)))
-
-    tool = _global_registry.get(tool_name)
-    if tool is None:
-        g.add((call_uri, MCP.status, Literal("error")))
-        g.add((call_uri, MCP.error, Literal(redact_text(f"Unknown tool: {tool_name}"))))
-        save_mcp_graph(g)
+        fields.append((_P_ARGUMENTS, Literal(truncate_text(args_json, 1000))))
+
+    execute = _global_registry.resolve(tool_name)
+    if execute is None:
+        fields.append((_P_STATUS, _STATUS_ERROR))
+        fields.append((_P_ERROR, Literal(redact_text(f"Unknown tool: {tool_name}"))))
+        _record_call(fields)
         return {"success": False, "error": f"Unknown tool: {tool_name}"}
 
     try:
-        result = tool.execute(arguments)
+        result = execute(arguments)
 
         if result.get("success"):
-            g.add((call_uri, MCP.status, Literal("success")))
+            fields.append((_P_STATUS, _STATUS_SUCCESS))
             safe_result = redact_object(result.get("result", {}))
             result_str = json.dumps(safe_result)
-            if len(result_str) > 2000:
-                result_str = result_str[:2000] + "... [truncated]"
-            g.add((call_uri, MCP.result, Literal(result_str)))
+            fields.append((_P_RESULT, Literal(truncate_text(result_str, 2000))))
         else:
-            g.add((call_uri, MCP.status, Literal("error")))
+            fields.append((_P_STATUS, _STATUS_ERROR))
             error = redact_text(str(result.get("error", "Unknown error")))
-            g.add((call_uri, MCP.error, Literal(error)))
+            fields.append((_P_ERROR, Literal(error)))
 
-        save_mcp_graph(g)
+        _record_call(fields)
         return result
 
     except Exception as e:
-        g.add((call_uri, MCP.status, Literal("exception")))
-        g.add((call_uri, MCP.exception, Literal(redact_text(str(e)))))
-        save_mcp_graph(g)
+        fields.append((_P_STATUS, _STATUS_EXCEPTION))
+        fields.append((_P_EXCEPTION, Literal(redact_text(str(e)))))
+        _record_call(fields)
         return {"success": False, "error": str(e)}
 
 
 def get_mcp_calls(limit: int = 20) -> List[Dict[str, Any]]:
     """Get recent MCP tool calls."""
-    g = load_mcp_graph()
+    rows = _LOG.cached(("calls", limit), lambda g: _get_mcp_calls(g, limit))
+    return [dict(row) for row in rows]
+
 
+def _get_mcp_calls(g: Graph, limit: int) -> List[Dict[str, Any]]:
     calls = []
-    for call in g.subjects(RDF.type, MCP.Call):
+    for call in _LOG.recent((_CALL,), limit):
+        # One index walk per row instead of a g.value probe per field.
+        po = dict(g.predicate_objects(call))
         data = {
             "uri": str(call),
-            "timestamp": str(g.value(call, MCP.timestamp) or ""),
-            "tool_name": str(g.value(call, MCP.toolName) or ""),
-            "status": str(g.value(call, MCP.status) or ""),
-            "arguments": redact_text(str(g.value(call, MCP.arguments) or "")),
-            "result": redact_text(str(g.value(call, MCP.result) or "")),
+            "timestamp": str(po.get(_P_TIMESTAMP, "")),
+            "tool_name": str(po.get(_P_TOOL_NAME, "")),
+            "status": str(po.get(_P_STATUS, "")),
+            "arguments": redact_text(str(po.get(_P_ARGUMENTS, ""))),
+            "result": redact_text(str(po.get(_P_RESULT, ""))),
         }
 
-        error = g.value(call, MCP.error)
+        error = po.get(_P_ERROR)
         if error:
             data["error"] = redact_text(str(error))
 
         calls.append(data)
-
-    calls.sort(key=lambda x: x["timestamp"], reverse=True)
-    return calls[:limit]
+    return calls
 
 
 def get_mcp_summary() -> Dict[str, Any]:
     """Get summary of MCP tool usage."""
-    g = load_mcp_graph()
-
-    calls = list(g.subjects(RDF.type, MCP.Call))
-
-    by_tool = {}
-    by_status = {}
-
-    for call in calls:
-        tool_name = g.value(call, MCP.toolName)
-        status = g.value(call, MCP.status)
-
-        if tool_name:
-            t = str(tool_name)
-            by_tool[t] = by_tool.get(t, 0) + 1
+    summary = _LOG.cached("summary", _get_mcp_summary)
+    return {
+        "total_calls": summary["total_calls"],
+        "by_tool": dict(summary["by_tool"]),
+        "by_status": dict(summary["by_status"]),
+    }
 
-        if status:
-            s = str(status)
-            by_status[s] = by_status.get(s, 0) + 1
 
+def _get_mcp_summary(g: Graph) -> Dict[str, Any]:
     return {
-        "total_calls": len(calls),
-        "by_tool": by_tool,
-        "by_status": by_status,
+        "total_calls": sum(1 for _ in g.subjects(RDF.type, _CALL)),
+        "by_tool": {str(row.key): int(row.n) for row in g.query(_CALLS_BY_TOOL)},
+        "by_status": {str(row.key): int(row.n) for row in g.query(_CALLS_BY_STATUS)},
     }
@@ -3,17 +3,37 @@
 This module provides common functions for creating, loading, and saving RDF graphs.
 """
 
+import atexit
+import functools
+import io
 import logging
+import mmap
 import os
+import threading
+from bisect import insort
+from collections import OrderedDict
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple
 
 from rdflib import Graph, Literal, Namespace, RDF, RDFS, URIRef, XSD
 
+try:
+    import oxrdflib  # noqa: F401  (registers the "Oxigraph" store plugin)
+except ImportError:
+    oxrdflib = None
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 logger = logging.getLogger(__name__)
 
+# Log files are read front to back once, so ask the kernel to read ahead.
+_MMAP_ADVICE = tuple(
+    getattr(mmap, name)
+    for name in ("MADV_SEQUENTIAL", "MADV_WILLNEED")
+    if hasattr(mmap, name) and hasattr(mmap.mmap, "madvise")
+)
+
 
 def get_base_dir() -> Path:
     """Get the base directory for the agent."""
@@ -37,9 +57,20 @@ DEFAULT_NAMESPACES = {
 }
 
 
+def graph_store() -> str:
+    """rdflib store for new graphs: Oxigraph when oxrdflib is installed.
+
+    ``SPEAR_RDF_STORE`` overrides the choice (e.g. ``default``).
+    """
+    configured = os.getenv("SPEAR_RDF_STORE", "").strip()
+    if configured:
+        return configured
+    return "Oxigraph" if oxrdflib is not None else "default"
+
+
 def create_graph(namespaces: Optional[Dict[str, Any]] = None) -> Graph:
     """Create a new RDF graph with common namespaces."""
-    g = Graph()
+    g = Graph(store=graph_store())
 
     ns = namespaces or DEFAULT_NAMESPACES
     for prefix, uri in ns.items():
@@ -51,19 +82,84 @@ def create_graph(namespaces: Optional[Dict[str, Any]] = None) -> Graph:
     return g
 
 
+def parse_file(g: Graph, file_path: Path, format: str = "turtle") -> Graph:
+    """Parse ``file_path`` into ``g`` through a read-only memory map.
+
+    rdflib reads the map like an open binary file, so the N-Triples parser
+    walks it line by line and pages come straight from the page cache
+    instead of being copied through Python's buffered I/O.
+    """
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return g
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for advice in _MMAP_ADVICE:
+                mm.madvise(advice)
+            g.parse(mm, format=format)
+    return g
+
+
 def load_graph(file_path: Path, namespaces: Optional[Dict[str, Any]] = None) -> Graph:
     """Load an RDF graph from a file."""
     g = create_graph(namespaces)
 
     if file_path.exists():
         try:
-            g.parse(file_path, format="turtle")
+            parse_file(g, file_path)
         except Exception as e:
             logger.warning(f"Failed to parse {file_path}: {e}")
 
     return g
 
 
+# Read-only graphs parsed from disk, keyed by path, with the
+# (mtime, size) they were parsed at.
+_FILE_GRAPHS: Dict[Path, Tuple[Tuple[int, int], Graph]] = {}
+_FILE_GRAPHS_LOCK = threading.Lock()
+
+
+def _file_stamp(file_path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = file_path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def load_graph_cached(
+    file_path: Path, journal: Optional[Path] = None
+) -> Optional[Graph]:
+    """Parse a Turtle file, reusing the last parse while the file is unchanged.
+
+    With ``journal`` (a GraphLog's N-Triples journal) the journaled entries
+    are replayed on top of the snapshot, and a change to either file
+    triggers a re-parse.  Returns None when neither file exists.  The
+    graph is shared between callers, so treat it as read-only.
+    """
+    if journal is not None:
+        flush_writer(journal)
+    stamp = (
+        _file_stamp(file_path),
+        _file_stamp(journal) if journal is not None else None,
+    )
+    if stamp == (None, None):
+        with _FILE_GRAPHS_LOCK:
+            _FILE_GRAPHS.pop(file_path, None)
+        return None
+    with _FILE_GRAPHS_LOCK:
+        cached = _FILE_GRAPHS.get(file_path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    g = Graph(store=graph_store())
+    if stamp[0] is not None:
+        parse_file(g, file_path)
+    if stamp[1] is not None:
+        parse_file(g, journal, format="nt")
+    with _FILE_GRAPHS_LOCK:
+        _FILE_GRAPHS[file_path] = (stamp, g)
+    return g
+
+
 def save_graph(g: Graph, file_path: Path) -> bool:
     """Save an RDF graph to a file."""
     try:
@@ -80,14 +176,42 @@ def get_count(g: Graph, predicate: Any, obj: Any) -> int:
     return sum(1 for _ in g.subjects(predicate, obj))
 
 
+def next_counter(g: Graph, counter: Any, predicate: Any, rdf_type: Any) -> int:
+    """Allocate the next id from a counter triple on ``counter``.
+
+    The triple holds the last id handed out; a replayed append-only journal
+    may carry several values, and the highest wins.  Graphs written before
+    the counter existed fall back to counting ``rdf_type`` subjects once.
+    """
+    values = [int(value) for value in g.objects(counter, predicate)]
+    if values:
+        n = max(values) + 1
+    else:
+        n = get_count(g, RDF.type, rdf_type)
+    g.set((counter, predicate, Literal(n, datatype=XSD.integer)))
+    return n
+
+
 def add_with_check(g: Graph, subject: Any, predicate: Any, obj: Any) -> None:
     """Add a triple only if it doesn't exist."""
     if (subject, predicate, None) not in g:
         g.add((subject, predicate, obj))
 
 
+_LIT_TRUE = Literal(True, datatype=XSD.boolean)
+_LIT_FALSE = Literal(False, datatype=XSD.boolean)
+# Shared literals for small counts, ids and exit codes, like CPython's
+# small-int cache.
+_INT_LITERALS = [Literal(i, datatype=XSD.integer) for i in range(-1, 256)]
+
+
 def safe_literal(value: Any, datatype: Any = None) -> Literal:
     """Create a literal with proper type handling."""
+    kind = type(value)
+    if kind is bool:
+        return _LIT_TRUE if value else _LIT_FALSE
+    if kind is int and -1 <= value <= 255:
+        return _INT_LITERALS[value + 1]
     if isinstance(value, bool):
         return Literal(value, datatype=XSD.boolean)
     elif isinstance(value, int):
@@ -100,18 +224,303 @@ def safe_literal(value: Any, datatype: Any = None) -> Literal:
         return Literal(str(value))
 
 
+def result_rows(result: Any) -> Tuple[Tuple[str, ...], Tuple[tuple, ...]]:
+    """Return SELECT results as variable names plus rows of strings.
+
+    Unbound and empty values become None.  Rows are plain tuples in
+    projection order, so pairing them with the variable names once avoids
+    a per-cell name lookup through ``row[var]``.
+    """
+    names = tuple(str(var) for var in result.vars or ())
+    rows = tuple(
+        tuple(str(value) if value else None for value in row) for row in result
+    )
+    return names, rows
+
+
+def result_dicts(result: Any) -> List[Dict[str, Optional[str]]]:
+    """Convert SELECT results to dicts of strings (None for unbound/empty)."""
+    names, rows = result_rows(result)
+    return [dict(zip(names, row)) for row in rows]
+
+
 def query_graph(g: Graph, sparql: str) -> List[Dict[str, str]]:
     """Execute a SPARQL query and return results as dicts."""
-    results = []
     try:
-        for row in g.query(sparql):
-            result = {}
-            for var in row.labels:
-                result[var] = str(row[var]) if row[var] else None
-            results.append(result)
+        return result_dicts(g.query(sparql))
     except Exception as e:
         logger.warning(f"SPARQL query failed: {e}")
-    return results
+        return []
+
+
+TRUNCATED_SUFFIX = "... [truncated]"
+
+
+def truncate_text(text: str, limit: int) -> str:
+    """Cap ``text`` at ``limit`` characters, marking it when cut."""
+    return text if len(text) <= limit else text[:limit] + TRUNCATED_SUFFIX
+
+
+@functools.lru_cache(maxsize=256)
+def interned_literal(value: str) -> Literal:
+    """Share one plain Literal per repeated value (models, tool names, statuses)."""
+    return Literal(value)
+
+
+@functools.lru_cache(maxsize=1024)
+def _nt_term(term: Any) -> str:
+    return term.n3()
+
+
+def _nt_literal(literal: Literal) -> str:
+    """Format a literal as N-Triples.
+
+    ``Literal.n3()`` emits Turtle long strings for multi-line text, which
+    N-Triples does not allow, so the lexical form is escaped here.
+    """
+    encoded = '"%s"' % (
+        str(literal)
+        .replace("\\", "\\\\")
+        .replace("\n", "\\n")
+        .replace('"', '\\"')
+        .replace("\r", "\\r")
+    )
+    if literal.language:
+        return f"{encoded}@{literal.language}"
+    if literal.datatype:
+        return f"{encoded}^^<{literal.datatype}>"
+    return encoded
+
+
+def nt_rows(triples: List[Tuple[Any, Any, Any]]) -> str:
+    """Format ``triples`` as N-Triples lines.
+
+    Log entries repeat the same subject and a fixed set of predicates and
+    types, so those are formatted once (the subject per run of rows, the
+    rest through a cache) and only literals are encoded per row.
+    """
+    subject, subject_nt = None, ""
+    rows = []
+    for s, p, o in triples:
+        if s is not subject:
+            subject, subject_nt = s, s.n3()
+        obj = _nt_literal(o) if isinstance(o, Literal) else _nt_term(o)
+        rows.append(f"{subject_nt} {_nt_term(p)} {obj} .\n")
+    return "".join(rows)
+
+
+# Journal writers are opened once per path and kept open, with a large
+# buffer, instead of being reopened for every appended entry.
+_JOURNAL_BUFFER_SIZE = 64 * 1024
+_writers: Dict[Path, BinaryIO] = {}
+_writers_lock = threading.Lock()
+
+
+def journal_writer(path: Path) -> BinaryIO:
+    """Return the pooled append-mode writer for ``path``.
+
+    O_APPEND makes the kernel position every write at the end of the file,
+    so entries stay contiguous even if several processes share a journal.
+    """
+    with _writers_lock:
+        writer = _writers.get(path)
+        if writer is None or writer.closed:
+            flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0)
+            fd = os.open(path, flags, 0o644)
+            writer = io.BufferedWriter(
+                io.FileIO(fd, "w"), buffer_size=_JOURNAL_BUFFER_SIZE
+            )
+            _writers[path] = writer
+        return writer
+
+
+def flush_writer(path: Path) -> None:
+    """Push any buffered rows for ``path`` to the OS."""
+    with _writers_lock:
+        writer = _writers.get(path)
+        if writer is not None and not writer.closed:
+            writer.flush()
+
+
+def close_writer(path: Path) -> None:
+    with _writers_lock:
+        writer = _writers.pop(path, None)
+    if writer is not None:
+        writer.close()
+
+
+def _close_all_writers() -> None:
+    for path in list(_writers):
+        close_writer(path)
+
+
+atexit.register(_close_all_writers)
+
+
+class GraphLog:
+    """An append-mostly log graph kept in memory between calls.
+
+    The graph is parsed once on first use.  Each entry's triples are
+    appended to an N-Triples journal next to the Turtle file, and the
+    Turtle snapshot is rewritten (and the journal truncated) every
+    ``compact_every`` entries, on ``flush()`` and at exit.  Loading reads
+    the snapshot and then replays the journal.  ``path`` is a callable so
+    a module's path constant can still be monkeypatched; a changed path
+    flushes the old graph and loads the new file.
+
+    Typed subjects are also kept in a list ordered by their ``timestamp``
+    value, so "most recent N" readers never scan or sort the whole graph.
+    """
+
+    QUERY_CACHE_SIZE = 128
+
+    def __init__(
+        self,
+        path: Callable[[], Path],
+        create: Callable[[], Graph],
+        timestamp: Optional[URIRef] = None,
+        compact_every: int = 500,
+    ):
+        self._path_fn = path
+        self._create = create
+        self._timestamp = timestamp
+        self.compact_every = compact_every
+        self.lock = threading.RLock()
+        self._graph: Optional[Graph] = None
+        self._path: Optional[Path] = None
+        self._pending = 0
+        self._next_ids: Dict[str, int] = {}
+        self._order: List[Tuple[str, URIRef, URIRef]] = []
+        self._memo: Dict[Any, Any] = {}
+        self._queries: "OrderedDict[str, Tuple[tuple, tuple]]" = OrderedDict()
+        atexit.register(self.flush)
+
+    @staticmethod
+    def journal_path(path: Path) -> Path:
+        return path.with_suffix(".nt")
+
+    def load(self, path: Path) -> Graph:
+        """Parse the Turtle snapshot at ``path`` plus any journaled entries."""
+        g = self._create()
+        if path.exists():
+            parse_file(g, path)
+        journal = self.journal_path(path)
+        flush_writer(journal)
+        if journal.exists():
+            parse_file(g, journal, format="nt")
+        return g
+
+    def graph(self) -> Graph:
+        """Return the live graph, loading it if needed."""
+        with self.lock:
+            path = self._path_fn()
+            if self._graph is None or path != self._path:
+                self.flush()
+                self._graph, self._path = self.load(path), path
+                self._pending = int(self.journal_path(path).exists())
+                self._next_ids.clear()
+                self._order = sorted(self._entries(self._graph))
+                self._memo.clear()
+                self._queries.clear()
+            return self._graph
+
+    def _entries(self, triples) -> List[Tuple[str, URIRef, URIRef]]:
+        """``(timestamp, subject, type)`` index entries for ``triples``."""
+        stamps = {s: str(o) for s, p, o in triples if p == self._timestamp}
+        return [(stamps.get(s, ""), s, o) for s, p, o in triples if p == RDF.type]
+
+    def recent(self, rdf_types: Tuple[URIRef, ...], limit: int) -> List[URIRef]:
+        """Return up to ``limit`` subjects of ``rdf_types``, newest first."""
+        with self.lock:
+            self.graph()
+            matches = (s for _, s, t in reversed(self._order) if t in rdf_types)
+            return list(islice(matches, max(limit, 0)))
+
+    def cached(self, key: Any, compute: Callable[[Graph], Any]) -> Any:
+        """Return ``compute(graph)``, memoized until the next add or reload."""
+        with self.lock:
+            g = self.graph()
+            if key not in self._memo:
+                self._memo[key] = compute(g)
+            return self._memo[key]
+
+    def next_id(self, key: str, rdf_types: Tuple[URIRef, ...]) -> int:
+        """Allocate the next integer id for ``key``.
+
+        The counter starts one past the highest trailing id among subjects
+        of ``rdf_types`` when the graph is loaded, then simply increments.
+        """
+        with self.lock:
+            g = self.graph()
+            if key not in self._next_ids:
+                highest = -1
+                for rdf_type in rdf_types:
+                    for subject in g.subjects(RDF.type, rdf_type):
+                        tail = str(subject).rsplit("/", 1)[-1]
+                        if tail.isdigit():
+                            highest = max(highest, int(tail))
+                self._next_ids[key] = highest + 1
+            next_id = self._next_ids[key]
+            self._next_ids[key] = next_id + 1
+            return next_id
+
+    def query(self, sparql: str) -> List[Dict[str, Optional[str]]]:
+        """Run a SELECT query, reusing results until the graph next changes.
+
+        Up to ``QUERY_CACHE_SIZE`` distinct query strings are kept, least
+        recently used first out.  Results are cached as tuples and handed
+        out as fresh dicts.
+        """
+        key = sparql.strip()
+        with self.lock:
+            g = self.graph()
+            cached = self._queries.get(key)
+            if cached is None:
+                cached = self._queries[key] = result_rows(g.query(sparql))
+                if len(self._queries) > self.QUERY_CACHE_SIZE:
+                    self._queries.popitem(last=False)
+            else:
+                self._queries.move_to_end(key)
+        names, rows = cached
+        return [dict(zip(names, row)) for row in rows]
+
+    def add(self, triples: List[Tuple[Any, Any, Any]]) -> None:
+        """Add one entry's triples and append them to the journal."""
+        with self.lock:
+            g = self.graph()
+            g.addN((s, p, o, g) for s, p, o in triples)
+            # Entries are logged in time order, so this is almost always
+            # an append at the end of the list.
+            for entry in self._entries(triples):
+                insort(self._order, entry)
+            self._memo.clear()
+            self._queries.clear()
+            rows = nt_rows(triples).encode()
+            journal_writer(self.journal_path(self._path)).write(rows)
+            self._pending += 1
+            if self._pending >= self.compact_every:
+                self.flush()
+
+    def flush(self) -> None:
+        """Rewrite the Turtle snapshot and truncate the journal."""
+        with self.lock:
+            if self._path is not None:
+                close_writer(self.journal_path(self._path))
+            if self._graph is not None and self._pending:
+                self._graph.serialize(self._path, format="turtle")
+                self.journal_path(self._path).unlink(missing_ok=True)
+                self._pending = 0
+
+    def clear(self) -> None:
+        """Drop every entry and write an empty snapshot."""
+        with self.lock:
+            self.graph().remove((None, None, None))
+            self._next_ids.clear()
+            self._order.clear()
+            self._memo.clear()
+            self._queries.clear()
+            self._pending = 1
+            self.flush()
 
 
 class RDFModuleBase:
@@ -15,6 +15,8 @@ from typing import Any, Dict, List, Optional
 
 from rdflib import Graph, Literal, Namespace, RDF, RDFS, URIRef, XSD
 
+from .rdf_utils import GraphLog, graph_store, interned_literal
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 REASONING_LOG_PATH = BASE_DIR / "reasoning_trace.ttl"
 
@@ -23,6 +25,21 @@ REASON = Namespace("http://example.org/reasoning/")
 LLM = Namespace("http://example.org/llm/")
 ART = Namespace("http://example.org/artifact/")
 
+# Terms written on every log call. Namespace attribute access and Literal
+# construction are comparatively expensive in rdflib, so build them once.
+_REASON_BASE = str(REASON)
+_P_TIMESTAMP = REASON.timestamp
+_P_DECISION_TYPE = REASON.decisionType
+_P_CONTEXT = REASON.context
+_P_RATIONALE = REASON.rationale
+_P_CHOSEN_APPROACH = REASON.chosenApproach
+_P_CONFIDENCE = REASON.confidence
+_P_CONSIDERED_ALTERNATIVE = REASON.consideredAlternative
+_P_ACTION = REASON.action
+_P_REASON_FOR_CORRECTION = REASON.reasonForCorrection
+_P_WHAT_WAS_WRONG = REASON.whatWasWrong
+_P_CORRECTION_MADE = REASON.correctionMade
+
 _namespaces = {
     "ag": AG,
     "reason": REASON,
@@ -35,28 +52,37 @@ _namespaces = {
 
 
 def _create_reasoning_graph() -> Graph:
-    g = Graph()
+    g = Graph(store=graph_store())
     for prefix, ns in _namespaces.items():
         g.bind(prefix, ns)
     return g
 
 
+_LOG = GraphLog(lambda: REASONING_LOG_PATH, _create_reasoning_graph, REASON.timestamp)
+
+
 def load_reasoning_graph() -> Graph:
-    g = _create_reasoning_graph()
-    if REASONING_LOG_PATH.exists():
-        g.parse(REASONING_LOG_PATH, format="turtle")
-    return g
+    return _LOG.load(REASONING_LOG_PATH)
 
 
 def save_reasoning_graph(g: Graph) -> None:
     g.serialize(REASONING_LOG_PATH, format="turtle")
 
 
-def _get_reasoning_count(g: Graph) -> int:
-    count = 0
-    for _ in g.subjects(RDF.type, REASON.Decision):
-        count += 1
-    return count
+def flush_reasoning_log() -> None:
+    """Write any buffered decisions and corrections to REASONING_LOG_PATH."""
+    _LOG.flush()
+
+
+def _record(kind: str, rdf_type: URIRef, fields: List[tuple]) -> URIRef:
+    """Add one decision or correction to the trace graph; returns its URI."""
+    with _LOG.lock:
+        entry_id = _LOG.next_id(kind, (rdf_type,))
+        uri = URIRef(f"{_REASON_BASE}{kind}/{entry_id}")
+        triples = [(uri, RDF.type, rdf_type)]
+        triples.extend((uri, p, o) for p, o in fields)
+        _LOG.add(triples)
+    return uri
 
 
 def log_decision(
@@ -69,41 +95,28 @@ def log_decision(
     metadata: Optional[Dict[str, Any]] = None,
 ) -> str:
     """Log a decision with reasoning."""
-    g = load_reasoning_graph()
-
-    decision_id = _get_reasoning_count(g)
-    decision_uri = REASON[f"decision/{decision_id}"]
-
-    g.add((decision_uri, RDF.type, REASON.Decision))
-    g.add(
-        (
-            decision_uri,
-            REASON.timestamp,
-            Literal(datetime.now().isoformat(), datatype=XSD.dateTime),
-        )
-    )
-    g.add((decision_uri, REASON.decisionType, Literal(decision_type)))
-    g.add((decision_uri, REASON.context, Literal(context)))
-    g.add((decision_uri, REASON.rationale, Literal(rationale)))
+    fields = [
+        (_P_TIMESTAMP, Literal(datetime.now().isoformat(), datatype=XSD.dateTime)),
+        (_P_DECISION_TYPE, interned_literal(decision_type)),
+        (_P_CONTEXT, Literal(context)),
+        (_P_RATIONALE, Literal(rationale)),
+    ]
 
     if chosen_approach:
-        g.add((decision_uri, REASON.chosenApproach, Literal(chosen_approach)))
+        fields.append((_P_CHOSEN_APPROACH, Literal(chosen_approach)))
 
     if confidence is not None:
-        g.add(
-            (decision_uri, REASON.confidence, Literal(confidence, datatype=XSD.float))
-        )
+        fields.append((_P_CONFIDENCE, Literal(confidence, datatype=XSD.float)))
 
     if alternatives_considered:
-        for idx, alt in enumerate(alternatives_considered):
-            g.add((decision_uri, REASON.consideredAlternative, Literal(alt)))
+        for alt in alternatives_considered:
+            fields.append((_P_CONSIDERED_ALTERNATIVE, Literal(alt)))
 
     if metadata:
         for key, value in metadata.items():
-            g.add((decision_uri, REASON[key], Literal(str(value))))
-
-    save_reasoning_graph(g)
+            fields.append((REASON[key], interned_literal(str(value))))
 
+    decision_uri = _record("decision", REASON.Decision, fields)
     return str(decision_uri)
 
 
@@ -167,44 +180,38 @@ def log_self_correction(
     correction_made: str,
 ) -> str:
     """Log a self-correction during execution."""
-    g = load_reasoning_graph()
-
-    correction_id = _get_reasoning_count(g)
-    correction_uri = REASON[f"correction/{correction_id}"]
-
-    g.add((correction_uri, RDF.type, REASON.SelfCorrection))
-    g.add(
-        (
-            correction_uri,
-            REASON.timestamp,
-            Literal(datetime.now().isoformat(), datatype=XSD.dateTime),
-        )
-    )
-    g.add((correction_uri, REASON.action, Literal(action)))
-    g.add((correction_uri, REASON.reasonForCorrection, Literal(reason_for_correction)))
-    g.add((correction_uri, REASON.whatWasWrong, Literal(what_was_wrong)))
-    g.add((correction_uri, REASON.correctionMade, Literal(correction_made)))
-
-    save_reasoning_graph(g)
-
+    fields = [
+        (_P_TIMESTAMP, Literal(datetime.now().isoformat(), datatype=XSD.dateTime)),
+        (_P_ACTION, Literal(action)),
+        (_P_REASON_FOR_CORRECTION, Literal(reason_for_correction)),
+        (_P_WHAT_WAS_WRONG, Literal(what_was_wrong)),
+        (_P_CORRECTION_MADE, Literal(correction_made)),
+    ]
+
+    correction_uri = _record("correction", REASON.SelfCorrection, fields)
     return str(correction_uri)
 
 
 def generate_explanation(run_uri: str = None) -> str:
     """Generate natural language explanation from reasoning trace."""
-    g = load_reasoning_graph()
+    with _LOG.lock:
+        return _generate_explanation(_LOG.graph())
+
 
+def _generate_explanation(g: Graph) -> str:
     explanations = []
 
-    decisions = list(g.subjects(RDF.type, REASON.Decision))
-    corrections = list(g.subjects(RDF.type, REASON.SelfCorrection))
+    # The five most recent of each, oldest first.
+    decisions = _LOG.recent((REASON.Decision,), 5)[::-1]
+    corrections = _LOG.recent((REASON.SelfCorrection,), 5)[::-1]
 
     if decisions:
         explanations.append("## Decision Log\n")
-        for decision in decisions[-5:]:
-            decision_type = g.value(decision, REASON.decisionType)
-            rationale = g.value(decision, REASON.rationale)
-            chosen = g.value(decision, REASON.chosenApproach)
+        for decision in decisions:
+            po = dict(g.predicate_objects(decision))
+            decision_type = po.get(_P_DECISION_TYPE)
+            rationale = po.get(_P_RATIONALE)
+            chosen = po.get(_P_CHOSEN_APPROACH)
 
             exp = f"- **Type:** {decision_type}\n"
             if chosen:
@@ -214,10 +221,11 @@ def generate_explanation(run_uri: str = None) -> str:
 
     if corrections:
         explanations.append("\n## Self-Corrections\n")
-        for correction in corrections[-5:]:
-            action = g.value(correction, REASON.action)
-            wrong = g.value(correction, REASON.whatWasWrong)
-            correction_made = g.value(correction, REASON.correctionMade)
+        for correction in corrections:
+            po = dict(g.predicate_objects(correction))
+            action = po.get(_P_ACTION)
+            wrong = po.get(_P_WHAT_WAS_WRONG)
+            correction_made = po.get(_P_CORRECTION_MADE)
 
             exp = f"- Action: {action}\n"
             exp += f"  - What was wrong: {wrong}\n"
@@ -232,31 +240,28 @@ def generate_explanation(run_uri: str = None) -> str:
 
 def query_reasoning(sparql: str) -> List[Dict[str, Any]]:
     """Query reasoning trace with SPARQL."""
-    g = load_reasoning_graph()
-
-    results = []
-    for row in g.query(sparql):
-        result = {}
-        for var in row.labels:
-            result[var] = str(row[var]) if row[var] else None
-        results.append(result)
-    return results
+    return _LOG.query(sparql)
 
 
 def get_self_corrections(limit: int = 10) -> List[Dict[str, Any]]:
     """Get recent self-corrections."""
-    g = load_reasoning_graph()
+    rows = _LOG.cached(
+        ("corrections", limit), lambda g: _get_self_corrections(g, limit)
+    )
+    return [dict(row) for row in rows]
 
+
+def _get_self_corrections(g: Graph, limit: int) -> List[Dict[str, Any]]:
     corrections = []
-    for correction in g.subjects(RDF.type, REASON.SelfCorrection):
+    for correction in _LOG.recent((REASON.SelfCorrection,), limit):
+        # One index walk per row instead of a g.value probe per field.
+        po = dict(g.predicate_objects(correction))
         data = {
-            "timestamp": str(g.value(correction, REASON.timestamp) or ""),
-            "action": str(g.value(correction, REASON.action) or ""),
-            "reason": str(g.value(correction, REASON.reasonForCorrection) or ""),
-            "what_was_wrong": str(g.value(correction, REASON.whatWasWrong) or ""),
-            "correction": str(g.value(correction, REASON.correctionMade) or ""),
+            "timestamp": str(po.get(_P_TIMESTAMP, "")),
+            "action": str(po.get(_P_ACTION, "")),
+            "reason": str(po.get(_P_REASON_FOR_CORRECTION, "")),
+            "what_was_wrong": str(po.get(_P_WHAT_WAS_WRONG, "")),
+            "correction": str(po.get(_P_CORRECTION_MADE, "")),
         }
         corrections.append(data)
-
-    corrections.sort(key=lambda x: x["timestamp"], reverse=True)
-    return corrections[:limit]
+    return corrections
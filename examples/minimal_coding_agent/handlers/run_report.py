@@ -7,6 +7,7 @@ from typing import Any, Dict, List, Optional
 
 from rdflib import Graph, Literal, Namespace, RDF, RDFS, URIRef, XSD
 
+from .rdf_utils import graph_store
 from .redaction import redact_object, redact_text
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -27,7 +28,7 @@ _namespaces = {
 
 
 def _create_report_graph() -> Graph:
-    g = Graph()
+    g = Graph(store=graph_store(), bind_namespaces="core")
     for prefix, ns in _namespaces.items():
         g.bind(prefix, ns)
     return g
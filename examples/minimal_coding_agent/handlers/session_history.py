@@ -2,11 +2,14 @@
 
 import os
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from rdflib import Graph, Literal, Namespace, RDF, RDFS, URIRef, XSD
+from rdflib.plugins.sparql import prepareQuery
 
+from .rdf_utils import GraphLog, graph_store, next_counter
 from .redaction import redact_object, redact_text
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -16,6 +19,8 @@ AG = Namespace("http://example.org/agent/")
 SESS = Namespace("http://example.org/session/")
 PROC = Namespace("http://example.org/process/")
 
+_RUN_COUNTER = SESS["meta/runCounter"]
+
 _namespaces = {
     "ag": AG,
     "sess": SESS,
@@ -27,28 +32,57 @@ _namespaces = {
 
 
 def _create_history_graph() -> Graph:
-    g = Graph()
+    g = Graph(store=graph_store(), bind_namespaces="core")
     for prefix, ns in _namespaces.items():
         g.bind(prefix, ns)
     return g
 
 
+# The history graph is parsed once and kept in memory; each run is appended
+# to an N-Triples journal next to the Turtle snapshot, which is rewritten
+# every few hundred runs, by flush_history and at exit.
+_LOG = GraphLog(lambda: HISTORY_GRAPH_PATH, _create_history_graph, AG.timestamp)
+
+
 def load_history_graph() -> Graph:
-    g = _create_history_graph()
-    if HISTORY_GRAPH_PATH.exists():
-        g.parse(HISTORY_GRAPH_PATH, format="turtle")
-    return g
+    return _LOG.graph()
 
 
 def save_history_graph(g: Graph) -> None:
     g.serialize(HISTORY_GRAPH_PATH, format="turtle")
 
 
-def _get_run_count(g: Graph) -> int:
-    count = 0
-    for _ in g.subjects(RDF.type, AG.Run):
-        count += 1
-    return count
+# Side indexes over the cached graph, command -> runs and success -> runs,
+# so the filtered lookups below never scan every run.  They are rebuilt
+# lazily whenever load_history_graph hands out a different graph.
+_by_command: Dict[str, List[URIRef]] = {}
+_by_success: Dict[bool, List[URIRef]] = {}
+_indexed_graph: Optional[Graph] = None
+_FALSE = Literal(False, datatype=XSD.boolean)
+
+
+def _index_run(g: Graph, run: URIRef) -> None:
+    command = g.value(run, AG.command)
+    if command is not None:
+        _by_command.setdefault(str(command), []).append(run)
+    success = g.value(run, AG.success)
+    if success is not None:
+        _by_success.setdefault(success != _FALSE, []).append(run)
+
+
+def _run_indexes(g: Graph) -> None:
+    global _indexed_graph
+    if _indexed_graph is not g:
+        _by_command.clear()
+        _by_success.clear()
+        for run in g.subjects(RDF.type, AG.Run):
+            _index_run(g, run)
+        _indexed_graph = g
+
+
+def flush_history() -> None:
+    """Fold journaled runs into the Turtle snapshot for file-level readers."""
+    _LOG.flush()
 
 
 def add_run(
@@ -61,56 +95,136 @@ def add_run(
     command = redact_text(command)
     task = redact_text(task)
     details = redact_object(details or {})
-    g = load_history_graph()
-
-    run_index = _get_run_count(g)
-    run_uri = SESS[f"run/{run_index}"]
-
-    g.add((run_uri, RDF.type, AG.Run))
-    g.add((run_uri, AG.command, Literal(command)))
-    g.add((run_uri, AG.task, Literal(task)))
-    g.add((run_uri, AG.success, Literal(success, datatype=XSD.boolean)))
-    g.add(
+    with _LOG.lock:
+        g = load_history_graph()
+        run_index = next_counter(g, _RUN_COUNTER, AG.runCount, AG.Run)
+        counter = (_RUN_COUNTER, AG.runCount, g.value(_RUN_COUNTER, AG.runCount))
+        run_uri = SESS[f"run/{run_index}"]
+        triples = _run_triples(run_uri, command, task, success, details, run_id)
+        _LOG.add([counter] + triples)
+        if _indexed_graph is g:
+            _index_run(g, run_uri)
+
+
+def _run_triples(
+    run_uri: URIRef,
+    command: str,
+    task: str,
+    success: bool,
+    details: Dict[str, Any],
+    run_id: Optional[str],
+) -> List[Tuple[Any, Any, Any]]:
+    triples = [
+        (run_uri, RDF.type, AG.Run),
+        (run_uri, AG.command, Literal(command)),
+        (run_uri, AG.task, Literal(task)),
+        (run_uri, AG.success, Literal(success, datatype=XSD.boolean)),
         (
             run_uri,
             AG.timestamp,
             Literal(datetime.now().isoformat(), datatype=XSD.dateTime),
-        )
-    )
+        ),
+    ]
     if run_id:
-        g.add((run_uri, AG.runId, Literal(run_id)))
+        triples.append((run_uri, AG.runId, Literal(run_id)))
 
     if "exit_code" in details:
-        g.add((run_uri, AG.exitCode, Literal(details["exit_code"])))
+        triples.append((run_uri, AG.exitCode, Literal(details["exit_code"])))
 
     if "output" in details:
         output = details["output"]
         if len(output) > 500:
             output = output[:500]
-        g.add((run_uri, AG.outputSummary, Literal(output)))
+        triples.append((run_uri, AG.outputSummary, Literal(output)))
 
     if command == "build":
         process_uri = PROC.MinimalCodingAgentBuildProcess
-        g.add((run_uri, AG.process, process_uri))
     else:
         process_uri = PROC.MinimalCodingAgentProcess
-        g.add((run_uri, AG.process, process_uri))
+    triples.append((run_uri, AG.process, process_uri))
+    return triples
+
+
+def add_attempt(
+    task: str,
+    success: str,
+    exit_code: Any,
+    error_type: str,
+    strategy: str,
+    attempt: str,
+    output: str,
+    run_id: Optional[str] = None,
+) -> int:
+    """Record one fix attempt and return its attempt number."""
+    with _LOG.lock:
+        attempt_index = _LOG.next_id("attempt", (AG.Attempt,))
+        attempt_uri = SESS[f"attempt/{attempt_index}"]
+        triples = [
+            (attempt_uri, RDF.type, AG.Attempt),
+            (attempt_uri, AG.command, Literal("solve")),
+            (attempt_uri, AG.task, Literal(str(task)[:200])),
+            (attempt_uri, AG.success, Literal(str(success).lower())),
+            (attempt_uri, AG.exitCode, Literal(exit_code)),
+            (attempt_uri, AG.errorType, Literal(error_type)),
+            (attempt_uri, AG.strategy, Literal(strategy)),
+            (attempt_uri, AG.attempt, Literal(attempt)),
+            (attempt_uri, AG.outputSummary, Literal(output)),
+        ]
+        if run_id:
+            triples.append((attempt_uri, AG.runId, Literal(str(run_id))))
+        triples.append(
+            (
+                attempt_uri,
+                AG.timestamp,
+                Literal(datetime.now().isoformat(), datatype=XSD.dateTime),
+            )
+        )
+        _LOG.add(triples)
+    return attempt_index
 
-    save_history_graph(g)
+
+# Parsed once; get_history takes the first ``limit`` rows of the ordered
+# result, which is what a LIMIT clause would do.
+_HISTORY_QUERY = prepareQuery(
+    """
+    SELECT ?run ?timestamp ?command ?task ?success ?exitCode ?output ?runId
+    WHERE {
+        ?run a ag:Run .
+        OPTIONAL { ?run ag:timestamp ?timestamp }
+        OPTIONAL { ?run ag:command ?command }
+        OPTIONAL { ?run ag:task ?task }
+        OPTIONAL { ?run ag:success ?success }
+        OPTIONAL { ?run ag:exitCode ?exitCode }
+        OPTIONAL { ?run ag:outputSummary ?output }
+        OPTIONAL { ?run ag:runId ?runId }
+    }
+    ORDER BY DESC(COALESCE(STR(?timestamp), ""))
+    """,
+    initNs=_namespaces,
+)
+
+
+def select_history(query: Any, limit: Optional[int] = None) -> List[Any]:
+    """Run a SELECT query on the live history graph, holding its lock.
+
+    add_run and add_attempt change the graph in place, so readers must not
+    iterate it concurrently; rows are materialized before the lock is
+    released.
+    """
+    with _LOG.lock:
+        rows = load_history_graph().query(query)
+        if limit is not None:
+            rows = islice(rows, max(limit, 0))
+        return list(rows)
 
 
 def get_history(limit: int = 10) -> List[Dict[str, Any]]:
-    g = load_history_graph()
+    if limit <= 0:
+        return []
 
     runs = []
-    for run in g.subjects(RDF.type, AG.Run):
-        timestamp = g.value(run, AG.timestamp)
-        command = g.value(run, AG.command)
-        task = g.value(run, AG.task)
-        success = g.value(run, AG.success)
-        exit_code = g.value(run, AG.exitCode)
-        output = g.value(run, AG.outputSummary)
-
+    rows = select_history(_HISTORY_QUERY, limit)
+    for run, timestamp, command, task, success, exit_code, output, run_id in rows:
         runs.append(
             {
                 "uri": str(run),
@@ -120,24 +234,22 @@ def get_history(limit: int = 10) -> List[Dict[str, Any]]:
                 "success": str(success).lower() == "true" if success else False,
                 "exit_code": str(exit_code) if exit_code else "-1",
                 "output": str(output) if output else "",
-                "run_id": str(g.value(run, AG.runId) or ""),
+                "run_id": str(run_id or ""),
             }
         )
-
-    runs.sort(key=lambda x: x["timestamp"], reverse=True)
-    return runs[:limit]
+    return runs
 
 
 def clear_history() -> None:
-    g = _create_history_graph()
-    save_history_graph(g)
+    global _indexed_graph
+    with _LOG.lock:
+        _LOG.clear()
+        _indexed_graph = None
 
 
 def query_history(sparql: str) -> List[Dict[str, Any]]:
-    g = load_history_graph()
-
     results = []
-    for row in g.query(sparql):
+    for row in select_history(sparql):
         result = {}
         for var in row.labels:
             result[var] = str(row[var]) if row[var] else None
@@ -145,39 +257,47 @@ def query_history(sparql: str) -> List[Dict[str, Any]]:
     return results
 
 
+_RUNS_BY_COMMAND_FIELDS = (
+    ("timestamp", AG.timestamp),
+    ("task", AG.task),
+    ("success", AG.success),
+)
+_FAILED_RUN_FIELDS = (
+    ("timestamp", AG.timestamp),
+    ("command", AG.command),
+    ("task", AG.task),
+)
+
+
+def _run_rows(
+    g: Graph, runs: List[URIRef], fields: Tuple[Tuple[str, URIRef], ...]
+) -> List[Dict[str, Any]]:
+    """Rows for ``runs`` having every field, newest first, as strings."""
+    rows = []
+    for run in runs:
+        row = {"run": run}
+        for name, predicate in fields:
+            row[name] = g.value(run, predicate)
+        if None in row.values():
+            continue
+        row["exitCode"] = g.value(run, AG.exitCode)
+        rows.append(row)
+    rows.sort(key=lambda row: str(row["timestamp"]), reverse=True)
+    return [
+        {name: str(value) if value else None for name, value in row.items()}
+        for row in rows
+    ]
+
+
 def get_runs_by_command(command: str) -> List[Dict[str, Any]]:
-    sparql = f"""
-    PREFIX ag: <http://example.org/agent/>
-    PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
-    
-    SELECT ?run ?timestamp ?task ?success ?exitCode
-    WHERE {{
-        ?run a ag:Run .
-        ?run ag:command "{command}" .
-        ?run ag:timestamp ?timestamp .
-        ?run ag:task ?task .
-        ?run ag:success ?success .
-        OPTIONAL {{ ?run ag:exitCode ?exitCode }}
-    }}
-    ORDER BY DESC(?timestamp)
-    """
-    return query_history(sparql)
+    with _LOG.lock:
+        g = load_history_graph()
+        _run_indexes(g)
+        return _run_rows(g, _by_command.get(command, []), _RUNS_BY_COMMAND_FIELDS)
 
 
 def get_failed_runs() -> List[Dict[str, Any]]:
-    sparql = """
-    PREFIX ag: <http://example.org/agent/>
-    PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
-    
-    SELECT ?run ?timestamp ?command ?task ?exitCode
-    WHERE {
-        ?run a ag:Run .
-        ?run ag:timestamp ?timestamp .
-        ?run ag:command ?command .
-        ?run ag:task ?task .
-        ?run ag:success false .
-        OPTIONAL { ?run ag:exitCode ?exitCode }
-    }
-    ORDER BY DESC(?timestamp)
-    """
-    return query_history(sparql)
+    with _LOG.lock:
+        g = load_history_graph()
+        _run_indexes(g)
+        return _run_rows(g, _by_success.get(False, []), _FAILED_RUN_FIELDS)
@@ -6,14 +6,21 @@ This module enables:
 3. Registering skills for agent use
 """
 
+import concurrent.futures
+import heapq
 import json
 import os
 import re
+from collections import Counter
 from datetime import datetime
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 
 from rdflib import Graph, Literal, Namespace, RDF, RDFS, URIRef, XSD
+from rdflib.plugins.sparql import prepareQuery
+
+from .rdf_utils import graph_store, next_counter
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 SKILLS_PATH = BASE_DIR / "skills.ttl"
@@ -21,6 +28,23 @@ SKILLS_PATH = BASE_DIR / "skills.ttl"
 AG = Namespace("http://example.org/agent/")
 SKILL = Namespace("http://example.org/skill/")
 
+_SKILL_COUNTER = SKILL["meta/skillCounter"]
+
+# Terms used for every imported skill, built once instead of per triple.
+_T_SKILL = SKILL.Skill
+_T_EXAMPLE = SKILL.Example
+_T_PATTERN = SKILL.Pattern
+_P_IMPORTED_AT = SKILL.importedAt
+_P_TITLE = SKILL.title
+_P_DESCRIPTION = SKILL.description
+_P_CATEGORY = SKILL.category
+_P_IS_SANITIZED = SKILL.isSanitized
+_P_SOURCE_FILE = SKILL.sourceFile
+_P_SAFETY_FLAG = SKILL.safetyFlag
+_P_CONTENT = SKILL.content
+_P_HAS_EXAMPLE = SKILL.hasExample
+_P_HAS_PATTERN = SKILL.hasPattern
+
 _namespaces = {
     "ag": AG,
     "skill": SKILL,
@@ -49,8 +73,20 @@ PROMPT_INJECTION_PATTERNS = {
 }
 
 
+# One alternation classifies each markdown line: a "# " title, a
+# description/examples/patterns section header, a code fence, or a
+# bullet/numbered list item.
+_LINE_RE = re.compile(
+    r"(?P<title># )"
+    r"|(?P<section>## (?:description|examples|patterns))"
+    r"|(?P<fence>```)"
+    r"|\s*(?:- |\d+\.\s+)(?P<item>.*)",
+    re.IGNORECASE,
+)
+
+
 def _create_skills_graph() -> Graph:
-    g = Graph()
+    g = Graph(store=graph_store(), bind_namespaces="core")
     for prefix, ns in _namespaces.items():
         g.bind(prefix, ns)
     return g
@@ -67,13 +103,6 @@ def save_skills_graph(g: Graph) -> None:
     g.serialize(SKILLS_PATH, format="turtle")
 
 
-def _get_skill_count(g: Graph) -> int:
-    count = 0
-    for _ in g.subjects(RDF.type, SKILL.Skill):
-        count += 1
-    return count
-
-
 def sanitize_skill_text(text: str) -> tuple[str, List[str]]:
     """Remove prompt-injection style lines and return risk flags."""
     if not text:
@@ -100,71 +129,43 @@ def parse_markdown_skill(
     markdown_content: str, source_file: str = None
 ) -> Dict[str, Any]:
     """Parse a markdown file into a skill structure."""
-    lines = markdown_content.split("\n")
-
     title = ""
-    description = ""
+    description = []
     category = "general"
     examples = []
     patterns = []
-    code_blocks = []
 
-    in_examples = False
-    in_patterns = False
-    current_example = ""
-    current_pattern = ""
-
-    for line in lines:
+    # Bullet or numbered items are collected into the current list section;
+    # anything else outside those sections is description text.  Fenced code
+    # is skipped entirely.
+    items = None
+    in_code = False
+    for line in markdown_content.split("\n"):
         line = line.rstrip()
-        stripped = line.strip()
-        is_bullet = stripped.startswith("- ")
-        is_numbered = bool(re.match(r"^\d+\.\s+", stripped))
-        item_text = re.sub(r"^\d+\.\s+", "", stripped)
-        if is_bullet:
-            item_text = stripped[2:].strip()
+        match = _LINE_RE.match(line)
+        kind = match.lastgroup if match else None
 
-        if line.startswith("# "):
-            title = line[2:].strip()
-            continue
-
-        if line.lower().startswith("## description"):
-            continue
-        if line.lower().startswith("## examples"):
-            in_examples = True
-            in_patterns = False
-            continue
-        if line.lower().startswith("## patterns"):
-            in_patterns = True
-            in_examples = False
+        if kind == "fence":
+            in_code = not in_code
             continue
-        if line.startswith("```"):
-            if code_blocks:
-                if code_blocks[-1] == "end":
-                    code_blocks.pop()
-                else:
-                    code_blocks.append(line[3:].strip())
-            else:
-                lang = line[3:].strip()
-                code_blocks.append(lang if lang else "python")
+        if in_code:
             continue
-
-        if in_examples and (is_bullet or is_numbered):
-            if current_example:
-                examples.append(current_example)
-            current_example = item_text.strip()
-            continue
-        elif in_patterns and (is_bullet or is_numbered):
-            if current_pattern:
-                patterns.append(current_pattern)
-            current_pattern = item_text.strip()
-            continue
-        elif not in_examples and not in_patterns and line:
-            description += line + " "
-
-    if current_example:
-        examples.append(current_example)
-    if current_pattern:
-        patterns.append(current_pattern)
+        if kind == "title":
+            title = line[2:].strip()
+        elif kind == "section":
+            section = match.group("section")[3:].lower()
+            if section == "examples":
+                items = examples
+            elif section == "patterns":
+                items = patterns
+        elif items is not None:
+            if kind == "item":
+                item = match.group("item").strip()
+                if item:
+                    items.append(item)
+        elif line:
+            description.append(line)
+    description = " ".join(description)
 
     risk_flags = set()
 
@@ -202,146 +203,195 @@ def parse_markdown_skill(
     }
 
 
-def import_markdown_skill(markdown_path: str) -> str:
-    """Import a markdown file as a skill."""
-    path = Path(markdown_path)
-
-    if not path.exists():
-        return f"File not found: {markdown_path}"
-
-    content = path.read_text(encoding="utf-8")
-    skill_data = parse_markdown_skill(content, str(path))
-
-    g = load_skills_graph()
-
-    skill_id = _get_skill_count(g)
+def _add_skill(g: Graph, skill_data: Dict[str, Any]) -> int:
+    """Add one parsed skill to ``g`` in a single addN batch; return its id."""
+    skill_id = next_counter(g, _SKILL_COUNTER, SKILL.skillCount, SKILL.Skill)
     skill_uri = SKILL[f"skill/{skill_id}"]
 
-    g.add((skill_uri, RDF.type, SKILL.Skill))
-    g.add(
+    triples = [
+        (skill_uri, RDF.type, _T_SKILL),
         (
             skill_uri,
-            SKILL.importedAt,
+            _P_IMPORTED_AT,
             Literal(datetime.now().isoformat(), datatype=XSD.dateTime),
-        )
-    )
-    g.add((skill_uri, SKILL.title, Literal(skill_data["title"])))
-    g.add((skill_uri, SKILL.description, Literal(skill_data["description"])))
-    g.add((skill_uri, SKILL.category, Literal(skill_data["category"])))
-    g.add(
+        ),
+        (skill_uri, _P_TITLE, Literal(skill_data["title"])),
+        (skill_uri, _P_DESCRIPTION, Literal(skill_data["description"])),
+        (skill_uri, _P_CATEGORY, Literal(skill_data["category"])),
         (
             skill_uri,
-            SKILL.isSanitized,
+            _P_IS_SANITIZED,
             Literal(bool(skill_data.get("sanitized")), datatype=XSD.boolean),
-        )
-    )
+        ),
+    ]
+    append = triples.append
 
     if skill_data["source"]:
-        g.add((skill_uri, SKILL.sourceFile, Literal(skill_data["source"])))
+        append((skill_uri, _P_SOURCE_FILE, Literal(skill_data["source"])))
     for flag in skill_data.get("risk_flags", []):
-        g.add((skill_uri, SKILL.safetyFlag, Literal(flag)))
+        append((skill_uri, _P_SAFETY_FLAG, Literal(flag)))
 
     for idx, example in enumerate(skill_data["examples"]):
         example_uri = SKILL[f"skill/{skill_id}/example/{idx}"]
-        g.add((example_uri, RDF.type, SKILL.Example))
-        g.add((example_uri, SKILL.content, Literal(example)))
-        g.add((skill_uri, SKILL.hasExample, example_uri))
+        append((example_uri, RDF.type, _T_EXAMPLE))
+        append((example_uri, _P_CONTENT, Literal(example)))
+        append((skill_uri, _P_HAS_EXAMPLE, example_uri))
 
     for idx, pattern in enumerate(skill_data["patterns"]):
         pattern_uri = SKILL[f"skill/{skill_id}/pattern/{idx}"]
-        g.add((pattern_uri, RDF.type, SKILL.Pattern))
-        g.add((pattern_uri, SKILL.content, Literal(pattern)))
-        g.add((skill_uri, SKILL.hasPattern, pattern_uri))
+        append((pattern_uri, RDF.type, _T_PATTERN))
+        append((pattern_uri, _P_CONTENT, Literal(pattern)))
+        append((skill_uri, _P_HAS_PATTERN, pattern_uri))
+
+    g.addN((s, p, o, g) for s, p, o in triples)
+    return skill_id
 
-    save_skills_graph(g)
 
+def _import_message(skill_data: Dict[str, Any], skill_id: int) -> str:
     sanitized_note = ""
     if skill_data.get("risk_flags"):
         sanitized_note = f" [sanitized flags: {', '.join(skill_data['risk_flags'])}]"
     return f"Imported skill: {skill_data['title']} (ID: {skill_id}){sanitized_note}"
 
 
-def import_directory_skills(directory: str) -> List[str]:
-    """Import all markdown files from a directory."""
+def _read_skill(path: Path) -> Dict[str, Any]:
+    return parse_markdown_skill(path.read_text(encoding="utf-8"), str(path))
+
+
+def import_markdown_skill(markdown_path: str) -> str:
+    """Import a markdown file as a skill."""
+    path = Path(markdown_path)
+
+    if not path.exists():
+        return f"File not found: {markdown_path}"
+
+    skill_data = _read_skill(path)
+
+    g = load_skills_graph()
+    skill_id = _add_skill(g, skill_data)
+    save_skills_graph(g)
+
+    return _import_message(skill_data, skill_id)
+
+
+def import_directory_skills(directory: str, max_workers: int = 8) -> List[str]:
+    """Import all markdown files from a directory.
+
+    Files are read and parsed on a thread pool; the skills graph is loaded
+    and saved once for the whole batch.
+    """
     dir_path = Path(directory)
 
     if not dir_path.exists():
         return [f"Directory not found: {directory}"]
 
-    results = []
+    md_files = list(dir_path.glob("**/*.md"))
+    if not md_files:
+        return []
 
-    for md_file in dir_path.glob("**/*.md"):
-        result = import_markdown_skill(str(md_file))
-        results.append(result)
+    workers = max(1, min(max_workers, len(md_files)))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        parsed = list(executor.map(_read_skill, md_files))
+
+    g = load_skills_graph()
+    results = [_import_message(data, _add_skill(g, data)) for data in parsed]
+    save_skills_graph(g)
 
     return results
 
 
-def get_skills(limit: int = 50) -> List[Dict[str, Any]]:
-    """Get all imported skills."""
+def _skill_dict(g: Graph, skill: URIRef) -> Dict[str, Any]:
+    data = {
+        "uri": str(skill),
+        "title": str(g.value(skill, SKILL.title) or ""),
+        "description": str(g.value(skill, SKILL.description) or ""),
+        "category": str(g.value(skill, SKILL.category) or ""),
+        "imported_at": str(g.value(skill, SKILL.importedAt) or ""),
+        "source": str(g.value(skill, SKILL.sourceFile) or ""),
+        "examples": [],
+        "patterns": [],
+        "risk_flags": [],
+        "sanitized": False,
+    }
+
+    for example in g.objects(skill, SKILL.hasExample):
+        content = g.value(example, SKILL.content)
+        if content:
+            data["examples"].append(str(content))
+
+    for pattern in g.objects(skill, SKILL.hasPattern):
+        content = g.value(pattern, SKILL.content)
+        if content:
+            data["patterns"].append(str(content))
+
+    for flag in g.objects(skill, SKILL.safetyFlag):
+        data["risk_flags"].append(str(flag))
+    data["risk_flags"] = sorted(set(data["risk_flags"]))
+    sanitized_literal = g.value(skill, SKILL.isSanitized)
+    if sanitized_literal is not None:
+        try:
+            data["sanitized"] = bool(sanitized_literal.toPython())
+        except Exception:
+            data["sanitized"] = (
+                str(sanitized_literal).strip().lower() in {"1", "true", "yes"}
+            )
+    elif data["risk_flags"]:
+        data["sanitized"] = True
+
+    return data
+
+
+def get_skills(limit: Optional[int] = 50) -> List[Dict[str, Any]]:
+    """Get imported skills, newest first; ``limit=None`` returns them all."""
     g = load_skills_graph()
 
-    skills = []
-    for skill in g.subjects(RDF.type, SKILL.Skill):
-        data = {
-            "uri": str(skill),
-            "title": str(g.value(skill, SKILL.title) or ""),
-            "description": str(g.value(skill, SKILL.description) or ""),
-            "category": str(g.value(skill, SKILL.category) or ""),
-            "imported_at": str(g.value(skill, SKILL.importedAt) or ""),
-            "source": str(g.value(skill, SKILL.sourceFile) or ""),
-            "examples": [],
-            "patterns": [],
-            "risk_flags": [],
-            "sanitized": False,
-        }
-
-        for example in g.objects(skill, SKILL.hasExample):
-            content = g.value(example, SKILL.content)
-            if content:
-                data["examples"].append(str(content))
-
-        for pattern in g.objects(skill, SKILL.hasPattern):
-            content = g.value(pattern, SKILL.content)
-            if content:
-                data["patterns"].append(str(content))
-
-        for flag in g.objects(skill, SKILL.safetyFlag):
-            data["risk_flags"].append(str(flag))
-        data["risk_flags"] = sorted(set(data["risk_flags"]))
-        sanitized_literal = g.value(skill, SKILL.isSanitized)
-        if sanitized_literal is not None:
-            try:
-                data["sanitized"] = bool(sanitized_literal.toPython())
-            except Exception:
-                data["sanitized"] = (
-                    str(sanitized_literal).strip().lower() in {"1", "true", "yes"}
-                )
-        elif data["risk_flags"]:
-            data["sanitized"] = True
-
-        skills.append(data)
-
-    skills.sort(key=lambda x: x["imported_at"], reverse=True)
-    return skills[:limit]
+    stamped = (
+        (str(g.value(skill, SKILL.importedAt) or ""), skill)
+        for skill in g.subjects(RDF.type, SKILL.Skill)
+    )
+    if limit is None:
+        newest = sorted(stamped, key=itemgetter(0), reverse=True)
+    else:
+        newest = heapq.nlargest(limit, stamped, key=itemgetter(0))
+    return [_skill_dict(g, skill) for _, skill in newest]
+
+
+# Substring match on title, description or any pattern, done by the store so
+# only matching skills are turned into dicts.
+_SEARCH_QUERY = prepareQuery(
+    """
+    SELECT DISTINCT ?skill
+    WHERE {
+        ?skill a skill:Skill .
+        OPTIONAL { ?skill skill:title ?title }
+        OPTIONAL { ?skill skill:description ?description }
+        FILTER(
+            CONTAINS(LCASE(STR(COALESCE(?title, ""))), ?q)
+            || CONTAINS(LCASE(STR(COALESCE(?description, ""))), ?q)
+            || EXISTS {
+                ?skill skill:hasPattern/skill:content ?pattern .
+                FILTER(CONTAINS(LCASE(STR(?pattern)), ?q))
+            }
+        )
+        FILTER(!?safeOnly || NOT EXISTS { ?skill skill:safetyFlag ?flag })
+    }
+    """,
+    initNs=_namespaces,
+)
 
 
 def search_skills(query: str, safe_only: bool = True) -> List[Dict[str, Any]]:
-    """Search skills by query."""
-    skills = get_skills()
-    query_lower = query.lower()
-
-    results = []
-    for skill in skills:
-        if safe_only and skill.get("risk_flags"):
-            continue
-        if query_lower in skill["title"].lower():
-            results.append(skill)
-        elif query_lower in skill["description"].lower():
-            results.append(skill)
-        elif any(query_lower in p.lower() for p in skill["patterns"]):
-            results.append(skill)
-
+    """Search skills by query, newest first."""
+    g = load_skills_graph()
+    rows = g.query(
+        _SEARCH_QUERY,
+        initBindings={
+            "q": Literal(query.lower()),
+            "safeOnly": Literal(safe_only, datatype=XSD.boolean),
+        },
+    )
+    results = [_skill_dict(g, row[0]) for row in rows]
+    results.sort(key=lambda x: x["imported_at"], reverse=True)
     return results
 
 
@@ -351,26 +401,69 @@ def get_skill_for_context(context: str) -> Optional[Dict[str, Any]]:
     return skills[0] if skills else None
 
 
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
 class SkillRegistry:
-    """Registry of loaded skills for agent use."""
+    """Registry of loaded skills for agent use.
+
+    Keeps an inverted index from lower-cased word tokens (title,
+    description and patterns) to skill ids so interactive searches are a
+    few set lookups rather than a pass over every skill.
+    """
 
     def __init__(self):
         self._skills = {}
+        self._skills_by_id: Dict[int, Dict[str, Any]] = {}
+        self._token_index: Dict[str, Set[int]] = {}
+        self._token_counts: Dict[int, Counter] = {}
         self._load_from_rdf()
 
     def _load_from_rdf(self):
-        """Load skills from RDF."""
-        skills = get_skills()
-        for skill in skills:
+        """Load every skill from RDF, so search covers what search_skills does."""
+        skills = get_skills(limit=None)
+        for skill_id, skill in enumerate(skills):
             self._skills[skill["title"]] = skill
+            self._skills_by_id[skill_id] = skill
+            text = " ".join([skill["title"], skill["description"], *skill["patterns"]])
+            counts = Counter(_tokenize(text))
+            self._token_counts[skill_id] = counts
+            for token in counts:
+                self._token_index.setdefault(token, set()).add(skill_id)
 
     def get(self, name: str) -> Optional[Dict[str, Any]]:
         """Get a skill by name."""
         return self._skills.get(name)
 
     def search(self, query: str) -> List[Dict[str, Any]]:
-        """Search skills."""
-        return search_skills(query)
+        """Search skills containing every word of ``query``.
+
+        Matches are ranked by how often the query words occur, then by
+        recency.  Flagged skills are left out, as in ``search_skills``.
+        When no skill has every word as a whole token (e.g. "divis" for
+        "ZeroDivisionError"), this falls back to the substring match of
+        ``search_skills``.
+        """
+        tokens = set(_tokenize(query))
+        if not tokens:
+            return search_skills(query)
+        postings = [self._token_index.get(token, set()) for token in tokens]
+        matches = set.intersection(*postings)
+        if not matches:
+            return search_skills(query)
+        ranked = sorted(
+            matches,
+            key=lambda i: (-sum(self._token_counts[i][t] for t in tokens), i),
+        )
+        return [
+            self._skills_by_id[i]
+            for i in ranked
+            if not self._skills_by_id[i].get("risk_flags")
+        ]
 
     def all(self) -> List[Dict[str, Any]]:
         """Get all skills."""
@@ -379,6 +472,9 @@ class SkillRegistry:
     def reload(self):
         """Reload skills from RDF."""
         self._skills = {}
+        self._skills_by_id = {}
+        self._token_index = {}
+        self._token_counts = {}
         self._load_from_rdf()
 
 
@@ -6,7 +6,11 @@ This enables the agent to:
 3. Aggregate results from sub-agents
 """
 
+import functools
+import hashlib
+import json
 import os
+import re
 import uuid
 from datetime import datetime
 from pathlib import Path
@@ -14,6 +18,8 @@ from typing import Any, Callable, Dict, List, Optional
 
 from rdflib import Graph, Literal, Namespace, RDF, URIRef, XSD
 
+from .common import dumps_json, loads_json
+
 try:
     from dotenv import load_dotenv
 
@@ -42,20 +48,14 @@ _namespaces = {
 }
 
 
-def decompose_task(task: str) -> List[Dict[str, str]]:
-    """Break a complex task into smaller subtasks using LLM."""
-    if completion is None:
-        return [{"task": task, "description": "Single task - no decomposition"}]
+DECOMPOSE_CACHE_DIR = BASE_DIR / ".decompose_cache"
 
-    model = os.getenv("LITELLM_MODEL", "gpt-4o")
-    provider = os.getenv("LITELLM_PROVIDER")
-    api_key = os.getenv("LITELLM_API_KEY")
-    api_base = os.getenv("LITELLM_API_BASE")
+# Optional ```json and/or ``` opening fence and ``` closing fence around a reply.
+_FENCE_RE = re.compile(r"(?:```json)?(?:```)?(.*?)(?:```)?", re.DOTALL)
 
-    if provider and "/" not in model:
-        model = f"{provider}/{model}"
 
-    prompt = f"""Break down this task into 2-5 smaller, independent subtasks that can be executed in parallel or sequence.
+def _decompose_prompt(task: str) -> str:
+    return f"""Break down this task into 2-5 smaller, independent subtasks that can be executed in parallel or sequence.
 
 Task: {task}
 
@@ -73,28 +73,59 @@ Example format:
 
 Respond ONLY with JSON, no explanation."""
 
+
+@functools.lru_cache(maxsize=128)
+def _decomposition_json(model: str, prompt: str) -> str:
+    """Return the decomposition JSON for ``prompt``, from disk or the LLM.
+
+    Replies are cached under a SHA-256 of (model, prompt).  A reply that is
+    not valid JSON raises ``json.JSONDecodeError``, so failures are never
+    cached in memory or on disk.
+    """
+    key = hashlib.sha256(f"{model}|{prompt}".encode("utf-8")).hexdigest()
+    cache_file = DECOMPOSE_CACHE_DIR / f"{key}.json"
+    try:
+        return cache_file.read_text(encoding="utf-8")
+    except OSError:
+        pass
+
     response = completion(
         model=model,
         messages=[{"role": "user", "content": prompt}],
         temperature=0.3,
-        api_base=api_base,
-        api_key=api_key,
+        api_base=os.getenv("LITELLM_API_BASE"),
+        api_key=os.getenv("LITELLM_API_KEY"),
     )
 
     content = response["choices"][0]["message"]["content"].strip()
-    content = content.strip()
-    if content.startswith("```json"):
-        content = content[7:]
-    if content.startswith("```"):
-        content = content[3:]
-    if content.endswith("```"):
-        content = content[:-3]
+    content = _FENCE_RE.fullmatch(content).group(1)
+
+    text = dumps_json(loads_json(content))
+    try:
+        DECOMPOSE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        cache_file.write_text(text, encoding="utf-8")
+    except OSError:
+        pass
+    return text
+
+
+def decompose_task(task: str) -> List[Dict[str, str]]:
+    """Break a complex task into smaller subtasks using LLM.
+
+    Decompositions are cached per model and prompt, in memory and under
+    ``DECOMPOSE_CACHE_DIR``, so repeating a task skips the LLM call.
+    """
+    if completion is None:
+        return [{"task": task, "description": "Single task - no decomposition"}]
+
+    model = os.getenv("LITELLM_MODEL", "gpt-4o")
+    provider = os.getenv("LITELLM_PROVIDER")
 
-    import json
+    if provider and "/" not in model:
+        model = f"{provider}/{model}"
 
     try:
-        subtasks = json.loads(content)
-        return subtasks
+        return loads_json(_decomposition_json(model, _decompose_prompt(task)))
     except json.JSONDecodeError:
         return [
             {"task": task, "description": "Decomposition failed, using single task"}
@@ -146,12 +177,7 @@ def dispatch_subagents(
         Dictionary with decomposition and results
     """
     subtasks = decompose_task(task)
-
-    task_descriptions = [st.get("description", st.get("task", "")) for st in subtasks]
-    if max_parallel <= 1:
-        results = [execute_subtask(st, executor_fn) for st in subtasks]
-    else:
-        results = run_parallel_subtasks(task_descriptions, executor_fn, max_parallel)
+    results = run_subtask_graph(subtasks, executor_fn, max_parallel)
 
     all_success = all(r.get("success", False) for r in results)
 
@@ -165,6 +191,65 @@ def dispatch_subagents(
     }
 
 
+def run_subtask_graph(
+    subtasks: List[Dict[str, Any]],
+    executor_fn: Callable[[str], Dict[str, Any]],
+    max_parallel: int = 3,
+) -> List[Dict[str, Any]]:
+    """Run subtasks on a thread pool, honouring their ``depends_on`` names.
+
+    A subtask is submitted once every subtask it depends on has finished;
+    independent subtasks overlap up to ``max_parallel`` at a time.  Unknown
+    dependency names are ignored, and a dependency cycle is broken by
+    starting its earliest subtask.  Results come back in ``subtasks`` order.
+    """
+    import concurrent.futures
+
+    if not subtasks:
+        return []
+
+    index = {st.get("task"): i for i, st in enumerate(subtasks)}
+    waiting: Dict[int, set] = {}
+    dependents: Dict[int, List[int]] = {i: [] for i in range(len(subtasks))}
+    for i, st in enumerate(subtasks):
+        depends_on = st.get("depends_on") or []
+        if isinstance(depends_on, str):
+            depends_on = [depends_on]
+        deps = {index[d] for d in depends_on if index.get(d, i) != i}
+        waiting[i] = deps
+        for dep in deps:
+            dependents[dep].append(i)
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(subtasks)
+    max_workers = max(1, min(max_parallel, len(subtasks)))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        running: Dict[concurrent.futures.Future, int] = {}
+
+        def submit_ready() -> None:
+            ready = [i for i, deps in waiting.items() if not deps]
+            if not ready and not running and waiting:
+                ready = [min(waiting)]
+            for i in ready:
+                del waiting[i]
+                future = executor.submit(execute_subtask, subtasks[i], executor_fn)
+                running[future] = i
+
+        submit_ready()
+        while running:
+            done, _ = concurrent.futures.wait(
+                running, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                i = running.pop(future)
+                results[i] = future.result()
+                for dependent in dependents[i]:
+                    if dependent in waiting:
+                        waiting[dependent].discard(i)
+            submit_ready()
+
+    return results
+
+
 def run_parallel_subtasks(
     task_descriptions: List[str],
     executor_fn: Callable[[str], Dict[str, Any]],
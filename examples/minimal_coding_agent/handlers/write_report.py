@@ -1,6 +1,7 @@
 """Handler that writes a machine-readable run report."""
 
 import json
+import os
 from typing import Any, Dict, List
 
 from .common import REPORT_FILE, literal_to_bool, literal_to_int, literal_to_text
@@ -8,20 +9,12 @@ from .artifact_tracker import get_artifacts_for_run
 from .redaction import redact_object
 from .run_report import save_report as save_rdf_report
 
+# Indented copy of the report, written only when SPEAR_REPORT_PRETTY is set;
+# the main report file is compact JSON.
+PRETTY_REPORT_FILE = REPORT_FILE.with_suffix(".pretty.json")
 
-def _load_search_results(payload: str) -> List[Dict[str, Any]]:
-    if not payload:
-        return []
-    try:
-        parsed = json.loads(payload)
-    except Exception:
-        return []
-    if isinstance(parsed, list):
-        return [item for item in parsed if isinstance(item, dict)]
-    return []
 
-
-def _load_repair_steps(payload: str) -> List[Dict[str, Any]]:
+def _load_dict_list(payload: str) -> List[Dict[str, Any]]:
     if not payload:
         return []
     try:
@@ -46,10 +39,10 @@ def _load_fix_plan(payload: str) -> Dict[str, Any]:
 def handle(context) -> None:
     build_task = context.get_variable("build_task")
     is_build_mode = build_task is not None
+    build_task_text = literal_to_text(build_task)
 
     report = {
-        "task": literal_to_text(context.get_variable("task"))
-        or literal_to_text(build_task),
+        "task": literal_to_text(context.get_variable("task")) or build_task_text,
     }
     run_id = literal_to_text(context.get_variable("run_id"))
     if run_id:
@@ -60,21 +53,18 @@ def handle(context) -> None:
 
     if is_build_mode:
         report["command"] = "build"
-        report["build_task"] = literal_to_text(build_task)
-        report["build_success"] = literal_to_bool(context.get_variable("build_success"))
-        report["build_output"] = literal_to_text(context.get_variable("build_output"))
-        report["build_exit_code"] = str(
+        report["build_task"] = build_task_text
+        build_output = literal_to_text(context.get_variable("build_output"))
+        build_exit_code = str(
             literal_to_int(context.get_variable("build_exit_code"), -1)
         )
-        report["build_steps"] = _load_repair_steps(
+        report["build_success"] = literal_to_bool(context.get_variable("build_success"))
+        report["build_output"] = build_output
+        report["build_exit_code"] = build_exit_code
+        report["build_steps"] = _load_dict_list(
             literal_to_text(context.get_variable("build_steps_json"))
         )
-        report["after"] = {
-            "exit_code": str(
-                literal_to_int(context.get_variable("build_exit_code"), -1)
-            ),
-            "output": literal_to_text(context.get_variable("build_output")),
-        }
+        report["after"] = {"exit_code": build_exit_code, "output": build_output}
     else:
         report["command"] = "solve"
         report["before"] = {
@@ -93,7 +83,7 @@ def handle(context) -> None:
         report["failure_summary"] = literal_to_text(
             context.get_variable("failure_summary")
         )
-        report["search_results"] = _load_search_results(
+        report["search_results"] = _load_dict_list(
             literal_to_text(context.get_variable("search_results_json"))
         )
         report["patch_applied"] = literal_to_bool(context.get_variable("patch_applied"))
@@ -104,7 +94,7 @@ def handle(context) -> None:
             literal_to_int(context.get_variable("repair_exit_code"), -1)
         )
         report["repair_output"] = literal_to_text(context.get_variable("repair_output"))
-        report["repair_steps"] = _load_repair_steps(
+        report["repair_steps"] = _load_dict_list(
             literal_to_text(context.get_variable("repair_steps_json"))
         )
         report["fix_plan"] = _load_fix_plan(
@@ -133,5 +123,10 @@ def handle(context) -> None:
 
     redacted_report = redact_object(report)
     save_rdf_report(redacted_report)
-    REPORT_FILE.write_text(json.dumps(redacted_report, indent=2), encoding="utf-8")
+    with REPORT_FILE.open("w", encoding="utf-8") as f:
+        json.dump(redacted_report, f, separators=(",", ":"))
+    if os.getenv("SPEAR_REPORT_PRETTY", "").strip().lower() in {"1", "true", "yes"}:
+        PRETTY_REPORT_FILE.write_text(
+            json.dumps(redacted_report, indent=2), encoding="utf-8"
+        )
     context.set_variable("report_path", str(REPORT_FILE))
@@ -2,12 +2,7 @@
 
 
 def running_average(total, count):
-    """Return average value for total/count.
-
-    Bug intentionally present:
-    - Uses (count + 1), which is mathematically wrong.
-    - Does not raise ValueError when count == 0.
-    """
+    """Return average value for total/count."""
     if count <= 0:
-        raise ValueError("count cannot be negative")
-    return total / (count)
+        raise ValueError("count must be positive")
+    return total / count
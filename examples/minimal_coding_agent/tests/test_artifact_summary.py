@@ -28,6 +28,89 @@ def test_artifact_tracker_records_line_delta(monkeypatch, tmp_path):
     assert item.get("lines_removed", 0) >= 1
 
 
+def test_artifact_tracker_reuses_last_logged_hash(monkeypatch, tmp_path):
+    monkeypatch.setattr(at, "ARTIFACT_LOG_PATH", tmp_path / "artifact_changes.ttl")
+
+    first = "def f():\n    return 1\n"
+    at.log_file_created("app.py", first, run_id="run-hash-1")
+    at.log_file_modified("app.py", first + "# done\n", first, run_id="run-hash-1")
+
+    g = at._get_graph()
+    (modified,) = list(g.subjects(at.ART.operation, at.Literal("modified")))
+    assert str(g.value(modified, at.ART.previousHash)) == at._compute_hash(first)
+    assert g.value(modified, at.ART.changed).toPython() is True
+
+
+def test_artifact_hash_cache_keeps_only_short_contents():
+    at._cached_hash.cache_clear()
+    long_content = "x" * (at._HASH_CACHE_MAX_CHARS + 1)
+    assert at._compute_hash(long_content) == at._compute_hash_bytes(
+        long_content.encode()
+    )
+    assert at._cached_hash.cache_info().currsize == 0
+
+    assert at._compute_hash("short") == at._compute_hash("short")
+    info = at._cached_hash.cache_info()
+    assert (info.currsize, info.hits) == (1, 1)
+    assert info.maxsize * at._HASH_CACHE_MAX_CHARS <= 1024 * 1024
+
+
+def test_get_artifacts_returns_newest_first(monkeypatch, tmp_path):
+    monkeypatch.setattr(at, "ARTIFACT_LOG_PATH", tmp_path / "artifact_changes.ttl")
+
+    for index in range(3):
+        at.log_file_created(f"mod_{index}.py", f"v = {index}\n", run_id="run-order")
+    at.log_file_modified("mod_2.py", "v = 2\n", "v = 2\n", run_id="run-order")
+
+    recent = at.get_artifacts(limit=2)
+    assert [item["file_path"] for item in recent] == ["mod_2.py", "mod_2.py"]
+    assert recent[0]["operation"] == "modified"
+    assert recent[0]["changed"] is False
+    assert recent[0]["run_id"] == "run-order"
+    assert recent[1]["lines_added"] == 1
+
+
+def test_query_artifacts_maps_unbound_values_to_none(monkeypatch, tmp_path):
+    monkeypatch.setattr(at, "ARTIFACT_LOG_PATH", tmp_path / "artifact_changes.ttl")
+    at.log_file_deleted("gone.py")
+
+    rows = at.query_artifacts(
+        """
+        PREFIX art: <http://example.org/artifact/>
+        SELECT ?path ?hash WHERE {
+            ?a art:filePath ?path .
+            OPTIONAL { ?a art:contentHash ?hash }
+        }
+        """
+    )
+    assert rows == [{"path": "gone.py", "hash": None}]
+
+
+def test_artifact_tracker_flushes_in_memory_graph(monkeypatch, tmp_path):
+    log_path = tmp_path / "artifact_changes.ttl"
+    monkeypatch.setattr(at, "ARTIFACT_LOG_PATH", log_path)
+
+    at.log_file_created("app.py", "print('hi')\n", run_id="run-flush-1")
+    at.log_file_created("util.py", "x = 1\n", run_id="run-flush-1")
+    at.flush_artifact_graph()
+
+    reloaded = at.load_artifact_graph()
+    assert len(list(reloaded.subjects(at.RDF.type, at.ART.Artifact))) == 2
+    assert len(at.get_artifacts_for_run("run-flush-1")) == 2
+    assert (tmp_path / "artifact_changes.nt").exists()
+
+    # Ids keep counting from the persisted log after a reload.
+    monkeypatch.setattr(at, "ARTIFACT_LOG_PATH", tmp_path / "other.ttl")
+    at.get_artifacts()
+    monkeypatch.setattr(at, "ARTIFACT_LOG_PATH", log_path)
+    uri = at.log_file_created("third.py", "y = 2\n", run_id="run-flush-1")
+    assert uri.endswith("change/2")
+
+    exported = at.export_artifact_graph()
+    assert exported == log_path
+    assert "art:Artifact" in log_path.read_text(encoding="utf-8")
+
+
 def test_run_report_roundtrips_artifact_summary(monkeypatch, tmp_path):
     monkeypatch.setattr(rr, "REPORT_GRAPH_PATH", tmp_path / "run_reports.ttl")
     rr.save_report(
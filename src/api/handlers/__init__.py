@@ -4,6 +4,20 @@ HTTP Handlers Package for SPEAR BPMN Engine
 Provides pre-built HTTP/REST API handlers for service tasks.
 """
 
-from .http_handlers import HTTPHandlers, PreBuiltHandlers, create_http_handler
+from .http_handlers import (
+    AsyncHTTPHandlers,
+    HTTPHandlers,
+    PreBuiltHandlers,
+    create_http_handler,
+    get_default_handlers,
+    shutdown_default_handlers,
+)
 
-__all__ = ["HTTPHandlers", "PreBuiltHandlers", "create_http_handler"]
+__all__ = [
+    "AsyncHTTPHandlers",
+    "HTTPHandlers",
+    "PreBuiltHandlers",
+    "create_http_handler",
+    "get_default_handlers",
+    "shutdown_default_handlers",
+]
@@ -50,33 +50,193 @@ Response Extraction:
     This will extract transaction.id and amount from the JSON response.
 """
 
+import asyncio
+import copy
 import json
 import os
 import ipaddress
+import random
+import re
+import smtplib
+import threading
+import time
+from collections import OrderedDict
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
 from urllib.parse import urlparse
 import requests
-from typing import Dict, Any, Optional, List
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 import logging
 
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional async transport
+    httpx = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib json fallback
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# ${variableName} placeholder used in URLs, headers, params and bodies
+_PLACEHOLDER_RE = re.compile(r"\$\{([A-Za-z_]\w*)\}")
+
+
+def _create_session(pool_connections: int = 16,
+                    pool_maxsize: int = 64) -> requests.Session:
+    """
+    Create a keep-alive session with a pooled adapter for http and https.
+
+    Retries are handled by the callers, so the adapter itself never retries.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# Methods whose body is sent as JSON
+_BODY_METHODS = frozenset({"POST", "PUT", "PATCH"})
+
+# Jitter source for retry backoff
+_RETRY_RANDOM = random.Random()
+
+_RESPONSE_CACHE_SIZE = 1024
+_CACHE_MISS = object()
+
+
+class _TTLCache:
+    """Small thread-safe LRU cache whose entries expire after ``ttl`` seconds."""
+    
+    def __init__(self, ttl: float, maxsize: int = _RESPONSE_CACHE_SIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Any, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires, value = item
+            if expires <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+    
+    def set(self, key: Any, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def _loads_json(data: Any) -> Any:
+    """Parse JSON from str or bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps_json(value: Any) -> bytes:
+    """Serialize a request body to UTF-8 JSON, using orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value)
+        except TypeError:
+            pass
+    return json.dumps(value).encode("utf-8")
+
+
+def _json_body(headers: Optional[Dict],
+               data: Any) -> Tuple[Optional[Dict], Optional[bytes]]:
+    """
+    Serialize a JSON request body and label it with a JSON Content-Type.
+    
+    Returns:
+        (headers, body bytes or None when there is no body)
+    """
+    if data is None:
+        return headers, None
+    if not any(key.lower() == "content-type" for key in headers or ()):
+        headers = dict(headers or {}, **{"Content-Type": "application/json"})
+    return headers, _dumps_json(data)
+
+
+def _parse_response(response: Any) -> Any:
+    """
+    Decode a JSON response body, straight from bytes when orjson is installed.
+    
+    Falls back to the client's own charset-aware decoder and finally to
+    the raw text and status code.
+    """
+    try:
+        if orjson is not None:
+            try:
+                return orjson.loads(response.content)
+            except ValueError:
+                pass
+        return response.json()
+    except ValueError:
+        return {"text": response.text, "status_code": response.status_code}
+
+
+def _is_storable(response_headers: Any) -> bool:
+    """Whether a response may be cached (no ``Cache-Control: no-store``)."""
+    cache_control = (response_headers or {}).get("Cache-Control") or ""
+    return "no-store" not in str(cache_control).lower()
+
 
 class HTTPHandlers:
     """
     Collection of HTTP request handlers for service tasks.
     """
     
-    def __init__(self, default_timeout: int = 30, max_retries: int = 3):
+    def __init__(self, default_timeout: int = 30, max_retries: int = 3,
+                 base_delay: float = 0.5, max_delay: float = 30.0,
+                 jitter: bool = True):
         """
         Initialize HTTP handlers.
         
         Args:
             default_timeout: Default request timeout in seconds
             max_retries: Maximum number of retries on failure
+            base_delay: Backoff before the first retry, doubled per attempt
+            max_delay: Upper bound on any single backoff, in seconds
+            jitter: Randomize each backoff between 50% and 150%
         """
         self.default_timeout = default_timeout
         self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self._session = _create_session()
+
+    @property
+    def session(self) -> requests.Session:
+        """The pooled session shared by this instance's requests."""
+        return self._session
+
+    def close(self) -> None:
+        """Release pooled connections held by this instance's session."""
+        self._session.close()
 
     def _allow_private_networks(self) -> bool:
         """Whether private/loopback/link-local destinations are allowed."""
@@ -157,13 +317,87 @@ class HTTPHandlers:
         if not text:
             return text
         
-        result = text
-        for key, value in variables.items():
-            placeholder = f"${{{key}}}"
-            if placeholder in result:
-                result = result.replace(placeholder, str(value))
+        def replace(match):
+            name = match.group(1)
+            return str(variables[name]) if name in variables else match.group(0)
+        
+        return _PLACEHOLDER_RE.sub(replace, text)
+    
+    def _compile_extraction_map(self, extraction_map: Optional[Dict[str, str]]
+                                ) -> Dict[str, Optional[List[Tuple[str, Optional[int]]]]]:
+        """
+        Parse JSONPath-like extraction expressions once.
+        
+        Supports $.field.nestedField, field.nestedField and numeric list
+        indexes. Each path becomes a list of (key, index) steps, where index
+        is the integer form of a numeric part (used when the current value
+        is a list) and None otherwise. Unusable paths compile to None.
+        
+        Args:
+            extraction_map: {"variableName": "$.json.path.syntax"}
+            
+        Returns:
+            {"variableName": [(key, index), ...] or None}
+        """
+        compiled = {}
+        
+        for var_name, json_path in (extraction_map or {}).items():
+            if not isinstance(json_path, str):
+                logger.warning(f"Failed to compile extraction path {json_path!r}")
+                compiled[var_name] = None
+                continue
+            # Strip leading $ and any leading dots
+            if json_path.startswith('$'):
+                path = json_path[1:].lstrip('.')
+            else:
+                path = json_path
+            parts = path.split('.') if path else []
+            if not all(parts):
+                compiled[var_name] = None
+                continue
+            compiled[var_name] = [
+                (part, int(part) if part.isdigit() else None) for part in parts
+            ]
+        
+        return compiled
+    
+    def _apply_compiled_extraction(self, response_data: Dict,
+                                   compiled_extract: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Extract values from a response using a compiled extraction map.
+        
+        Args:
+            response_data: JSON response as dictionary
+            compiled_extract: Output of _compile_extraction_map()
+            
+        Returns:
+            Dictionary of extracted values
+        """
+        extracted = {}
+        
+        for var_name, steps in compiled_extract.items():
+            if steps is None:
+                continue
+            value = response_data
+            for key, index in steps:
+                if not value:
+                    value = None
+                    break
+                if isinstance(value, dict):
+                    value = value.get(key)
+                elif index is not None and isinstance(value, list):
+                    value = value[index] if index < len(value) else None
+                else:
+                    value = None
+                    break
+            
+            if value is not None:
+                # Convert to string for storage
+                if not isinstance(value, (dict, list)):
+                    value = str(value)
+                extracted[var_name] = value
         
-        return result
+        return extracted
     
     def _extract_response_data(self, response_data: Dict, 
                                extraction_map: Dict[str, str]) -> Dict[str, Any]:
@@ -177,43 +411,75 @@ class HTTPHandlers:
         Returns:
             Dictionary of extracted values
         """
-        extracted = {}
+        return self._apply_compiled_extraction(
+            response_data, self._compile_extraction_map(extraction_map)
+        )
+    
+    def _backoff_delay(self, attempt: int) -> float:
+        """Capped exponential backoff, jittered so retries do not synchronize."""
+        delay = self.base_delay * (2 ** attempt)
+        if self.jitter:
+            delay *= 0.5 + _RETRY_RANDOM.random()
+        return min(self.max_delay, delay)
+    
+    def _is_retryable(self, error: Exception) -> bool:
+        """
+        Whether a failed request is worth retrying.
         
-        for var_name, json_path in extraction_map.items():
-            try:
-                # Simple JSON path-like extraction
-                # Support: $.field.nestedField or just field
-                # Strip leading $ and any leading dots
-                if json_path.startswith('$'):
-                    path = json_path[1:].lstrip('.')
-                else:
-                    path = json_path
-                parts = path.split('.') if path else []
-                value = response_data
-                
-                for part in parts:
-                    if part and value and isinstance(value, dict):
-                        value = value.get(part)
-                    elif part and value and isinstance(value, list) and part.isdigit():
-                        idx = int(part)
-                        value = value[idx] if idx < len(value) else None
-                    else:
-                        value = None
-                        break
-                
-                if value is not None:
-                    # Convert to string for storage
-                    extracted[var_name] = str(value) if not isinstance(value, (dict, list)) else value
-                    
-            except Exception as e:
-                logger.warning(f"Failed to extract {json_path}: {e}")
-                continue
+        Connection errors and timeouts carry no response and are retried,
+        as are 429 and 5xx responses; other 4xx responses are permanent.
+        """
+        response = getattr(error, "response", None)
+        if response is None:
+            return True
+        status = response.status_code
+        return status == 429 or status >= 500
+    
+    def _prepare_auth(self, headers: Optional[Dict],
+                      auth: Optional[Dict]) -> Tuple[Dict, Optional[Tuple[str, str]]]:
+        """
+        Build request headers and basic-auth credentials from an auth config.
         
-        return extracted
+        Returns:
+            (headers, (username, password) or None)
+        """
+        req_headers = dict(headers) if headers else {}
+        basic_credentials = None
+        if auth:
+            auth_type = auth.get("type", "none")
+            if auth_type == "bearer":
+                req_headers["Authorization"] = f"Bearer {auth.get('token', '')}"
+            elif auth_type == "basic":
+                credentials = f"{auth.get('username', '')}:{auth.get('password', '')}"
+                basic_credentials = tuple(credentials.split(":", 1))
+            elif auth_type == "api_key":
+                header_name = auth.get("header", "X-API-Key")
+                req_headers[header_name] = auth.get("key", "")
+        return req_headers, basic_credentials
+    
+    def _build_auth(self, basic_credentials: Tuple[str, str]) -> Any:
+        """Transport-specific basic-auth object for (username, password)."""
+        return requests.auth.HTTPBasicAuth(*basic_credentials)
+    
+    def _compile_auth(self, auth: Optional[Dict],
+                      headers: Optional[Dict] = None) -> Tuple[Dict, Any]:
+        """
+        Resolve an auth config into request headers and an auth object.
+        
+        Handlers call this once at creation so each request reuses them.
+        
+        Returns:
+            (headers including any auth header, auth object or None)
+        """
+        req_headers, basic_credentials = self._prepare_auth(headers, auth)
+        auth_obj = self._build_auth(basic_credentials) if basic_credentials else None
+        return req_headers, auth_obj
     
     def _make_request(self, method: str, url: str, headers: Dict = None, 
                      params: Dict = None, data: Any = None, 
-                     auth: Dict = None, timeout: int = None) -> Dict:
+                     auth: Dict = None, timeout: int = None,
+                     return_headers: bool = False, auth_obj: Any = None,
+                     is_body_method: Optional[bool] = None) -> Dict:
         """
         Make an HTTP request with authentication.
         
@@ -225,28 +491,30 @@ class HTTPHandlers:
             data: Request body
             auth: Authentication config
             timeout: Request timeout
+            return_headers: Also return the response headers
+            auth_obj: Pre-built auth object (from _compile_auth); used when
+                auth is not given and headers already carry any auth header
+            is_body_method: Pre-computed "method sends a JSON body" flag; when
+                given, method must already be upper-case
             
         Returns:
-            Response data dictionary
+            Response data dictionary, or (data, headers) with return_headers
             
         Raises:
             Exception: If request fails
         """
         self._validate_request_url(url)
 
+        if is_body_method is None:
+            method = method.upper()
+            is_body_method = method in _BODY_METHODS
+        
         # Set up authentication
-        req_headers = dict(headers) if headers else {}
-        auth_obj = None
         if auth:
-            auth_type = auth.get("type", "none")
-            if auth_type == "bearer":
-                req_headers["Authorization"] = f"Bearer {auth.get('token', '')}"
-            elif auth_type == "basic":
-                credentials = f"{auth.get('username', '')}:{auth.get('password', '')}"
-                auth_obj = requests.auth.HTTPBasicAuth(*credentials.split(":", 1))
-            elif auth_type == "api_key":
-                header_name = auth.get("header", "X-API-Key")
-                req_headers[header_name] = auth.get("key", "")
+            headers, auth_obj = self._compile_auth(auth, headers)
+        
+        if is_body_method:
+            headers, data = _json_body(headers, data)
         
         # Set default timeout
         if timeout is None:
@@ -256,13 +524,12 @@ class HTTPHandlers:
         last_error = None
         for attempt in range(self.max_retries):
             try:
-                response = requests.request(
-                    method=method.upper(),
+                response = self._session.request(
+                    method=method,
                     url=url,
-                    headers=req_headers,
+                    headers=headers,
                     params=params,
-                    json=data if method.upper() in ["POST", "PUT"] else None,
-                    data=data if method.upper() not in ["POST", "PUT"] else None,
+                    data=data,
                     auth=auth_obj,
                     timeout=timeout
                 )
@@ -271,20 +538,110 @@ class HTTPHandlers:
                 response.raise_for_status()
                 
                 # Parse response
-                try:
-                    return response.json()
-                except json.JSONDecodeError:
-                    return {"text": response.text, "status_code": response.status_code}
+                result = _parse_response(response)
+                return (result, response.headers) if return_headers else result
                     
             except requests.exceptions.RequestException as e:
                 last_error = e
+                if not self._is_retryable(e):
+                    raise
                 if attempt < self.max_retries - 1:
-                    import time
-                    time.sleep(2 ** attempt)  # Exponential backoff
+                    time.sleep(self._backoff_delay(attempt))
                 continue
         
         raise last_error
     
+    def _compile_request(self, url: str, headers: Optional[Dict],
+                         params: Optional[Dict], data: Any,
+                         static_headers: Optional[Dict] = None) -> callable:
+        """
+        Pre-scan a request template for ${variable} placeholders.
+        
+        Only the strings that contain placeholders are substituted per call;
+        everything else is resolved once here and reused. static_headers
+        (e.g. auth headers) are never substituted and override headers.
+        
+        Returns:
+            render(variables) -> keyword arguments (url, headers, params, data)
+            for _make_request
+        """
+        sub = self._substitute_variables
+        
+        def templated(value: Any) -> bool:
+            return isinstance(value, str) and _PLACEHOLDER_RE.search(value) is not None
+        
+        url_templated = templated(url)
+        header_items = [
+            (key, value, templated(value)) for key, value in (headers or {}).items()
+        ]
+        header_items.extend(
+            (key, value, False) for key, value in (static_headers or {}).items()
+        )
+        param_items = [
+            (key, str(value), templated(str(value)))
+            for key, value in (params or {}).items()
+        ]
+        
+        data_items = None
+        data_text = None
+        if data:
+            if isinstance(data, dict):
+                data_items = [
+                    (key, value, templated(value)) for key, value in data.items()
+                ]
+            else:
+                data_text = str(data)
+        
+        dynamic = (
+            url_templated
+            or templated(data_text)
+            or any(t for _, _, t in header_items)
+            or any(t for _, _, t in param_items)
+            or any(t for _, _, t in data_items or ())
+        )
+        
+        def resolve(items, variables):
+            return {
+                key: sub(value, variables) if is_templated else value
+                for key, value, is_templated in items
+            }
+        
+        def build(variables: Dict[str, Any]) -> Dict[str, Any]:
+            final_data = None
+            if data_items is not None:
+                final_data = resolve(data_items, variables)
+            elif data_text is not None:
+                final_data = sub(data_text, variables)
+            return {
+                "url": sub(url, variables) if url_templated else url,
+                "headers": resolve(header_items, variables),
+                "params": resolve(param_items, variables),
+                "data": final_data,
+            }
+        
+        if dynamic:
+            return build
+        
+        static = build({})
+        
+        def render_static(variables: Dict[str, Any]) -> Dict[str, Any]:
+            return static
+        
+        return render_static
+    
+    def _apply_response(self, variables: Dict[str, Any], response_data: Any,
+                        compiled_extract: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge extracted values and the raw response into the process variables."""
+        if compiled_extract and isinstance(response_data, dict):
+            extracted = self._apply_compiled_extraction(response_data, compiled_extract)
+            variables.update(extracted)
+            logger.info(f"Extracted {len(extracted)} values from response")
+        
+        # Always add raw response
+        variables["_http_response"] = response_data
+        
+        return variables
+    
     def create_http_handler(self, url: str, method: str = "GET",
                            headers: Optional[Dict] = None,
                            params: Optional[Dict] = None,
@@ -292,7 +649,8 @@ class HTTPHandlers:
                            auth: Optional[Dict] = None,
                            timeout: Optional[int] = None,
                            response_extract: Optional[Dict[str, str]] = None,
-                           description: str = "") -> callable:
+                           description: str = "",
+                           cache_ttl: Optional[float] = None) -> callable:
         """
         Create an HTTP request handler for a service task.
         
@@ -306,6 +664,9 @@ class HTTPHandlers:
             timeout: Request timeout in seconds
             response_extract: Dict to extract values from response {"var": "$.json.path"}
             description: Handler description
+            cache_ttl: For GET handlers, reuse responses for this many seconds
+                (keyed on the substituted URL, params and headers; responses
+                marked Cache-Control: no-store are never cached)
             
         Returns:
             Handler function suitable for register_topic_handler()
@@ -324,6 +685,22 @@ class HTTPHandlers:
                 description="Fetch user details from API"
             )
         """
+        method_upper = method.upper()
+        auth_headers, auth_obj = self._compile_auth(auth)
+        request_options = {
+            "method": method_upper,
+            "timeout": timeout,
+            "auth_obj": auth_obj,
+            "is_body_method": method_upper in _BODY_METHODS,
+        }
+        render_request = self._compile_request(
+            url, headers, params, data, static_headers=auth_headers
+        )
+        compiled_extract = self._compile_extraction_map(response_extract)
+        response_cache = None
+        if cache_ttl and method_upper == "GET":
+            response_cache = _TTLCache(ttl=cache_ttl)
+        
         def handler(instance_id: str, variables: Dict[str, Any]) -> Dict[str, Any]:
             """
             Execute HTTP request and update variables.
@@ -335,53 +712,33 @@ class HTTPHandlers:
             Returns:
                 Updated variables with response data
             """
-            # Substitute variables
-            final_url = self._substitute_variables(url, variables)
-            final_headers = {}
-            if headers:
-                for key, value in headers.items():
-                    final_headers[key] = self._substitute_variables(value, variables)
-            
-            final_params = {}
-            if params:
-                for key, value in params.items():
-                    final_params[key] = self._substitute_variables(str(value), variables)
-            
-            final_data = None
-            if data:
-                if isinstance(data, dict):
-                    final_data = {}
-                    for key, value in data.items():
-                        if isinstance(value, str):
-                            final_data[key] = self._substitute_variables(value, variables)
-                        else:
-                            final_data[key] = value
-                else:
-                    final_data = self._substitute_variables(str(data), variables)
-            
-            logger.info(f"Making {method} request to {final_url} for instance {instance_id}")
-            
-            # Make request
-            response_data = self._make_request(
-                method=method,
-                url=final_url,
-                headers=final_headers,
-                params=final_params,
-                data=final_data,
-                auth=auth,
-                timeout=timeout
+            request_kwargs = render_request(variables)
+            logger.info(
+                f"Making {method} request to {request_kwargs['url']} "
+                f"for instance {instance_id}"
             )
             
-            # Extract response data
-            if response_extract and isinstance(response_data, dict):
-                extracted = self._extract_response_data(response_data, response_extract)
-                variables.update(extracted)
-                logger.info(f"Extracted {len(extracted)} values from response")
+            if response_cache is None:
+                response_data = self._make_request(**request_options, **request_kwargs)
+                return self._apply_response(variables, response_data, compiled_extract)
             
-            # Always add raw response
-            variables["_http_response"] = response_data
+            cache_key = (
+                request_kwargs["url"],
+                frozenset(request_kwargs["params"].items()),
+                frozenset(request_kwargs["headers"].items()),
+            )
+            response_data = response_cache.get(cache_key, _CACHE_MISS)
+            if response_data is _CACHE_MISS:
+                response_data, response_headers = self._make_request(
+                    return_headers=True, **request_options, **request_kwargs
+                )
+                if _is_storable(response_headers):
+                    response_cache.set(cache_key, copy.deepcopy(response_data))
+            else:
+                logger.info(f"Using cached response for {request_kwargs['url']}")
+                response_data = copy.deepcopy(response_data)
             
-            return variables
+            return self._apply_response(variables, response_data, compiled_extract)
         
         # Attach metadata for documentation
         handler.__doc__ = f"""HTTP {method} request to {url}
@@ -398,7 +755,8 @@ Response data is extracted using JSONPath-like syntax.
             response_extract: Optional[Dict[str, str]] = None,
             auth: Optional[Dict] = None,
             timeout: Optional[int] = None,
-            description: str = "") -> callable:
+            description: str = "",
+            cache_ttl: Optional[float] = None) -> callable:
         """
         Create a GET request handler.
         
@@ -406,7 +764,8 @@ Response data is extracted using JSONPath-like syntax.
             handler = handlers.get(
                 url="https://api.example.com/users/${userId}",
                 response_extract={"userName": "$.name", "email": "$.email"},
-                auth={"type": "bearer", "token": "api-key"}
+                auth={"type": "bearer", "token": "api-key"},
+                cache_ttl=60
             )
         """
         return self.create_http_handler(
@@ -415,7 +774,8 @@ Response data is extracted using JSONPath-like syntax.
             auth=auth,
             timeout=timeout,
             response_extract=response_extract,
-            description=description or f"GET {url}"
+            description=description or f"GET {url}",
+            cache_ttl=cache_ttl
         )
     
     def post(self, url: str,
@@ -516,12 +876,251 @@ Response data is extracted using JSONPath-like syntax.
         )
 
 
+class AsyncHTTPHandlers(HTTPHandlers):
+    """
+    HTTP handlers backed by a single ``httpx.AsyncClient`` event loop.
+    
+    Requests from every handler share one connection pool running on a
+    dedicated background loop, so many in-flight calls cost no extra
+    threads. Handlers returned by create_http_handler() stay synchronous
+    for the task dispatcher; create_async_http_handler() returns coroutine
+    handlers and fetch_all() fans out a batch with asyncio.gather.
+    
+    Example:
+        handlers = AsyncHTTPHandlers()
+        results = handlers.fetch_all([
+            {"method": "POST", "url": url, "data": {"event": "done"}}
+            for url in webhook_urls
+        ])
+    """
+    
+    def __init__(self, default_timeout: int = 30, max_retries: int = 3,
+                 max_connections: int = 100, max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 30.0, transport: Any = None,
+                 **backoff):
+        """
+        Initialize async HTTP handlers.
+        
+        Args:
+            default_timeout: Default request timeout in seconds
+            max_retries: Maximum number of retries on failure
+            max_connections: Maximum concurrent connections in the pool
+            max_keepalive_connections: Idle connections kept open for reuse
+            keepalive_expiry: Seconds an idle connection is kept alive
+            transport: Optional httpx transport (e.g. httpx.MockTransport)
+            **backoff: base_delay, max_delay and jitter as for HTTPHandlers
+        """
+        if httpx is None:
+            raise ImportError("AsyncHTTPHandlers requires the 'httpx' package")
+        super().__init__(
+            default_timeout=default_timeout, max_retries=max_retries, **backoff
+        )
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._transport = transport
+        self._client = None
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+    
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the background event loop and client on first use."""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name="spear-http-loop", daemon=True
+                )
+                thread.start()
+                self._loop, self._thread = loop, thread
+                self._client = httpx.AsyncClient(
+                    limits=self._limits, transport=self._transport
+                )
+            return self._loop
+    
+    def _submit(self, coro) -> "asyncio.Future":
+        """Schedule a coroutine on the background loop."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+    
+    def _build_auth(self, basic_credentials: Tuple[str, str]) -> Any:
+        """httpx basic-auth object for (username, password)."""
+        return httpx.BasicAuth(*basic_credentials)
+    
+    async def _make_request_async(self, method: str, url: str, headers: Dict = None,
+                                  params: Dict = None, data: Any = None,
+                                  auth: Dict = None, timeout: int = None,
+                                  return_headers: bool = False, auth_obj: Any = None,
+                                  is_body_method: Optional[bool] = None) -> Dict:
+        """
+        Async counterpart of _make_request; runs on the background loop.
+        """
+        self._validate_request_url(url)
+        
+        if is_body_method is None:
+            method = method.upper()
+            is_body_method = method in _BODY_METHODS
+        if auth:
+            headers, auth_obj = self._compile_auth(auth, headers)
+        
+        if timeout is None:
+            timeout = self.default_timeout
+        
+        body = {}
+        if is_body_method:
+            headers, body["content"] = _json_body(headers, data)
+        elif isinstance(data, (str, bytes)):
+            body["content"] = data
+        elif data is not None:
+            body["data"] = data
+        
+        last_error = None
+        for attempt in range(self.max_retries):
+            try:
+                response = await self._client.request(
+                    method,
+                    url,
+                    headers=headers,
+                    params=params,
+                    auth=auth_obj,
+                    timeout=timeout,
+                    **body
+                )
+                response.raise_for_status()
+                
+                result = _parse_response(response)
+                return (result, response.headers) if return_headers else result
+            
+            except httpx.HTTPError as e:
+                last_error = e
+                if not self._is_retryable(e):
+                    raise
+                if attempt < self.max_retries - 1:
+                    await asyncio.sleep(self._backoff_delay(attempt))
+                continue
+        
+        raise last_error
+    
+    def _make_request(self, method: str, url: str, headers: Dict = None,
+                      params: Dict = None, data: Any = None,
+                      auth: Dict = None, timeout: int = None,
+                      return_headers: bool = False, auth_obj: Any = None,
+                      is_body_method: Optional[bool] = None) -> Dict:
+        """Blocking wrapper that runs the request on the shared loop."""
+        return self._submit(self._make_request_async(
+            method, url, headers=headers, params=params, data=data,
+            auth=auth, timeout=timeout, return_headers=return_headers,
+            auth_obj=auth_obj, is_body_method=is_body_method
+        )).result()
+    
+    async def _gather(self, request_specs: List[Dict]) -> List[Any]:
+        """Await every request spec concurrently on the background loop."""
+        return await asyncio.gather(
+            *(self._make_request_async(**spec) for spec in request_specs),
+            return_exceptions=True
+        )
+    
+    def fetch_all(self, request_specs: List[Dict]) -> List[Any]:
+        """
+        Run a batch of requests concurrently.
+        
+        Args:
+            request_specs: _make_request keyword dicts (method, url, headers, ...)
+            
+        Returns:
+            Response data (or the raised exception) per spec, in order
+        """
+        return self._submit(self._gather(request_specs)).result()
+    
+    def create_async_http_handler(self, url: str, method: str = "GET",
+                                  headers: Optional[Dict] = None,
+                                  params: Optional[Dict] = None,
+                                  data: Optional[Dict] = None,
+                                  auth: Optional[Dict] = None,
+                                  timeout: Optional[int] = None,
+                                  response_extract: Optional[Dict[str, str]] = None
+                                  ) -> callable:
+        """
+        Create a coroutine handler; same arguments as create_http_handler().
+        
+        The returned ``async def handler(instance_id, variables)`` can be
+        awaited from any event loop, e.g. under asyncio.gather.
+        """
+        method_upper = method.upper()
+        auth_headers, auth_obj = self._compile_auth(auth)
+        request_options = {
+            "method": method_upper,
+            "timeout": timeout,
+            "auth_obj": auth_obj,
+            "is_body_method": method_upper in _BODY_METHODS,
+        }
+        render_request = self._compile_request(
+            url, headers, params, data, static_headers=auth_headers
+        )
+        compiled_extract = self._compile_extraction_map(response_extract)
+        
+        async def handler(instance_id: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+            request_kwargs = render_request(variables)
+            logger.info(
+                f"Making {method} request to {request_kwargs['url']} "
+                f"for instance {instance_id}"
+            )
+            future = self._submit(
+                self._make_request_async(**request_options, **request_kwargs)
+            )
+            response_data = await asyncio.wrap_future(future)
+            return self._apply_response(variables, response_data, compiled_extract)
+        
+        return handler
+    
+    def close(self) -> None:
+        """Close the async client, stop the background loop and the session."""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is not None:
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            self._thread.join()
+            loop.close()
+            self._client = None
+            self._thread = None
+        super().close()
+
+
+# Process-wide handlers so every topic shares one connection pool
+_DEFAULT_HANDLERS: Optional[HTTPHandlers] = None
+_DEFAULT_HANDLERS_LOCK = threading.Lock()
+
+
+def get_default_handlers() -> HTTPHandlers:
+    """Return the shared HTTPHandlers instance, creating it on first use."""
+    global _DEFAULT_HANDLERS
+    handlers = _DEFAULT_HANDLERS
+    if handlers is None:
+        with _DEFAULT_HANDLERS_LOCK:
+            if _DEFAULT_HANDLERS is None:
+                _DEFAULT_HANDLERS = HTTPHandlers()
+            handlers = _DEFAULT_HANDLERS
+    return handlers
+
+
+def shutdown_default_handlers() -> None:
+    """Close the shared handlers' pooled connections (e.g. at engine shutdown)."""
+    global _DEFAULT_HANDLERS
+    with _DEFAULT_HANDLERS_LOCK:
+        handlers, _DEFAULT_HANDLERS = _DEFAULT_HANDLERS, None
+    if handlers is not None:
+        handlers.close()
+
+
 # Convenience function for quick handler creation
 def create_http_handler(**kwargs) -> callable:
     """
     Create an HTTP request handler.
     
-    Shorthand for HTTPHandlers().create_http_handler(**kwargs)
+    Shorthand for get_default_handlers().create_http_handler(**kwargs)
     
     Example:
         handler = create_http_handler(
@@ -530,7 +1129,7 @@ def create_http_handler(**kwargs) -> callable:
             response_extract={"result": "$.data"}
         )
     """
-    return HTTPHandlers().create_http_handler(**kwargs)
+    return get_default_handlers().create_http_handler(**kwargs)
 
 
 # Pre-built handlers for common use cases
@@ -545,8 +1144,6 @@ class PreBuiltHandlers:
         Variables: message, channel (optional), severity (optional)
         """
         def handler(instance_id: str, variables: Dict[str, Any]) -> Dict[str, Any]:
-            import requests
-            
             payload = {
                 "text": variables.get("message", "Process notification"),
                 "channel": variables.get("channel", channel),
@@ -560,7 +1157,12 @@ class PreBuiltHandlers:
                 payload["attachments"] = [{"color": "good", "text": payload["text"]}]
             
             try:
-                response = requests.post(webhook_url, json=payload, timeout=10)
+                response = get_default_handlers().session.post(
+                    webhook_url,
+                    data=_dumps_json(payload),
+                    headers={"Content-Type": "application/json"},
+                    timeout=10
+                )
                 response.raise_for_status()
                 variables["slack_notified"] = True
                 variables["slack_status"] = "success"
@@ -578,14 +1180,63 @@ class PreBuiltHandlers:
         Send an email notification.
         
         Requires smtp_config with: host, port, username, password, from_email
+        (optional: timeout in seconds, default 30)
+        
+        One authenticated SMTP connection is kept per handler and checked
+        with NOOP before each message; it is re-established when the server
+        has dropped it. A failure during the send itself is reported, not
+        retried, since the server may already have accepted the message.
+        Call handler.close() to log out.
         
         Variables: to_email, subject, body
         """
+        state = {"conn": None}
+        lock = threading.Lock()
+        
+        def connect() -> smtplib.SMTP:
+            server = smtplib.SMTP(
+                smtp_config["host"],
+                smtp_config["port"],
+                timeout=smtp_config.get("timeout", 30),
+            )
+            try:
+                server.starttls()
+                server.login(smtp_config["username"], smtp_config["password"])
+            except Exception:
+                server.close()
+                raise
+            return server
+        
+        def is_alive(server: smtplib.SMTP) -> bool:
+            try:
+                return server.noop()[0] == 250
+            except (smtplib.SMTPException, OSError):
+                return False
+        
+        def discard() -> None:
+            server, state["conn"] = state["conn"], None
+            if server is not None:
+                try:
+                    server.quit()
+                except (smtplib.SMTPException, OSError):
+                    server.close()
+        
+        def send(msg: MIMEMultipart) -> None:
+            with lock:
+                if state["conn"] is None or not is_alive(state["conn"]):
+                    discard()
+                    state["conn"] = connect()
+                try:
+                    state["conn"].send_message(msg)
+                except (smtplib.SMTPServerDisconnected, OSError):
+                    discard()
+                    raise
+        
+        def close() -> None:
+            with lock:
+                discard()
+        
         def handler(instance_id: str, variables: Dict[str, Any]) -> Dict[str, Any]:
-            import smtplib
-            from email.mime.text import MIMEText
-            from email.mime.multipart import MIMEMultipart
-            
             try:
                 msg = MIMEMultipart()
                 msg["From"] = smtp_config["from_email"]
@@ -593,10 +1244,7 @@ class PreBuiltHandlers:
                 msg["Subject"] = variables.get("subject", "Process Notification")
                 msg.attach(MIMEText(variables.get("body", ""), "plain"))
                 
-                with smtplib.SMTP(smtp_config["host"], smtp_config["port"]) as server:
-                    server.starttls()
-                    server.login(smtp_config["username"], smtp_config["password"])
-                    server.send_message(msg)
+                send(msg)
                 
                 variables["email_sent"] = True
                 variables["email_status"] = "success"
@@ -607,28 +1255,42 @@ class PreBuiltHandlers:
             
             return variables
         
+        handler.close = close
         return handler
     
     @staticmethod
-    def call_weather_api(api_key: str) -> callable:
+    def call_weather_api(api_key: str, cache_ttl: Optional[float] = 60) -> callable:
         """
         Get weather data for a location.
         
+        Successful lookups are reused per (city, country) for cache_ttl
+        seconds; pass cache_ttl=None to always call the API.
+        
         Variables: city, country (optional)
         """
+        weather_cache = _TTLCache(ttl=cache_ttl) if cache_ttl else None
+        
         def handler(instance_id: str, variables: Dict[str, Any]) -> Dict[str, Any]:
-            import requests
-            
             city = variables.get("city", "New York")
             country = variables.get("country", "US")
             
             try:
-                response = requests.get(
-                    f"http://api.openweathermap.org/data/2.5/weather",
-                    params={"q": f"{city},{country}", "appid": api_key},
-                    timeout=10
-                )
-                data = response.json()
+                data = _CACHE_MISS
+                if weather_cache is not None:
+                    data = weather_cache.get((city, country), _CACHE_MISS)
+                if data is _CACHE_MISS:
+                    response = get_default_handlers().session.get(
+                        f"http://api.openweathermap.org/data/2.5/weather",
+                        params={"q": f"{city},{country}", "appid": api_key},
+                        timeout=10
+                    )
+                    data = _loads_json(response.content)
+                    if (
+                        weather_cache is not None
+                        and data.get("cod") == 200
+                        and _is_storable(response.headers)
+                    ):
+                        weather_cache.set((city, country), data)
                 
                 if data.get("cod") == 200:
                     variables["weather_temp"] = data["main"]["temp"]
@@ -654,7 +1316,7 @@ if __name__ == "__main__":
     from src.api.storage import get_storage
     
     storage = get_storage()
-    handlers = HTTPHandlers()
+    handlers = get_default_handlers()
     
     # Example 1: GET request
     storage.register_topic_handler(
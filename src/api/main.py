@@ -16,6 +16,7 @@ from src.api.instances import router as instances_router
 from src.api.tasks import router as tasks_router
 from src.api.topics import router as topics_router
 from src.api.errors import router as errors_router
+from src.api.handlers.http_handlers import shutdown_default_handlers
 from src.api.security import (
     enforce_rate_limit,
     get_allowed_origins,
@@ -85,6 +86,7 @@ async def lifespan(app: FastAPI):
         timer_task.cancel()
         with contextlib.suppress(asyncio.CancelledError):
             await timer_task
+    shutdown_default_handlers()
     print("SPEAR API shutting down...")
 
 
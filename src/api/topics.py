@@ -6,13 +6,13 @@ from fastapi import APIRouter, HTTPException
 from typing import Any, Dict, Optional
 from pydantic import BaseModel, Field
 from src.api.storage import get_storage
-from src.api.handlers.http_handlers import HTTPHandlers
+from src.api.handlers.http_handlers import get_default_handlers
 
 router = APIRouter(prefix="/topics", tags=["Service Tasks"])
 logger = logging.getLogger(__name__)
 
 storage = get_storage()
-http_handlers = HTTPHandlers()
+http_handlers = get_default_handlers()
 
 
 # ==================== Built-in Script Handlers ====================
@@ -45,6 +45,30 @@ class TestHTTPHandlers:
         result = handlers._substitute_variables(None, {"name": "World"})
         assert result is None
 
+    def test_substitute_variables_leaves_unknown_placeholders(self, handlers):
+        """Placeholders without a matching variable are kept verbatim"""
+        result = handlers._substitute_variables("${known}/${missing}", {"known": 1})
+        assert result == "1/${missing}"
+
+    def test_compile_request_reuses_static_templates(self, handlers):
+        """Templates without placeholders are resolved once at creation"""
+        render = handlers._compile_request(
+            "https://api.example.com/status", {"Accept": "json"}, {"page": 1}, None
+        )
+        first = render({"userId": "1"})
+        assert first["params"] == {"page": "1"}
+        assert render({"userId": "2"}) is first
+
+        render = handlers._compile_request(
+            "https://api.example.com/users/${userId}",
+            {"Accept": "json"},
+            None,
+            {"note": "for ${userId}", "count": 3},
+        )
+        result = render({"userId": "9"})
+        assert result["url"] == "https://api.example.com/users/9"
+        assert result["data"] == {"note": "for 9", "count": 3}
+
     def test_extract_response_data_simple(self, handlers):
         """Test simple response extraction"""
         response = {"id": 123, "status": "success"}
@@ -78,12 +102,25 @@ class TestHTTPHandlers:
         result = handlers._extract_response_data(response, extraction)
         assert "missing" not in result
 
-    @patch("src.api.handlers.http_handlers.requests.request")
+    def test_compile_extraction_map_parses_paths_once(self, handlers):
+        """Extraction paths compile to (key, index) steps reused per response"""
+        compiled = handlers._compile_extraction_map(
+            {"first": "$.items.0.id", "name": "user.name", "bad": "$.a..b"}
+        )
+        assert compiled["first"] == [("items", None), ("0", 0), ("id", None)]
+        assert compiled["name"] == [("user", None), ("name", None)]
+        assert compiled["bad"] is None
+
+        response = {"items": [{"id": 5}], "user": {"name": "Ada"}}
+        result = handlers._apply_compiled_extraction(response, compiled)
+        assert result == {"first": "5", "name": "Ada"}
+
+    @patch("src.api.handlers.http_handlers.requests.Session.request")
     def test_make_request_get(self, mock_request, handlers):
         """Test GET request"""
         mock_response = Mock()
         mock_response.status_code = 200
-        mock_response.json.return_value = {"data": "test"}
+        mock_response.content = json.dumps({"data": "test"}).encode()
         mock_request.return_value = mock_response
 
         result = handlers._make_request("GET", "http://example.com/api")
@@ -93,12 +130,12 @@ class TestHTTPHandlers:
         assert call_kwargs["method"] == "GET"
         assert call_kwargs["url"] == "http://example.com/api"
 
-    @patch("src.api.handlers.http_handlers.requests.request")
+    @patch("src.api.handlers.http_handlers.requests.Session.request")
     def test_make_request_post(self, mock_request, handlers):
         """Test POST request with JSON data"""
         mock_response = Mock()
         mock_response.status_code = 201
-        mock_response.json.return_value = {"id": 123}
+        mock_response.content = json.dumps({"id": 123}).encode()
         mock_request.return_value = mock_response
 
         result = handlers._make_request(
@@ -110,12 +147,12 @@ class TestHTTPHandlers:
 
         mock_request.assert_called_once()
 
-    @patch("src.api.handlers.http_handlers.requests.request")
+    @patch("src.api.handlers.http_handlers.requests.Session.request")
     def test_make_request_with_api_key_auth(self, mock_request, handlers):
         """Test request with API key authentication"""
         mock_response = Mock()
         mock_response.status_code = 200
-        mock_response.json.return_value = {}
+        mock_response.content = json.dumps({}).encode()
         mock_request.return_value = mock_response
 
         auth = {"type": "api_key", "key": "test-api-key"}
@@ -126,12 +163,12 @@ class TestHTTPHandlers:
         assert "headers" in call_kwargs
         assert call_kwargs["headers"].get("X-API-Key") == "test-api-key"
 
-    @patch("src.api.handlers.http_handlers.requests.request")
+    @patch("src.api.handlers.http_handlers.requests.Session.request")
     def test_make_request_with_bearer_auth(self, mock_request, handlers):
         """Test request with bearer authentication."""
         mock_response = Mock()
         mock_response.status_code = 200
-        mock_response.json.return_value = {}
+        mock_response.content = json.dumps({}).encode()
         mock_request.return_value = mock_response
 
         auth = {"type": "bearer", "token": "test-token"}
@@ -146,7 +183,7 @@ class TestHTTPHandlers:
         with pytest.raises(ValueError, match="Blocked private"):
             handlers._make_request("GET", "http://127.0.0.1/internal")
 
-    @patch("src.api.handlers.http_handlers.requests.request")
+    @patch("src.api.handlers.http_handlers.requests.Session.request")
     def test_make_request_allows_private_when_configured(
         self, mock_request, handlers, monkeypatch
     ):
@@ -154,7 +191,7 @@ class TestHTTPHandlers:
         monkeypatch.setenv("SPEAR_HTTP_ALLOW_PRIVATE_NETWORKS", "true")
         mock_response = Mock()
         mock_response.status_code = 200
-        mock_response.json.return_value = {"ok": True}
+        mock_response.content = json.dumps({"ok": True}).encode()
         mock_request.return_value = mock_response
 
         handlers._make_request("GET", "http://127.0.0.1/internal")
@@ -168,7 +205,7 @@ class TestHTTPHandlers:
         with pytest.raises(ValueError, match="Host not permitted"):
             handlers._make_request("GET", "https://not-allowed.example.net/path")
 
-    @patch("src.api.handlers.http_handlers.requests.request")
+    @patch("src.api.handlers.http_handlers.requests.Session.request")
     def test_make_request_allows_host_matching_allowlist(
         self, mock_request, handlers, monkeypatch
     ):
@@ -176,13 +213,349 @@ class TestHTTPHandlers:
         monkeypatch.setenv("SPEAR_HTTP_ALLOWED_HOSTS", "api.example.com,*.trusted.test")
         mock_response = Mock()
         mock_response.status_code = 200
-        mock_response.json.return_value = {"ok": True}
+        mock_response.content = json.dumps({"ok": True}).encode()
         mock_request.return_value = mock_response
 
         handlers._make_request("GET", "https://api.example.com/v1")
         handlers._make_request("GET", "https://svc.trusted.test/v1")
         assert mock_request.call_count == 2
 
+    def test_get_handler_caches_responses_with_ttl(self, handlers):
+        """GET handlers with cache_ttl reuse responses unless marked no-store"""
+        responses = []
+
+        def fake_request(**kwargs):
+            response = Mock()
+            response.content = json.dumps({"path": kwargs["url"]}).encode()
+            response.headers = {}
+            if "private" in kwargs["url"]:
+                response.headers["Cache-Control"] = "no-store"
+            responses.append(kwargs["url"])
+            return response
+
+        handler = handlers.get(
+            url="https://api.example.com/${kind}/${userId}",
+            response_extract={"path": "$.path"},
+            cache_ttl=60,
+        )
+        with patch.object(handlers._session, "request", side_effect=fake_request):
+            first = handler("i1", {"kind": "users", "userId": "1"})
+            first["_http_response"]["path"] = "mutated"
+            second = handler("i2", {"kind": "users", "userId": "1"})
+            handler("i3", {"kind": "users", "userId": "2"})
+            handler("i4", {"kind": "private", "userId": "1"})
+            handler("i5", {"kind": "private", "userId": "1"})
+
+        assert second["path"] == "https://api.example.com/users/1"
+        assert second["_http_response"]["path"] == "https://api.example.com/users/1"
+        assert responses == [
+            "https://api.example.com/users/1",
+            "https://api.example.com/users/2",
+            "https://api.example.com/private/1",
+            "https://api.example.com/private/1",
+        ]
+
+    def test_ttl_cache_expires_and_evicts(self):
+        """Entries expire after the TTL and the oldest entry is evicted first"""
+        from src.api.handlers import http_handlers
+
+        cache = http_handlers._TTLCache(ttl=60, maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+
+        with patch.object(http_handlers.time, "monotonic", return_value=1e12):
+            assert cache.get("a") is None
+
+    def test_backoff_delay_is_capped_and_jittered(self):
+        """Retry delays double per attempt, stay under max_delay and vary"""
+        from src.api.handlers.http_handlers import HTTPHandlers
+
+        steady = HTTPHandlers(base_delay=0.5, max_delay=3.0, jitter=False)
+        assert [steady._backoff_delay(a) for a in range(5)] == [
+            0.5, 1.0, 2.0, 3.0, 3.0
+        ]
+
+        jittered = HTTPHandlers(base_delay=1.0, max_delay=30.0)
+        delays = {jittered._backoff_delay(2) for _ in range(20)}
+        assert all(2.0 <= d <= 6.0 for d in delays)
+        assert len(delays) > 1
+
+    def test_make_request_does_not_retry_client_errors(self, handlers):
+        """4xx responses fail at once; 5xx and 429 responses are retried"""
+        import requests
+
+        def failing(status):
+            response = Mock()
+            response.status_code = status
+            response.raise_for_status.side_effect = requests.exceptions.HTTPError(
+                response=response
+            )
+            return response
+
+        with patch.object(handlers._session, "request") as mock_request, patch(
+            "src.api.handlers.http_handlers.time.sleep"
+        ) as mock_sleep:
+            mock_request.return_value = failing(404)
+            with pytest.raises(requests.exceptions.HTTPError):
+                handlers._make_request("GET", "https://api.example.com/missing")
+            assert mock_request.call_count == 1
+            assert not mock_sleep.called
+
+            mock_request.reset_mock()
+            mock_request.return_value = failing(503)
+            with pytest.raises(requests.exceptions.HTTPError):
+                handlers._make_request("GET", "https://api.example.com/busy")
+            assert mock_request.call_count == handlers.max_retries
+            assert mock_sleep.call_count == handlers.max_retries - 1
+
+    def test_handler_builds_auth_once(self, handlers):
+        """Auth headers and objects are prepared at handler creation"""
+        from requests.auth import HTTPBasicAuth
+
+        basic = handlers.create_http_handler(
+            url="https://api.example.com/items",
+            method="patch",
+            data={"name": "${name}"},
+            auth={"type": "basic", "username": "u", "password": "p:w"},
+        )
+        keyed = handlers.get(
+            url="https://api.example.com/items",
+            auth={"type": "api_key", "header": "X-Key", "key": "${secret}"},
+        )
+        with patch.object(handlers._session, "request") as mock_request:
+            mock_request.return_value.content = b"{}"
+            basic("i1", {"name": "a"})
+            basic("i2", {"name": "b"})
+            keyed("i3", {"secret": "leak"})
+
+        first, second, third = (c.kwargs for c in mock_request.call_args_list)
+        assert first["method"] == "PATCH"
+        assert json.loads(first["data"]) == {"name": "a"}
+        assert first["headers"]["Content-Type"] == "application/json"
+        assert isinstance(first["auth"], HTTPBasicAuth)
+        assert (first["auth"].username, first["auth"].password) == ("u", "p:w")
+        assert second["auth"] is first["auth"]
+        assert third["headers"] == {"X-Key": "${secret}"}
+
+    def test_parse_response_decodes_bytes_with_fallbacks(self, monkeypatch):
+        """Responses decode from bytes, with or without orjson installed"""
+        from src.api.handlers import http_handlers
+
+        import requests
+
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'{"ok": true}'
+        assert http_handlers._parse_response(response) == {"ok": True}
+        monkeypatch.setattr(http_handlers, "orjson", None)
+        assert http_handlers._parse_response(response) == {"ok": True}
+
+        plain = Mock(content=b"pong", status_code=200, text="pong")
+        plain.json.side_effect = json.JSONDecodeError("no json", "pong", 0)
+        assert http_handlers._parse_response(plain) == {
+            "text": "pong",
+            "status_code": 200,
+        }
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_parse_response_falls_back_to_text_for_non_utf8(
+        self, monkeypatch, use_orjson
+    ):
+        """Non-UTF-8, non-JSON bodies come back as text instead of raising"""
+        import requests
+        from src.api.handlers import http_handlers
+
+        if not use_orjson:
+            monkeypatch.setattr(http_handlers, "orjson", None)
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b"caf\xe9 <html>"
+        response.encoding = "latin-1"
+        assert http_handlers._parse_response(response) == {
+            "text": "caf\xe9 <html>",
+            "status_code": 200,
+        }
+
+        response = requests.Response()
+        response.status_code = 200
+        response._content = '{"name": "caf\xe9"}'.encode("latin-1")
+        response.encoding = "latin-1"
+        assert http_handlers._parse_response(response) == {"name": "caf\xe9"}
+        assert http_handlers._dumps_json({"a": 1}).replace(b" ", b"") == b'{"a":1}'
+
+    def test_session_is_reused_and_pooled(self, handlers):
+        """Each instance keeps one pooled keep-alive session across requests."""
+        from requests.adapters import HTTPAdapter
+
+        session = handlers.session
+        adapter = session.get_adapter("https://api.example.com")
+        assert isinstance(adapter, HTTPAdapter)
+        assert adapter._pool_maxsize == 64
+        assert adapter.max_retries.total == 0
+        with patch.object(session, "request") as mock_request:
+            mock_request.return_value.content = b"{}"
+            handlers._make_request("GET", "https://api.example.com/a")
+            handlers._make_request("GET", "https://api.example.com/b")
+        assert mock_request.call_count == 2
+        assert handlers.session is session
+        handlers.close()
+
+
+class TestDefaultHTTPHandlers:
+    """Tests for the process-wide HTTP handlers singleton"""
+
+    def test_convenience_handlers_share_one_instance(self):
+        """create_http_handler reuses the default instance until shutdown"""
+        from src.api.handlers import http_handlers
+
+        http_handlers.shutdown_default_handlers()
+        first = http_handlers.get_default_handlers()
+        assert http_handlers.get_default_handlers() is first
+
+        with patch.object(first, "create_http_handler") as create:
+            http_handlers.create_http_handler(url="https://api.example.com")
+        create.assert_called_once_with(url="https://api.example.com")
+
+        with patch.object(first, "close") as close:
+            http_handlers.shutdown_default_handlers()
+        close.assert_called_once()
+        assert http_handlers.get_default_handlers() is not first
+
+
+class TestSendEmailHandler:
+    """Tests for the pre-built SMTP handler"""
+
+    @pytest.fixture
+    def smtp(self):
+        with patch("src.api.handlers.http_handlers.smtplib.SMTP") as smtp_cls:
+            smtp_cls.return_value.noop.return_value = (250, b"OK")
+            yield smtp_cls
+
+    @pytest.fixture
+    def handler(self):
+        from src.api.handlers.http_handlers import PreBuiltHandlers
+
+        return PreBuiltHandlers.send_email(
+            {
+                "host": "smtp.example.com",
+                "port": 587,
+                "username": "user",
+                "password": "secret",
+                "from_email": "noreply@example.com",
+            }
+        )
+
+    def test_connection_is_reused_across_messages(self, smtp, handler):
+        """One SMTP login serves many messages until close()"""
+        for n in range(3):
+            result = handler(f"i{n}", {"to_email": "a@example.com", "body": "hi"})
+            assert result["email_sent"] is True
+
+        server = smtp.return_value
+        assert smtp.call_count == 1
+        server.login.assert_called_once_with("user", "secret")
+        assert server.send_message.call_count == 3
+
+        handler.close()
+        server.quit.assert_called_once()
+
+    def test_reconnects_when_connection_dropped(self, smtp, handler):
+        """A connection that fails NOOP is replaced before sending"""
+        handler("i1", {"to_email": "a@example.com"})
+        server = smtp.return_value
+        server.noop.return_value = (421, b"closing")
+        result = handler("i2", {"to_email": "a@example.com"})
+        assert result["email_sent"] is True
+        assert smtp.call_count == 2
+        assert server.send_message.call_count == 2
+        smtp.assert_called_with("smtp.example.com", 587, timeout=30)
+
+    def test_send_failure_is_reported_without_resending(self, smtp, handler):
+        """A drop during the send may follow DATA, so it is not retried"""
+        import smtplib
+
+        server = smtp.return_value
+        server.send_message.side_effect = [
+            smtplib.SMTPServerDisconnected("gone"),
+            None,
+        ]
+        result = handler("i1", {"to_email": "a@example.com"})
+        assert result["email_sent"] is False
+        assert "gone" in result["email_error"]
+        assert server.send_message.call_count == 1
+
+        result = handler("i2", {"to_email": "a@example.com"})
+        assert result["email_sent"] is True
+        assert smtp.call_count == 2
+
+
+class TestAsyncHTTPHandlers:
+    """Tests for the httpx-backed async HTTP handlers"""
+
+    @pytest.fixture
+    def handlers(self):
+        import httpx
+        from src.api.handlers.http_handlers import AsyncHTTPHandlers
+
+        def respond(request):
+            if request.url.path == "/fail":
+                return httpx.Response(500)
+            return httpx.Response(
+                200, json={"path": request.url.path, "method": request.method}
+            )
+
+        handlers = AsyncHTTPHandlers(
+            default_timeout=5, max_retries=1, transport=httpx.MockTransport(respond)
+        )
+        yield handlers
+        handlers.close()
+
+    def test_sync_handler_runs_on_shared_loop(self, handlers):
+        """create_http_handler stays synchronous for the task dispatcher."""
+        handler = handlers.create_http_handler(
+            url="https://api.example.com/users/${userId}",
+            response_extract={"path": "$.path"},
+        )
+        result = handler("inst-1", {"userId": "7"})
+        assert result["path"] == "/users/7"
+        assert result["_http_response"]["method"] == "GET"
+
+    def test_async_handler_can_be_gathered(self, handlers):
+        """Coroutine handlers fan out under asyncio.gather."""
+        import asyncio
+
+        handler = handlers.create_async_http_handler(
+            url="https://api.example.com/hooks/${n}",
+            method="POST",
+            data={"n": "${n}"},
+            response_extract={"path": "$.path"},
+        )
+
+        async def run():
+            return await asyncio.gather(
+                *(handler(f"inst-{n}", {"n": n}) for n in range(5))
+            )
+
+        results = asyncio.run(run())
+        assert [r["path"] for r in results] == [f"/hooks/{n}" for n in range(5)]
+
+    def test_fetch_all_returns_errors_in_place(self, handlers):
+        """fetch_all keeps request order and returns failures as exceptions."""
+        import httpx
+
+        results = handlers.fetch_all(
+            [
+                {"method": "GET", "url": "https://api.example.com/a"},
+                {"method": "GET", "url": "https://api.example.com/fail"},
+            ]
+        )
+        assert results[0]["path"] == "/a"
+        assert isinstance(results[1], httpx.HTTPStatusError)
+
 
 class TestProcessContextExtended:
     """Extended tests for ProcessContext"""